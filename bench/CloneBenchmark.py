@@ -0,0 +1,71 @@
+##############################################################################
+# Package: ormpy
+# File:    CloneBenchmark.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" Benchmark comparing the time to get a fresh copy of a model by loading
+    its .orm file again with NormaLoader, by a snapshot round trip, and by
+    :meth:`lib.Model.Model.clone`.  The model is a synthetic model (see
+    :mod:`bench.SyntheticModel`) unless a .orm file is given.  Each time is
+    the best of several runs.  Usage:
+
+        python -m bench.CloneBenchmark [--size N] [--file PATH] [--repeat N]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import lib.Snapshot as Snapshot
+from lib.NormaLoader import NormaLoader
+import bench.SyntheticModel as SyntheticModel
+
+def best(function, repeat):
+    """ Returns the shortest time in seconds of repeat calls to function. """
+    times = []
+    for _ in xrange(repeat):
+        start = time.time()
+        function()
+        times.append(time.time() - start)
+    return min(times)
+
+def main():
+    """ Run the benchmark. """
+    parser = argparse.ArgumentParser(description="Clone benchmark.")
+    parser.add_argument("--size", type=int, default=20000,
+                        help="Number of value types in the synthetic model")
+    parser.add_argument("--file", help=".orm file to use instead of a "
+                                       "synthetic model")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of runs of each measurement")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        orm_file = args.file
+        if orm_file is None:
+            orm_file = os.path.join(temp_dir, "synthetic.orm")
+            SyntheticModel.write(orm_file, args.size)
+            print "Model with {0} value types".format(args.size)
+        else:
+            print "Model in {0}".format(orm_file)
+
+        model = NormaLoader(orm_file).model
+
+        reload_secs = best(lambda: NormaLoader(orm_file), args.repeat)
+        snapshot_secs = best(lambda: Snapshot.loads(Snapshot.dumps(model)),
+                             args.repeat)
+        clone_secs = best(model.clone, args.repeat)
+
+        print "  reload:   {0:8.4f} s".format(reload_secs)
+        print "  snapshot: {0:8.4f} s".format(snapshot_secs)
+        print "  clone:    {0:8.4f} s ({1:.1f}x faster than reload)".format(
+            clone_secs, reload_secs / clone_secs)
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main()
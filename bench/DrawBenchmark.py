@@ -0,0 +1,40 @@
+##############################################################################
+# Package: ormpy
+# File:    DrawBenchmark.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" Benchmark for drawing many values from the numeric and temporal domains,
+    with :meth:`lib.Domain.Domain.draw` (a list of values) and with
+    :meth:`lib.Domain.Domain.draw_array` (a compact array, using NumPy if it
+    is installed).  Each time is the best of several runs.  Usage:
+
+        python -m bench.DrawBenchmark [--values N] [--repeat N]
+"""
+
+import argparse
+
+import lib.Domain as Domain
+from bench.CloneBenchmark import best
+
+def main():
+    """ Run the benchmark. """
+    parser = argparse.ArgumentParser(description="Domain draw benchmark.")
+    parser.add_argument("--values", type=int, default=10**6,
+                        help="Number of values to draw from each domain")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of runs of each measurement")
+    args = parser.parse_args()
+
+    print "Drawing {0} values (NumPy {1})".format(args.values,
+        "installed" if Domain.numpy is not None else "not installed")
+    for domain in [Domain.IntegerDomain(), Domain.FloatDomain(),
+                   Domain.DateDomain(), Domain.TimeDomain(),
+                   Domain.DateTimeDomain()]:
+        draw_secs = best(lambda: domain.draw(args.values), args.repeat)
+        array_secs = best(lambda: domain.draw_array(args.values), args.repeat)
+        print "  {0:<16} draw: {1:8.4f} s   draw_array: {2:8.4f} s".format(
+            type(domain).__name__, draw_secs, array_secs)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+##############################################################################
+# Package: ormpy
+# File:    EnumerationBenchmark.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" Benchmark for large enumerations.  A synthetic model (see
+    :mod:`bench.SyntheticModel`) whose value constraint lists each of its
+    values on its own is loaded with NormaLoader, and its values are then
+    added one at a time to an :class:`lib.Domain.EnumeratedDomain` and
+    combined with set operations.  Each time is the best of several runs.
+    Usage:
+
+        python -m bench.EnumerationBenchmark [--values N] [--repeat N]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from lib.Domain import EnumeratedDomain
+from lib.NormaLoader import NormaLoader
+import bench.SyntheticModel as SyntheticModel
+from bench.CloneBenchmark import best
+
+def enumerate_values(values):
+    """ Returns an EnumeratedDomain of values, added one at a time. """
+    domain = EnumeratedDomain()
+    for value in values:
+        domain.add(value)
+    return domain
+
+def main():
+    """ Run the benchmark. """
+    parser = argparse.ArgumentParser(description="Enumeration benchmark.")
+    parser.add_argument("--values", type=int, default=10000,
+                        help="Number of values in the enumeration")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of runs of each measurement")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        orm_file = os.path.join(temp_dir, "enumeration.orm")
+        SyntheticModel.write(orm_file, 1, args.values, enumerated=True)
+        print "Model with a {0}-value enumeration".format(args.values)
+
+        load_secs = best(lambda: NormaLoader(orm_file), args.repeat)
+        model = NormaLoader(orm_file).model
+        values = model.object_types.get("V0").domain.draw(args.values)
+
+        add_secs = best(lambda: enumerate_values(values), args.repeat)
+        domain = enumerate_values(values)
+        half = enumerate_values(values[::2])
+        set_secs = best(lambda: (domain & half, domain - half, half + domain),
+                        args.repeat)
+
+        print "  load:           {0:8.4f} s".format(load_secs)
+        print "  add one by one: {0:8.4f} s".format(add_secs)
+        print "  &, - and +:     {0:8.4f} s".format(set_secs)
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+##############################################################################
+# Package: ormpy
+# File:    LoadManyBenchmark.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" Benchmark for loading a corpus of .orm files with
+    :func:`lib.NormaLoader.load_many`.  The corpus consists of synthetic
+    models of varying size.  Usage:
+
+        python -m bench.LoadManyBenchmark [--files N] [--size N] [--jobs N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from lib.NormaLoader import load_many
+import bench.SyntheticModel as SyntheticModel
+
+def main():
+    """ Run the benchmark. """
+    parser = argparse.ArgumentParser(description="load_many benchmark.")
+    parser.add_argument("--files", type=int, default=200,
+                        help="Number of files in the corpus")
+    parser.add_argument("--size", type=int, default=1000,
+                        help="Number of value types in the largest file")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Number of worker processes (default: CPUs)")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        paths = []
+        for i in xrange(args.files):
+            path = os.path.join(temp_dir, "model{0}.orm".format(i))
+            SyntheticModel.write(path, 2 + (i * 7919) % args.size)
+            paths.append(path)
+
+        jobs = args.jobs or multiprocessing.cpu_count()
+        print "{0} files, {1} worker processes".format(len(paths), jobs)
+
+        for n in [1, jobs]:
+            start = time.time()
+            results = load_many(paths, jobs=n)
+            elapsed = time.time() - start
+            assert all(result.ok for result in results)
+
+            # Models loaded by worker processes are decoded on first access
+            start = time.time()
+            for result in results:
+                result.model
+            decode = time.time() - start
+
+            print "  jobs={0:<3} load {1:6.2f} s, decode {2:6.2f} s".format(
+                n, elapsed, decode)
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+##############################################################################
+# Package: ormpy
+# File:    MemoryBenchmark.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" Benchmark for the memory used by a loaded model.  A synthetic model (see
+    :mod:`bench.SyntheticModel`) is loaded in a fresh process, both from the
+    .orm file with NormaLoader and from a snapshot, and the resident memory
+    held by the model afterwards is reported, along with the peak resident
+    memory of the load.  Usage:
+
+        python -m bench.MemoryBenchmark [--size N] [--values N]
+"""
+
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+
+import bench.SyntheticModel as SyntheticModel
+
+def status(field):
+    """ Returns a memory field (e.g. VmRSS) of /proc/self/status in MB.  The
+        peak (VmHWM), unlike that reported by :mod:`resource`, is not
+        inherited from the parent process. """
+    with open("/proc/self/status") as stream:
+        for line in stream:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024.0
+
+def measure(mode, filename):
+    """ Load the model in filename in the current process and print the
+        resident MB held by the model, the peak resident MB, and the number
+        of elements (including roles) in the model. """
+    from lib.NormaLoader import NormaLoader
+    import lib.Snapshot as Snapshot
+
+    if mode == "snapshot":
+        with open(filename, "rb") as stream:
+            data = stream.read()
+
+    gc.collect()
+    before = status("VmRSS")
+    if mode == "loader":
+        model = NormaLoader(filename).model
+    else:
+        model = Snapshot.loads(data)
+    gc.collect()
+    held = status("VmRSS") - before
+
+    elements = model.object_types.count() + model.constraints.count() + \
+               sum(1 + len(f.roles) for f in model.fact_types)
+    print held, status("VmHWM"), elements
+
+def run(mode, filename):
+    """ Measure a mode in a fresh process and return (held MB, peak MB,
+        elements). """
+    cmd = [sys.executable, "-m", "bench.MemoryBenchmark", "--measure",
+           mode, filename]
+    held, peak, elements = subprocess.check_output(cmd).split()
+    return float(held), float(peak), int(elements)
+
+def main():
+    """ Generate the synthetic model and report the measurements. """
+    parser = argparse.ArgumentParser(description="Model memory benchmark.")
+    parser.add_argument("--size", type=int, default=50000,
+                        help="Number of value types in the synthetic model")
+    parser.add_argument("--values", type=int, default=100,
+                        help="Number of values in each value constraint")
+    parser.add_argument("--measure", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    from lib.NormaLoader import NormaLoader
+    import lib.Snapshot as Snapshot
+
+    temp_dir = tempfile.mkdtemp()
+    orm_file = os.path.join(temp_dir, "model.orm")
+    snapshot_file = os.path.join(temp_dir, "model.snapshot")
+
+    try:
+        SyntheticModel.write(orm_file, args.size, args.values)
+        with open(snapshot_file, "wb") as stream:
+            Snapshot.dump(NormaLoader(orm_file).model, stream)
+
+        print "{0} value types with {1} values each".format(args.size,
+                                                            args.values)
+        for mode, filename, label in [
+                ("loader", orm_file, "NormaLoader"),
+                ("snapshot", snapshot_file, "Snapshot.loads")]:
+            held, peak, elements = run(mode, filename)
+            print "{0:16}{1:8.1f} MB held {2:6.0f} bytes/element " \
+                  "{3:8.1f} MB peak".format(label, held,
+                  held * 1024 * 1024 / elements, peak)
+    finally:
+        for name in os.listdir(temp_dir):
+            os.remove(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
+
+if __name__ == "__main__":
+    main()
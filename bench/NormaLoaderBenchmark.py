@@ -0,0 +1,120 @@
+##############################################################################
+# Package: ormpy
+# File:    NormaLoaderBenchmark.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" Benchmark for loading large .orm files with NormaLoader.  Real .orm files
+    consist mostly of diagram (shape) data, so this script pads a test model 
+    with diagram shapes until the file reaches a requested size and then 
+    reports the load time and peak memory of NormaLoader alongside those of a
+    full parse of the file.  Each measurement runs in a fresh process.
+
+    NormaLoader stops reading at the end of the <orm:ORMModel> node, so its 
+    time saving depends on where the diagram data is.  With the diagram after
+    the model (the NORMA layout) the padding is never read.  With --before,
+    the padding is parsed node by node and NormaLoader takes longer than a
+    full parse, although its memory use stays small.  Usage:
+
+        python -m bench.NormaLoaderBenchmark [--size MB] [--model NAME] 
+                                             [--before]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import lib.TestDataLocator as TestDataLocator
+
+SHAPE = '\t\t\t<ormDiagram:ObjectTypeShape id="_{0:08X}-0000-0000-0000-' \
+        '000000000000" IsExpanded="true" AbsoluteBounds="1.5, 2.5, 0.75, ' \
+        '0.35"><ormDiagram:Subject ref="_{0:08X}" /></ormDiagram:ObjectTypeShape>\n'
+
+def generate(model, megabytes, filename, before=False):
+    """ Write a copy of the test model to filename, padded with diagram shapes
+        so that the file is at least the requested number of megabytes.  If
+        before is True, the padding is placed in a diagram that precedes the
+        <orm:ORMModel> node (NORMA itself writes diagrams after the model). """
+    with open(TestDataLocator.path(model)) as infile:
+        text = infile.read()
+
+    if before:
+        split = text.index("<orm:ORMModel")
+        head = '<ormDiagram:ORMDiagram id="_PADDING" Name="Padding">\n'
+        tail = '\t</ormDiagram:ORMDiagram>\n\t'
+    else:
+        split = text.index("</ormDiagram:ORMDiagram>")
+        head = tail = ''
+
+    target = megabytes * 1024 * 1024
+
+    with open(filename, "w") as out:
+        out.write(text[:split] + head)
+        i, size = 0, split
+        while size < target:
+            shape = SHAPE.format(i)
+            out.write(shape)
+            size += len(shape)
+            i += 1
+        out.write(tail + text[split:])
+
+def measure(mode, filename):
+    """ Load filename in the current process and print elapsed seconds and 
+        peak resident memory in MB. """
+    start = time.time()
+    if mode == "loader":
+        from lib.NormaLoader import NormaLoader
+        NormaLoader(filename)
+    else:
+        import xml.etree.cElementTree as xml
+        xml.parse(filename)
+    elapsed = time.time() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print elapsed, peak
+
+def run(mode, filename):
+    """ Measure a mode in a fresh process and return (seconds, peak MB). """
+    cmd = [sys.executable, "-m", "bench.NormaLoaderBenchmark", "--measure",
+           mode, filename]
+    output = subprocess.check_output(cmd)
+    return tuple(float(x) for x in output.split())
+
+def main():
+    """ Generate the padded model and report the measurements. """
+    parser = argparse.ArgumentParser(description=__doc__.split(".")[0])
+    parser.add_argument('--size', type=int, default=100, 
+        help='size of the generated .orm file in MB')
+    parser.add_argument('--model', default='canonical_example.orm',
+        help='test model to pad with diagram data')
+    parser.add_argument('--before', action='store_true', default=False,
+        help='place the diagram data before the model (slower than a '
+             'full parse, see above)')
+    parser.add_argument('--measure', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    handle, filename = tempfile.mkstemp(suffix=".orm")
+    os.close(handle)
+
+    try:
+        generate(args.model, args.size, filename, args.before)
+        size = os.path.getsize(filename) / (1024.0 * 1024.0)
+        print "File: {0} padded to {1:.1f} MB".format(args.model, size)
+
+        for mode, label in [("parse", "xml.parse (full tree)"), 
+                            ("loader", "NormaLoader")]:
+            elapsed, peak = run(mode, filename)
+            print "{0:24} {1:8.2f} s {2:10.1f} MB peak".format(
+                  label, elapsed, peak)
+    finally:
+        os.remove(filename)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+##############################################################################
+# Package: ormpy
+# File:    SnapshotBenchmark.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" Benchmark comparing the time to load a synthetic model from its .orm file
+    with NormaLoader against the time to load the same model from a snapshot
+    written by :meth:`lib.Model.Model.save`.  Usage:
+
+        python -m bench.SnapshotBenchmark [--size N]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from lib.Model import Model
+from lib.NormaLoader import NormaLoader
+import bench.SyntheticModel as SyntheticModel
+
+def main():
+    """ Run the benchmark. """
+    parser = argparse.ArgumentParser(description="Snapshot benchmark.")
+    parser.add_argument("--size", type=int, default=20000,
+                        help="Number of value types in the synthetic model")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        orm_file = os.path.join(temp_dir, "synthetic.orm")
+        snapshot = os.path.join(temp_dir, "synthetic.snapshot")
+        SyntheticModel.write(orm_file, args.size)
+
+        start = time.time()
+        model = NormaLoader(orm_file).model
+        orm_secs = time.time() - start
+
+        start = time.time()
+        model.save(snapshot)
+        save_secs = time.time() - start
+
+        start = time.time()
+        Model.load(snapshot)
+        load_secs = time.time() - start
+
+        print "Model with {0} value types".format(args.size)
+        print "  .orm file: {0:8.2f} MB, load {1:6.2f} s".format(
+            os.path.getsize(orm_file) / 1048576.0, orm_secs)
+        print "  snapshot:  {0:8.2f} MB, load {1:6.2f} s, save {2:6.2f} s"\
+            .format(os.path.getsize(snapshot) / 1048576.0, load_secs,
+                    save_secs)
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+##############################################################################
+# Package: ormpy
+# File:    SyntheticModel.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" Writes synthetic .orm files of arbitrary size for benchmarking.  The model
+    is a chain of value types V0, V1, ..., Vn, where each value type has a
+    value constraint and each adjacent pair Vi, Vi+1 is related by a binary
+    fact type with a simple mandatory constraint and a simple uniqueness
+    constraint on its first role. """
+
+HEADER = """<?xml version="1.0" encoding="utf-8"?>
+<ormRoot:ORM2 xmlns:orm="http://schemas.neumont.edu/ORM/2006-04/ORMCore" \
+xmlns:ormDiagram="http://schemas.neumont.edu/ORM/2006-04/ORMDiagram" \
+xmlns:ormRoot="http://schemas.neumont.edu/ORM/2006-04/ORMRoot">
+<orm:ORMModel id="_M" Name="Synthetic">
+"""
+
+FOOTER = """<orm:DataTypes><orm:UnsignedIntegerNumericDataType id="_INT" />\
+</orm:DataTypes>
+</orm:ORMModel>
+</ormRoot:ORM2>
+"""
+
+VALUE_TYPE = """<orm:ValueType id="_V{0}" Name="V{0}">
+<orm:PlayedRoles>{1}</orm:PlayedRoles>
+<orm:ConceptualDataType id="_CDT{0}" ref="_INT" Scale="0" Length="0" />
+<orm:ValueRestriction><orm:ValueConstraint id="_VC{0}" Name="VC{0}">
+<orm:ValueRanges>{2}</orm:ValueRanges>
+</orm:ValueConstraint></orm:ValueRestriction>
+</orm:ValueType>
+"""
+
+VALUE_RANGE = """<orm:ValueRange id="_VR{0}_{1}" MinValue="{1}" \
+MaxValue="{2}" MinInclusion="NotSet" MaxInclusion="NotSet" />"""
+
+FACT_TYPE = """<orm:Fact id="_F{0}" _Name="V{0}HasV{1}"><orm:FactRoles>
+<orm:Role id="_R{0}a" _IsMandatory="true" _Multiplicity="ExactlyOne" Name="">\
+<orm:RolePlayer ref="_V{0}" /></orm:Role>
+<orm:Role id="_R{0}b" _IsMandatory="false" _Multiplicity="ZeroToMany" Name="">\
+<orm:RolePlayer ref="_V{1}" /></orm:Role>
+</orm:FactRoles></orm:Fact>
+"""
+
+CONSTRAINTS = """<orm:UniquenessConstraint id="_UC{0}" Name="UC{0}" \
+IsInternal="true"><orm:RoleSequence><orm:Role id="_UCR{0}" ref="_R{0}a" />\
+</orm:RoleSequence></orm:UniquenessConstraint>
+<orm:MandatoryConstraint id="_MC{0}" Name="MC{0}" IsSimple="true">\
+<orm:RoleSequence><orm:Role id="_MCR{0}" ref="_R{0}a" /></orm:RoleSequence>\
+</orm:MandatoryConstraint>
+"""
+
+ROLE = '<orm:Role ref="_R{0}" />'
+
+def write(filename, size, values=100, enumerated=False):
+    """ Write a synthetic model with *size* value types to *filename*. Each
+        value type's value constraint permits *values* integers: 1..*values*
+        as a range or, if *enumerated*, the odd integers 1, 3, 5, ... 
+        listed one at a time in descending order. """
+    with open(filename, "w") as out:
+        out.write(HEADER)
+
+        out.write("<orm:Objects>\n")
+        for i in xrange(size):
+            roles = []
+            if i + 1 < size: roles.append(ROLE.format(str(i) + "a"))
+            if i > 0: roles.append(ROLE.format(str(i - 1) + "b"))
+            if enumerated:
+                ranges = "".join(VALUE_RANGE.format(i, x, x) for x in 
+                                 xrange(2 * values - 1, 0, -2))
+            else:
+                ranges = VALUE_RANGE.format(i, 1, values)
+            out.write(VALUE_TYPE.format(i, "".join(roles), ranges))
+        out.write("</orm:Objects>\n")
+
+        out.write("<orm:Facts>\n")
+        for i in xrange(size - 1):
+            out.write(FACT_TYPE.format(i, i + 1))
+        out.write("</orm:Facts>\n")
+
+        out.write("<orm:Constraints>\n")
+        for i in xrange(size - 1):
+            out.write(CONSTRAINTS.format(i))
+        out.write("</orm:Constraints>\n")
+
+        out.write(FOOTER)
@@ -0,0 +1,68 @@
+##############################################################################
+# Package: ormpy
+# File:    XmlBackendBenchmark.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" Benchmark comparing the XML backends of :mod:`lib.XmlBackend`.  Each
+    available backend loads the larger test models, which include join rules,
+    and a synthetic model with NormaLoader, and the best time of several runs
+    is reported for the parse phase and the whole load.  Usage:
+
+        python -m bench.XmlBackendBenchmark [--size N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+
+from lib.NormaLoader import NormaLoader
+import lib.TestDataLocator as TestDataLocator
+import lib.XmlBackend as XmlBackend
+import bench.SyntheticModel as SyntheticModel
+
+MODELS = ["join_rule_valid_complex_branching_path.orm",
+          "overlapping_iuc_transform.orm",
+          "absorption_no_matching_euc.orm",
+          "subset_variety.orm"]
+
+def measure(filename, backend, repeat):
+    """ Returns the best (parse, total) seconds of repeat loads. """
+    best = None
+    for _ in xrange(repeat):
+        stats = NormaLoader(filename, backend=backend).stats
+        times = (dict((name, t) for name, t, _ in stats.phases)["parse"],
+                 stats.seconds)
+        best = min(best, times) if best else times
+    return best
+
+def main():
+    """ Run the benchmark. """
+    parser = argparse.ArgumentParser(description="XML backend benchmark.")
+    parser.add_argument("--size", type=int, default=5000,
+                        help="Number of value types in the synthetic model")
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="Number of loads of each model per backend")
+    args = parser.parse_args()
+
+    handle, synthetic = tempfile.mkstemp(suffix=".orm")
+    os.close(handle)
+
+    try:
+        SyntheticModel.write(synthetic, args.size)
+        files = [(name, TestDataLocator.path(name)) for name in MODELS]
+        files.append(("synthetic ({0} value types)".format(args.size),
+                      synthetic))
+
+        print "{0:44}{1:>8}{2:>12}{3:>12}".format("Model", "Backend",
+                                                 "Parse (ms)", "Load (ms)")
+        for name, filename in files:
+            for backend in XmlBackend.available():
+                parse, total = measure(filename, backend, args.repeat)
+                print "{0:44}{1:>8}{2:12.2f}{3:12.2f}".format(
+                    name, backend, parse * 1000, total * 1000)
+    finally:
+        os.remove(synthetic)
+
+if __name__ == "__main__":
+    main()
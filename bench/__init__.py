@@ -0,0 +1 @@
+""" The **bench** package contains benchmark scripts for the ORMPY project. """
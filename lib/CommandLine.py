@@ -15,7 +15,9 @@ import os
 import random
 
 from lib.NormaLoader import NormaLoader
+from lib.ModelCache import ModelCache
 from lib.ORMMinusModel import ORMMinusModel
+from lib.ModelComplexity import ComplexityReport
 from lib.Population import Population
 from lib.Constraint import CardinalityConstraint, CardinalityRange
 
@@ -39,7 +41,7 @@ def execute(arglist=None):
     configure_logger(args)
 
     # Import model from .ORM file
-    model = import_model(args.filename, args)
+    model = import_model(args.filename, args, stats=args.load_stats)
 
     # Modify size distribution if requested
     if args.random:
@@ -52,6 +54,10 @@ def execute(arglist=None):
     if args.print_model:
         model.display()
 
+    # Print the complexity report, if requested
+    if args.complexity:
+        ComplexityReport(model, max(1, args.ubound)).display()
+
     # Check and/or populate the model, if requested
     if args.check_model or args.populate:
         check_or_populate(model, args)
@@ -78,6 +84,9 @@ def parse_args(arglist=None):
     # Action options
     parser.add_argument('-m', '--print-model', action='store_true',
         dest='print_model', default=False, help='print model contents')
+    parser.add_argument('--complexity', action='store_true',
+        dest='complexity', default=False, 
+        help='print element counts and estimated population size')
     parser.add_argument('-c', '--check-model', action='store_true',
         dest='check_model', default=False, help='check if model is satisfiable')
     parser.add_argument('-p', '--populate', action='store_true',
@@ -104,9 +113,20 @@ def parse_args(arglist=None):
         dest='deontic', action='store_true', default=False)
     parser.add_argument('--experimental', help='use experimental extensions',
         dest='experimental', action='store_true', default=False)
+    parser.add_argument('--cache-dir', type=str, dest='cache_dir',
+        help='directory in which to cache loaded models')
+    parser.add_argument('--load-stats', dest='load_stats', action='store_true',
+        help='print time spent in each phase of loading the model',
+        default=False)
+    parser.add_argument('--slice', type=str, dest='seeds', action='append',
+        metavar='NAME', help='load only the part of the model around the '
+             'named object type or fact type (may be repeated)')
+    parser.add_argument('--radius', type=int, dest='radius', default=1,
+        help='number of hops from the --slice elements to load')
 
     # Filename to parse
-    parser.add_argument('filename', type=str, help='File containing ORM model')
+    parser.add_argument('filename', type=str, 
+        help='File containing ORM model (.orm, .orm.gz, .orm.bz2, or .zip)')
 
     return parser.parse_args(arglist)
 
@@ -126,10 +146,15 @@ def configure_logger(args):
     logging.getLogger().setLevel(level)
     
 
-def import_model(path, args):
-    """ Import the request ORM model and return it. """
+def import_model(path, args, stats=False):
+    """ Import the request ORM model and return it.  If stats is True, print
+        the loader's statistics. """
     try:
-        loader = NormaLoader(path, deontic=args.deontic)
+        cache = ModelCache(args.cache_dir) if args.cache_dir else None
+        loader = NormaLoader(path, deontic=args.deontic, cache=cache,
+                             seeds=args.seeds, radius=args.radius)
+        if stats:
+            loader.stats.display()
         return loader.model
     except Exception as exception:
         logging.error("Could not load %s: %s", 
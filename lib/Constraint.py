@@ -7,10 +7,12 @@
 """ This module provides a class for ORM constraints.
 """
 
-from lib.ModelElement import ModelElementSet, ModelElement
+import sys
+
+from lib.ModelElement import ModelElementSet, ModelElement, ModelChange
 from lib.FactType import RoleSequence, Role
 from lib.ObjectType import ObjectType
-from lib.Domain import Domain, EnumeratedDomain, StringDomain
+from lib.Domain import Domain, IntervalDomain, StringDomain
 
 class ConstraintSet(ModelElementSet):
     """ Container for a set of constraints. """
@@ -18,15 +20,89 @@ class ConstraintSet(ModelElementSet):
     def __init__(self, name="Constraints", *args, **kwargs):
         super(ConstraintSet, self).__init__(name=name, *args, **kwargs)
 
+        # Members of the set indexed by each class in their MRO, so that
+        # e.g. a UniquenessConstraint is listed under FrequencyConstraint.
+        self._by_type = {}
+
+    def add(self, element):
+        """ Add a constraint to the set (see 
+            :meth:`lib.ModelElement.ModelElementSet.add`). """
+        super(ConstraintSet, self).add(element)
+
+        for cls in type(element).__mro__:
+            try:
+                members = self._by_type[cls]
+            except KeyError:
+                members = self._by_type[cls] = _Members()
+            members.add(element)
+
+    def remove(self, element):
+        """ Remove a constraint from the set, if it is present. """
+        member = self.get(element.name)
+        super(ConstraintSet, self).remove(element)
+
+        if member is not None:
+            for cls in type(member).__mro__:
+                self._by_type[cls].remove(member)
+
     def of_type(self, cons_type):
-        """ Return a list of constraints limited to a given type. """
-        return [cons for cons in self if isinstance(cons, cons_type)]
+        """ Return a list of constraints limited to a given type, in the 
+            order they were added to the set. """
+        if isinstance(cons_type, tuple): # As permitted by isinstance()
+            return [cons for cons in self if isinstance(cons, cons_type)]
+
+        members = self._by_type.get(cons_type)
+        return members.list() if members else []
+
+class _Members(object):
+    """ Elements of one type within a ConstraintSet, in insertion order.
+        Removed elements leave a hole that is dropped once holes make up
+        half of the list, so all operations take amortized constant time 
+        per element. """
+
+    __slots__ = ("items", "positions", "holes")
+
+    def __init__(self):
+        self.items = []     # Elements in insertion order, or None if removed
+        self.positions = {} # Element name -> index in self.items
+        self.holes = 0      # Number of None entries in self.items
+
+    def __len__(self):
+        return len(self.positions)
+
+    def add(self, element):
+        """ Append element. """
+        self.positions[element.name] = len(self.items)
+        self.items.append(element)
+
+    def remove(self, element):
+        """ Remove element. """
+        self.items[self.positions.pop(element.name)] = None
+        self.holes += 1
+
+        if self.holes * 2 > len(self.items):
+            self.items = self.list()
+            self.positions = dict((el.name, i) 
+                                  for i, el in enumerate(self.items))
+            self.holes = 0
+
+    def list(self):
+        """ Returns a new list of the elements. """
+        if self.holes:
+            return [el for el in self.items if el is not None]
+        return list(self.items)
 
 class Constraint(ModelElement):
     """ An ORM Constraint. """
 
+    # _model is set by lib.Model.Model while the constraint is in a model,
+    # so that commit and rollback are reported to the model's subscribers.
+    __slots__ = ("covers", "alethic", "_model")
+    _transient = ("_model",)
+
     def __init__(self, covers=None, alethic=True, *args, **kwargs):
         super(Constraint, self).__init__(*args, **kwargs)
+        self._model = None
 
         #: List of model element(s) that the constraint covers.  If the 
         #: constraint covers a sequence of roles, use a FactType.RoleSequence.  
@@ -41,19 +117,32 @@ class Constraint(ModelElement):
         return "Constraints." + self.name
 
     def commit(self):
-        """ Commit side effects of this constraint in the model. """
+        """ Commit side effects of this constraint in the model.  Subclasses
+            must call this method after committing their own side effects. """
         for element in self.covers or []:
             element.covered_by.append(self)
+        self._notify(ModelChange.COMMITTED)
 
     def rollback(self):
-        """ Rollback side effects of this constraint in the model. """
+        """ Rollback side effects of this constraint in the model.  Subclasses
+            must call this method after rolling back their own side effects.
+        """
         for element in self.covers or []:
             try: element.covered_by.remove(self)
             except ValueError: pass
+        self._notify(ModelChange.ROLLED_BACK)
+
+    def _notify(self, kind):
+        """ Report a change of kind to the model holding the constraint. """
+        model = getattr(self, "_model", None) # Unset if cloned or loaded
+        if model is not None:
+            model.notify(kind, self)
 
 class CardinalityConstraint(Constraint):
     """ A cardinality constraint on an object type or role. """
 
+    __slots__ = ("ranges",)
+
     def __init__(self, ranges=None, *args, **kwargs):
         super(CardinalityConstraint, self).__init__(*args, **kwargs)
         self.ranges = ranges #: A list of CardinalityRange objects
@@ -61,6 +150,8 @@ class CardinalityConstraint(Constraint):
 class CardinalityRange(object):
     """ A range for a cardinality constraint. """
 
+    __slots__ = ("lower", "upper")
+
     def __init__(self, lower=0, upper=None):
         self.lower = lower
         self.upper = upper
@@ -86,6 +177,8 @@ class ValueConstraint(Constraint):
         * Range of float values: {3.6..3.7}
     """
 
+    __slots__ = ("domain",)
+
     def __init__(self, domain=None, *args, **kwargs):
         super(ValueConstraint, self).__init__(*args, **kwargs)
 
@@ -111,10 +204,12 @@ class ValueConstraint(Constraint):
             element.domain = element.data_type
         Constraint.rollback(self)
 
-class ValueDomain(EnumeratedDomain):
-    """ The domain of a value constraint. """
+class ValueDomain(IntervalDomain):
+    """ The domain of a value constraint.  Integer ranges are stored as 
+        intervals (see :class:`lib.Domain.IntervalDomain`), so their size is
+        limited only by :attr:`MAX_SIZE`. """
 
-    MAX_SIZE = 10000 #: Arbitrary, for performance.
+    MAX_SIZE = sys.maxsize #: Largest size that max_size can report.
 
     def __init__(self, *args, **kwargs):
         super(ValueDomain, self).__init__(*args, **kwargs)        
@@ -149,7 +244,7 @@ class ValueDomain(EnumeratedDomain):
                 msg = "The range of the value constraint is too large"
                 raise ValueConstraintError(msg)
             else:
-                self.add(range(min_int, max_int+1))
+                super(ValueDomain, self).add_range(min_int, max_int)
 
 class ValueConstraintError(Exception):
     """ An exception raised by an invalid value constraint. """
@@ -158,6 +253,8 @@ class ValueConstraintError(Exception):
 class SubtypeConstraint(Constraint):
     """ A subtype constraint. """
 
+    __slots__ = ("subtype", "supertype", "idpath")
+
     def __init__(self, subtype=None, supertype=None, idpath=True,
                  *args, **kwargs):
         super(SubtypeConstraint, self).__init__(*args, **kwargs)
@@ -179,23 +276,23 @@ class SubtypeConstraint(Constraint):
         Constraint.commit(self)
 
     def rollback(self):
-        """ Rollback side effects of this constraint in the model. """
+        """ Rollback side effects of this constraint in the model.  Note that
+            any existing :class:`lib.SubtypeGraph.SubtypeGraph` is invalid
+            after a subtype constraint is rolled back, unless it follows the
+            model. """
+        try: self.supertype.direct_subtypes.remove(self.subtype)
+        except ValueError: pass
 
-        # The code commented out below the raise statement undoes what's done
-        # in commit().  However, I am concerned that if you rollback a subtype
-        # constraint, any SubtypeGraph that exists is now invalid, as are any
-        # IOR/XOR constraints that cover the subtype.  THUS, since I can't 
-        # think of why you'd need to rollback a subtype, I'm just going to 
-        # raise an exception for now.
-        raise NotImplementedError()
+        try: self.subtype.direct_supertypes.remove(self.supertype)
+        except ValueError: pass
 
-        #self.supertype.direct_subtypes.remove(self.subtype)
-        #self.subtype.direct_supertypes.remove(self.supertype)
-        #Constraint.rollback(self)
+        Constraint.rollback(self)
 
 class MandatoryConstraint(Constraint):
     """ A mandatory constraint. """
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super(MandatoryConstraint, self).__init__(*args, **kwargs)
 
@@ -209,6 +306,8 @@ class MandatoryConstraint(Constraint):
         if self.simple:
             role = self.covers[0]
             role.mandatory = True
+            player = getattr(role, "player", None)
+            if player is not None: player.invalidate()
         Constraint.commit(self)
 
     def rollback(self):
@@ -216,12 +315,16 @@ class MandatoryConstraint(Constraint):
         if self.simple:
             role = self.covers[0]
             role.mandatory = False
+            player = getattr(role, "player", None)
+            if player is not None: player.invalidate()
         Constraint.rollback(self)
 
 
 class SubsetConstraint(Constraint):
     """ A subset constraint. """
 
+    __slots__ = ("subset", "superset")
+
     def __init__(self, subset=None, superset=None, *args, **kwargs):
         super(SubsetConstraint, self).__init__(*args, **kwargs)
 
@@ -248,6 +351,8 @@ class EqualityConstraint(SubsetConstraint):
         of how they are handled by the instantiation algorithm (i.e. an
         EqualityConstraint is equivalent to a SubsetConstraint whose role
         sequences have the same cardinality). """
+
+    __slots__ = ()
     
     def __init__(self, *args, **kwargs):
         super(EqualityConstraint, self).__init__(*args, **kwargs)
@@ -255,6 +360,8 @@ class EqualityConstraint(SubsetConstraint):
 class FrequencyConstraint(Constraint):
     """ A frequency constraint. """
 
+    __slots__ = ("min_freq", "max_freq", "internal")
+
     def __init__(self, min_freq=0, max_freq=float('inf'), *args, **kwargs):
         super(FrequencyConstraint, self).__init__(*args, **kwargs)
 
@@ -270,6 +377,8 @@ class FrequencyConstraint(Constraint):
 class UniquenessConstraint(FrequencyConstraint):
     """ A uniqueness constraint (a special case of Frequency Constraint). """
 
+    __slots__ = ("identifier_for",)
+
     def __init__(self, identifier_for=None, *args, **kwargs):
         super(UniquenessConstraint, self).__init__(*args, **kwargs)
 
@@ -294,6 +403,7 @@ class UniquenessConstraint(FrequencyConstraint):
             obj.ref_roles = []
             for fact_type in {role.fact_type for role in self.covers}:
                 obj.ref_roles += [r for r in fact_type.roles if r.player == obj]                                 
+            obj.invalidate()
 
         Constraint.commit(self)
 
@@ -307,6 +417,7 @@ class UniquenessConstraint(FrequencyConstraint):
         if self.identifier_for is not None:
             self.identifier_for.identifying_constraint = None
             self.identifier_for.ref_roles = []
+            self.identifier_for.invalidate()
         Constraint.rollback(self)
 
     @property
@@ -12,12 +12,35 @@
         first10 = my_int.draw(10)
 
     The above code defines a domain of unsigned integers and then returns the 
-    first 10 integers from that domain as a set.  """
+    first 10 integers from that domain as a set.  The value at any position 
+    of a domain, or a slice of its values, can be computed without drawing 
+    the values before it: ::
+
+        my_int.nth(5000)          # 5000
+        my_int.slice(5000, 5010)  # [5000, ..., 5009]
+
+    Many values can also be drawn into a compact array with 
+    :meth:`Domain.draw_array`, which uses NumPy_ if it is installed, or 
+    viewed without drawing them at all with :meth:`Domain.view`, which 
+    returns a :class:`DomainView` that computes each value when it is used.
+
+    .. _NumPy: http://www.numpy.org
+    """
 
 import sys
+import math
 import datetime # For constants
+from array import array
+from bisect import bisect_right
+from itertools import chain, count, islice, imap, izip, repeat
+from operator import add, mul, truediv
 from datetime import date, time, timedelta # Do not include datetime class
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 class Domain(object):
     """ A domain, which can be used to generate a set of values conforming to a
         data type. """
@@ -34,18 +57,39 @@ class Domain(object):
             If n is larger than the number of elements in the domain,
             the entire domain is returned as a list. """
         n = min(n, self.max_size)
-        generator = self._generate(n)
-        result = list()
-        i = 0
-
-        while i < n:
-            try:
-                result.append(generator.next())
-                i += 1
-            except StopIteration:
-                break 
-
-        return result                      
+        return list(islice(self._generate(n), n))
+
+    def draw_array(self, n):
+        """ Draw the first n elements from the domain, as for draw(), into a
+            compact array: a NumPy array if NumPy is installed, or else an 
+            :class:`array.array`.  Domains whose values cannot be held in 
+            such an array return a list. """
+        return self.draw(n)
+
+    def view(self, n):
+        """ Returns a :class:`DomainView` of the first n elements of the
+            domain, which holds the same elements as draw(n) but computes 
+            them on demand. """
+        return DomainView(self, 0, n)
+
+    def nth(self, i):
+        """ Returns the i^th element of the domain (counting from 0, and from
+            the end if i is negative), i.e. draw(i+1)[i], or raises an 
+            IndexError if the domain has no i^th element. """
+        size = self.max_size
+        if i < 0:
+            i += size
+        if not 0 <= i < size:
+            raise IndexError("domain index out of range")
+        return self._value(i)
+
+    def slice(self, start, stop):
+        """ Returns the elements of the domain from index start up to (but not
+            including) index stop as a list.  As for a slice of a list, 
+            negative indices count from the end, and None means the start or 
+            end of the domain. """
+        start, stop, _ = slice(start, stop).indices(self.max_size)
+        return [self._value(i) for i in xrange(start, stop)]
     
     @staticmethod
     def cast(obj):
@@ -55,9 +99,15 @@ class Domain(object):
     def _generate(self, n):
         """ Generator function called by draw().  This is an abstract method
             that must be customized by each subclass and must return a 
-            generator object.  """
+            generator object (or other iterator).  """
         raise NotImplementedError()
 
+    def _value(self, i):
+        """ Returns the i^th element of the domain, for 0 <= i < max_size. 
+            Subclasses compute it directly; this default steps through the
+            elements before it. """
+        return next(islice(self._generate(i + 1), i, None))
+
 class IntegerDomain(Domain):
     """ A domain containing unsigned integers. """
 
@@ -70,7 +120,16 @@ class IntegerDomain(Domain):
         return int(obj)
 
     def _generate(self, n):
-        return (i for i in xrange(n))
+        return iter(xrange(n))
+
+    def _value(self, i):
+        return i
+
+    def draw_array(self, n):
+        n = min(n, self.max_size)
+        if numpy is not None:
+            return numpy.arange(n, dtype=numpy.int64)
+        return array("l", xrange(n))
 
 class FloatDomain(Domain):
     """ A floating point domain.  Only includes floating point numbers
@@ -85,7 +144,16 @@ class FloatDomain(Domain):
         return float(obj)
 
     def _generate(self, n):
-        return (float(i) / 10.0 for i in xrange(n))
+        return imap(truediv, xrange(n), repeat(10.0))
+
+    def _value(self, i):
+        return float(i) / 10.0
+
+    def draw_array(self, n):
+        n = min(n, self.max_size)
+        if numpy is not None:
+            return numpy.arange(n, dtype=numpy.float64) / 10.0
+        return array("d", self._generate(n))
 
 class BoolDomain(Domain):
     """ A domain for boolean (True/False) values. """
@@ -102,6 +170,9 @@ class BoolDomain(Domain):
         values = [False, True]
         return (i for i in values[:n])
 
+    def _value(self, i):
+        return [False, True][i]
+
 class StringDomain(Domain):
     """ A domain for string values. The constructor includes a prefix
         parameter.  Generated strings are of the form 'prefix<n>'
@@ -119,6 +190,9 @@ class StringDomain(Domain):
     def _generate(self, n):
         return (self.prefix + str(i) for i in xrange(n))
 
+    def _value(self, i):
+        return self.prefix + str(i)
+
 class DateDomain(Domain):
     """ A domain for date values.  Generated dates start on <start>
         which defaults to January 1, 2000."""
@@ -129,7 +203,17 @@ class DateDomain(Domain):
         self.start = start
 
     def _generate(self, n):
-        return (self.start + timedelta(i) for i in xrange(n))
+        return _series(self.start, timedelta(1), n)
+
+    def _value(self, i):
+        return self.start + timedelta(i)
+
+    def draw_array(self, n):
+        n = min(n, self.max_size)
+        if numpy is not None:
+            return numpy.datetime64(self.start, "D") + \
+                   numpy.arange(n, dtype="timedelta64[D]")
+        return self.draw(n)
 
 class TimeDomain(Domain):
     """ A domain for time values.  Generated times start at <start>
@@ -144,7 +228,11 @@ class TimeDomain(Domain):
         self.start = start
 
     def _generate(self, n):
-        return ((self.start + timedelta(minutes=i)).time() for i in xrange(n))
+        return imap(datetime.datetime.time, 
+                    _series(self.start, timedelta(minutes=1), n))
+
+    def _value(self, i):
+        return (self.start + timedelta(minutes=i)).time()
 
 class DateTimeDomain(Domain):
     """ A domain for datetime values.  Generated datetimes start on <start>
@@ -159,15 +247,29 @@ class DateTimeDomain(Domain):
         self.start = start
 
     def _generate(self, n):
-        return (self.start + timedelta(minutes=i) for i in xrange(n))
+        return _series(self.start, timedelta(minutes=1), n)
+
+    def _value(self, i):
+        return self.start + timedelta(minutes=i)
+
+    def draw_array(self, n):
+        n = min(n, self.max_size)
+        if numpy is not None:
+            return numpy.datetime64(self.start, "us") + \
+                   numpy.arange(n, dtype="timedelta64[m]")
+        return self.draw(n)
 
 class EnumeratedDomain(Domain):
-    """ A domain whose values are explicitly provided by the caller. """
+    """ A domain whose values are explicitly provided by the caller.  The
+        values are held as an insertion-ordered set, so that adding a value
+        and testing membership take constant time.  Set operations keep the
+        order of the values of their operands. """
 
     def __init__(self):
         super(EnumeratedDomain, self).__init__()
         self._domain = list() # _domain is a list to enforce order; in add(),
                               # we will ensure its contents are unique
+        self._members = set() # Set of the values in _domain
 
     @property
     def size(self):
@@ -189,24 +291,45 @@ class EnumeratedDomain(Domain):
             __init__() on Domain tries to initialize max_size.  """
         pass         
 
+    def __contains__(self, value):
+        """ True iff value is in the domain. """
+        return value in self._members
+
     def add(self, elements):
-        """ Add an element or list of elements to the domain."""
+        """ Add an element or list of elements to the domain.  The new 
+            elements of a list are added in sorted order. """
         if isinstance(elements, list):
-            new_elements = set(elements) - set(self._domain)
-            self._domain += sorted(new_elements)
-        elif elements not in self._domain:
+            new_elements = sorted(set(elements) - self._members)
+            self._domain += new_elements
+            self._members.update(new_elements)
+        elif elements not in self._members:
             self._domain.append(elements)
+            self._members.add(elements)
+
+    def _extend(self, elements):
+        """ Add the elements that are not yet in the domain, in order. """
+        for element in elements:
+            if element not in self._members:
+                self._domain.append(element)
+                self._members.add(element)
 
     def _generate(self, n):
-        return (element for element in self._domain)
+        return iter(self._domain)
+
+    def _value(self, i):
+        return self._domain[i]
+
+    def slice(self, start, stop):
+        return self._domain[slice(start, stop)]
 
     ########################################
     # Methods to provide list-like interface
     def __add__(self, other):
         """ Return a new EnumeratedDomain composed of other appended to self."""
         result = EnumeratedDomain()
-        result.add(self._domain)
-        result.add(other._domain)
+        result._domain = list(self._domain)
+        result._members = set(self._members)
+        result._extend(other._domain)
         return result
 
     ########################################
@@ -215,8 +338,7 @@ class EnumeratedDomain(Domain):
         """ Return a new EnumeratedDomain that is the intersection of self and
             other. """
         result = EnumeratedDomain()
-        items = set(self._domain) & set(other._domain)
-        result.add(list(items))
+        result._extend(x for x in self._domain if x in other._members)
         return result
 
     def __and__(self, other):
@@ -226,11 +348,401 @@ class EnumeratedDomain(Domain):
         """ Return a new EnumeratedDomain that is the set difference of self and
             other. """
         result = EnumeratedDomain()
-        items = set(self._domain) - set(other._domain)
-        result.add(list(items))
+        result._extend(x for x in self._domain if x not in other._members)
         return result
 
     def __sub__(self, other):
         return self.difference(other)
 
-    
+class IntervalDomain(Domain):
+    """ A domain whose values are explicitly provided by the caller, like an
+        :class:`EnumeratedDomain`, but in which consecutive integers are 
+        stored as an interval, so that a range of a million integers costs 
+        no more than a single value.  Values are drawn in the order in which 
+        they were added, except that the values of a list or a range are 
+        added in sorted order, and set operations keep the order of the 
+        values of their operands (as for an EnumeratedDomain).  Set 
+        operations take time linear in the number of intervals and other 
+        values, rather than in the size of the domain. """
+
+    def __init__(self):
+        super(IntervalDomain, self).__init__()
+
+        # Runs of values in the order they are drawn: (first, last) for the
+        # integers first..last, or (value,) for any other value.
+        self._runs = []
+
+        # Index in the drawn order of the first value of each run, so that 
+        # the value at any index is found by a binary search of the runs.
+        self._offsets = []
+
+        # Index of the runs: the sorted, disjoint and non-adjacent intervals
+        # that hold every integer in the domain, and the set of other values.
+        self._intervals = []
+        self._singles = set()
+
+    @property
+    def size(self):
+        """ Size of the domain. """
+        if not self._runs:
+            return 0
+        return self._offsets[-1] + _length(self._runs[-1])
+
+    @property
+    def max_size(self):
+        """ Maximum size of the domain, which is just its size, as for an
+            :class:`EnumeratedDomain` (up to sys.maxsize). """
+        return min(self.size, sys.maxsize)
+
+    @max_size.setter
+    def max_size(self, value):
+        """ Max_size cannot be set, it is always calculated for this class. 
+            This setter is needed because __init__() on Domain tries to 
+            initialize max_size. """
+        pass
+
+    def __contains__(self, value):
+        """ True iff value is in the domain. """
+        if value in self._singles:
+            return True
+        integer = _integer(value)
+        return integer is not None and \
+               _find(self._intervals, integer) is not None
+
+    def add(self, elements):
+        """ Add an element or list of elements to the domain.  Of the equal
+            elements of a list (e.g. 3 and 3.0), the first is added. """
+        if isinstance(elements, list):
+            first = {} # Each distinct element -> its first occurrence
+            for element in elements:
+                first.setdefault(element, element)
+            values = first.values()
+            integers = sorted(x for x in values if type(x) in _INTEGERS)
+            others = [x for x in values if type(x) not in _INTEGERS]
+            self.add_intervals(_intervals_of(integers), others)
+        elif elements not in self:
+            if type(elements) in _INTEGERS:
+                self._append([(elements, elements)])
+            else:
+                self._append([(elements,)])
+
+    def add_range(self, first, last):
+        """ Add the integers first..last to the domain, in ascending order. 
+        """
+        self.add_intervals([(first, last)])
+
+    def add_intervals(self, intervals, others=()):
+        """ Add the integers in a sorted list of disjoint (first, last) 
+            intervals and a collection of other values to the domain, in 
+            sorted order, skipping those already in the domain. """
+        intervals = _subtract(intervals, self._holes())
+        others = [x for x in others if x not in self and 
+                  _find(intervals, _integer(x)) is None]
+        self._append(_sorted_runs(intervals, others))
+
+    def runs(self):
+        """ Returns the values of the domain, in the order they are drawn, as
+            a list of runs: (first, last) for the integers first..last, or 
+            (value,) for any other value. """
+        return list(self._runs)
+
+    def _generate(self, n):
+        return islice(chain.from_iterable(
+            xrange(run[0], run[1] + 1) if len(run) == 2 else run
+            for run in self._runs), n)
+
+    def _value(self, i):
+        j = bisect_right(self._offsets, i) - 1
+        return self._runs[j][0] + (i - self._offsets[j]) \
+               if len(self._runs[j]) == 2 else self._runs[j][0]
+
+    def slice(self, start, stop):
+        start, stop, _ = slice(start, stop).indices(self.max_size)
+        if start >= stop:
+            return []
+        j = bisect_right(self._offsets, start) - 1
+        first = self._runs[j]
+        skip = start - self._offsets[j]
+        if len(first) == 2: # Start part way through an integer run
+            first = (first[0] + skip, first[1])
+        n = stop - start
+        runs = chain([first], islice(self._runs, j + 1, None))
+        return list(islice(chain.from_iterable(
+            islice(count(run[0]), min(_length(run), n)) if len(run) == 2 
+            else run for run in runs), n))
+
+    def _append(self, runs):
+        """ Append runs of values that are not yet in the domain. """
+        for run in runs:
+            if len(run) == 1:
+                self._singles.add(run[0])
+                self._offsets.append(self.size)
+                self._runs.append(run)
+                continue
+
+            first, last = run
+            if self._runs and len(self._runs[-1]) == 2 and \
+               self._runs[-1][1] + 1 == first: # Extend the last run
+                first = self._runs.pop()[0]
+                self._offsets.pop()
+            self._offsets.append(self.size)
+            self._runs.append((first, last))
+            _insert(self._intervals, run)
+
+    def _holes(self):
+        """ Returns the sorted intervals of integers that are equal to a value
+            in the domain, including integral values that are not integers 
+            (e.g. 2.0). """
+        points = set(_integer(x) for x in self._singles) - set([None])
+        if not points:
+            return self._intervals
+        return _merge(self._intervals + [(x, x) for x in points])
+
+    ########################################
+    # Methods to provide list-like interface
+    def __add__(self, other):
+        """ Return a new domain composed of other appended to self. """
+        result = type(self)()
+        result._append(self._runs)
+        result._append(_select(other._runs, self, inside=False))
+        return result
+
+    ########################################
+    # Methods to provide set-like interface
+    def intersect(self, other):
+        """ Return a new domain that is the intersection of self and other. 
+        """
+        result = type(self)()
+        result._append(_select(self._runs, other, inside=True))
+        return result
+
+    def __and__(self, other):
+        return self.intersect(other)
+
+    def difference(self, other):
+        """ Return a new domain that is the set difference of self and other.
+        """
+        result = type(self)()
+        result._append(_select(self._runs, other, inside=False))
+        return result
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+class DomainView(object):
+    """ A read-only sequence of the elements of a domain from index start up 
+        to (but not including) index stop, which computes each element when 
+        it is used rather than holding them all in memory.  A view supports 
+        len(), indexing, slicing (which returns another view), iteration, 
+        and comparison with another sequence.  The length of the view is 
+        fixed when it is created, so the domain should not be changed while 
+        the view is in use. """
+
+    #: Number of elements computed at a time when iterating from an index 
+    #: other than 0
+    CHUNK = 4096
+
+    __hash__ = None # Views compare by value, like lists
+
+    def __init__(self, domain, start=0, stop=None):
+        super(DomainView, self).__init__()
+        start, stop, _ = slice(start, stop).indices(domain.max_size)
+        self.domain = domain          #: Domain whose elements are viewed
+        self.start = start            #: Index in domain of the first element
+        self.stop = max(start, stop)  #: Index in domain after the last one
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return DomainView(self.domain, self.start + start, 
+                                  self.start + max(start, stop))
+            return [self[i] for i in xrange(start, stop, step)]
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("view index out of range")
+        return self.domain.nth(self.start + key)
+
+    def __iter__(self):
+        if self.start == 0: # As for draw()
+            return islice(self.domain._generate(self.stop), self.stop)
+        return chain.from_iterable(
+            self.domain.slice(i, min(i + self.CHUNK, self.stop))
+            for i in xrange(self.start, self.stop, self.CHUNK))
+
+    def __eq__(self, other):
+        try:
+            if len(self) != len(other):
+                return False
+        except TypeError:
+            return NotImplemented
+        return all(x == y for x, y in izip(self, other))
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self):
+        return "DomainView({0!r}, {1}, {2})".format(self.domain, self.start,
+                                                     self.stop)
+
+    def cycle(self):
+        """ Returns an iterator that repeats the elements of the view in an 
+            endless loop, like :func:`itertools.cycle` but without keeping a 
+            copy of the elements. """
+        if not len(self):
+            return iter(())
+        return chain.from_iterable(repeat(self))
+
+def _series(start, step, n):
+    """ Returns an iterator of start, start + step, start + 2*step, ... (n 
+        values) that steps through the values without running any Python
+        code per value. """
+    return imap(add, repeat(start, n), imap(mul, repeat(step, n), xrange(n)))
+
+########################################
+# Interval arithmetic for IntervalDomain.  Intervals are (first, last) pairs
+# of integers, and lists of intervals are sorted, disjoint and non-adjacent
+# unless otherwise noted.
+
+_INTEGERS = frozenset([int, long]) # Types of values stored in intervals
+_NUMBERS = (int, long, float)      # Types that sort before all other values
+
+def _integer(value):
+    """ Returns value as an integer if it is a number with an integral value,
+        else None. """
+    if isinstance(value, _NUMBERS):
+        try:
+            if value == int(value):
+                return int(value)
+        except (ValueError, OverflowError): # NaN or infinity
+            pass
+    return None
+
+def _length(run):
+    """ Returns the number of values in a run of an IntervalDomain. """
+    return run[1] - run[0] + 1 if len(run) == 2 else 1
+
+def _find(intervals, value):
+    """ Returns the index of the interval that holds value, or None. """
+    if value is None:
+        return None
+    i = bisect_right(intervals, (value, float("inf"))) - 1
+    return i if i >= 0 and intervals[i][1] >= value else None
+
+def _insert(intervals, interval):
+    """ Insert an interval that overlaps no other into intervals, merging it
+        with any adjacent intervals. """
+    first, last = interval
+    i = bisect_right(intervals, interval)
+    if i < len(intervals) and intervals[i][0] == last + 1:
+        last = intervals.pop(i)[1]
+    if i > 0 and intervals[i - 1][1] + 1 == first:
+        i -= 1
+        first = intervals.pop(i)[0]
+    intervals.insert(i, (first, last))
+
+def _intervals_of(integers):
+    """ Returns the intervals that hold a sorted list of distinct integers. 
+    """
+    result = []
+    for x in integers:
+        if result and result[-1][1] + 1 == x:
+            result[-1] = (result[-1][0], x)
+        else:
+            result.append((x, x))
+    return result
+
+def _merge(intervals):
+    """ Returns the union of a list of intervals that may overlap and need
+        not be sorted. """
+    result = []
+    for first, last in sorted(intervals):
+        if result and first <= result[-1][1] + 1:
+            result[-1] = (result[-1][0], max(last, result[-1][1]))
+        else:
+            result.append((first, last))
+    return result
+
+def _intersect(left, right):
+    """ Returns the intersection of two lists of intervals. """
+    result = []
+    i, j = 0, 0
+    while i < len(left) and j < len(right):
+        first = max(left[i][0], right[j][0])
+        last = min(left[i][1], right[j][1])
+        if first <= last:
+            result.append((first, last))
+        if left[i][1] < right[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+def _subtract(left, right):
+    """ Returns the intervals of left less those of right.  Left need only be
+        sorted and disjoint. """
+    result = []
+    j = 0
+    for first, last in left:
+        while j < len(right) and right[j][1] < first:
+            j += 1
+        k = j
+        while k < len(right) and right[k][0] <= last:
+            if right[k][0] > first:
+                result.append((first, right[k][0] - 1))
+            first = right[k][1] + 1
+            k += 1
+        if first <= last:
+            result.append((first, last))
+    return result
+
+def _window(intervals, first, last):
+    """ Returns the intervals that overlap the interval first..last. """
+    i = bisect_right(intervals, (first, float("inf"))) - 1
+    if i < 0 or intervals[i][1] < first:
+        i += 1
+    return intervals[i:bisect_right(intervals, (last, float("inf")))]
+
+def _select(runs, domain, inside):
+    """ Yields the parts of runs whose values are in domain (if inside) or 
+        are not in domain (otherwise), in order. """
+    holes = domain._holes()
+    for run in runs:
+        if len(run) == 1:
+            if (run[0] in domain) == inside:
+                yield run
+        else:
+            window = _window(holes, run[0], run[1])
+            for part in (_intersect if inside else _subtract)([run], window):
+                yield part
+
+def _sorted_runs(intervals, others):
+    """ Returns runs holding the integers in intervals and the other values,
+        in sorted order.  An interval is split around any number that falls
+        within it (e.g. 1.5 within 1..3). """
+    runs = []
+    intervals = list(intervals)
+    i = 0
+    for value in sorted(others):
+        if isinstance(value, _NUMBERS):
+            while i < len(intervals) and intervals[i][1] < value:
+                runs.append(intervals[i])
+                i += 1
+            if i < len(intervals) and intervals[i][0] < value:
+                first, last = intervals[i]
+                split = int(math.floor(value))
+                runs.append((first, split))
+                intervals[i] = (split + 1, last)
+        else: # Numbers sort before all other values
+            runs.extend(intervals[i:])
+            i = len(intervals)
+        runs.append((value,))
+    runs.extend(intervals[i:])
+    return runs
+
@@ -8,7 +8,7 @@
 """
 
 import re
-from lib.ModelElement import ModelElementSet, ModelElement
+from lib.ModelElement import ModelElementSet, ModelElement, ModelChange
 
 class FactTypeSet(ModelElementSet):
     """ Container for a set of fact types. """
@@ -20,6 +20,11 @@ class FactTypeSet(ModelElementSet):
 class FactType(ModelElement):
     """ An ORM Fact Type. """
 
+    # _model is set by lib.Model.Model while the fact type is in a model, so
+    # that roles added later are registered and reported to the model.
+    __slots__ = ("roles", "covered_by", "_model")
+    _transient = ("_model",)
+
     def __init__(self, *args, **kwargs):
         super(FactType, self).__init__(*args, **kwargs)
 
@@ -27,6 +32,8 @@ class FactType(ModelElement):
         self.covered_by = []  #: Constraints that cover the fact type (rather
                               #: than covering role(s) of the fact type).
                               #: Populated when a constraint is committed.
+        self._model = None
+
     @property
     def fullname(self):
         """ Returns name that is unique within the model. """
@@ -38,12 +45,12 @@ class FactType(ModelElement):
             role.commit()
 
     def rollback(self):
-        """ Rollback any side effects of adding this fact type to a model."""
-        # I haven't decided what rollback() should do here.  Obviously, at least
-        # it should call rollback() for each of its role.  But, if we rollback
-        # a fact type, should we also rollback (or delete) associated
-        # constraints, join paths, etc?  What if this is objectified, etc?
-        raise NotImplementedError()
+        """ Rollback any side effects of adding this fact type to a model.
+            Constraints and objectified types that refer to this fact type are
+            not rolled back; the caller must remove them first (see 
+            :mod:`lib.ModelDiff`). """
+        for role in self.roles:
+            role.rollback()
 
     def add_role(self, player, name=None, uid=None):
         """ Add a role played by *player* to the fact type.  If *name* is None
@@ -63,6 +70,12 @@ class FactType(ModelElement):
 
         role = Role(fact_type=self, player=player, name=name, uid=uid)
         self.roles.append(role)
+
+        # _model is unset if the fact type was loaded from a snapshot
+        model = getattr(self, "_model", None)
+        if model is not None:
+            model.registry.add(role)
+            model.notify(ModelChange.MODIFIED, self)
         return role
 
     def arity(self):
@@ -72,6 +85,10 @@ class FactType(ModelElement):
 class Role(ModelElement):
     """ A role in a fact type. """
 
+    # root_role is only set by lib.Transformation.RootRoleTransformation
+    __slots__ = ("fact_type", "player", "covered_by", "mandatory", "unique",
+                 "root_role")
+
     def __init__(self, fact_type=None, player=None, *args, **kwargs):
         super(Role, self).__init__(*args, **kwargs)
 
@@ -99,18 +116,19 @@ class Role(ModelElement):
     def commit(self):
         """ Commit any side effects of adding this role to a model."""
         self.player.roles.append(self) # Add to roles played by object type
+        self.player.invalidate()
 
     def rollback(self):
         """ Rollback any side effects of adding this role to a model."""
-        # I haven't decided what to do here.  At minimum, I need to remove
-        # the role from self.player.roles.  However, should I also rollback
-        # constraints in self.covered_by?  Should I rollback the containing
-        # fact type?  What about join paths through this role?  Etc.
-        raise NotImplementedError()
+        try: self.player.roles.remove(self)
+        except ValueError: pass
+        self.player.invalidate()
 
 class RoleSequence(list):
     """ A sequence of roles. """
 
+    __slots__ = ("join_path",)
+
     def __init__(self, roles=None, join_path=None, *args, **kwargs):
         super(RoleSequence, self).__init__(*args, **kwargs)
 
@@ -6,12 +6,27 @@
 
 """ Model.py provides a class to store a simplified ORM model
     consisting of a set of object types, a set of fact types, and a set of
-    constraints.
+    constraints.  Every element of a model, including the roles of its fact
+    types, can be looked up by uid or by full name in constant time.
+
+    A model reports each change to the callbacks that subscribe to it, as a
+    :class:`lib.ModelElement.ModelChange`, so that structures derived from
+    the model (e.g. a :class:`lib.SubtypeGraph.SubtypeGraph`) can update 
+    themselves rather than be rebuilt.  For example, to keep a journal of 
+    the changes made by a transformation: ::
+
+        journal = []
+        model.subscribe(journal.append)
+        AbsorptionTransformation(model).execute()
+        model.unsubscribe(journal.append)
 """
 
 from lib.ObjectType import ObjectTypeSet, ObjectType
 from lib.FactType import FactTypeSet, FactType
 from lib.Constraint import ConstraintSet, Constraint
+from lib.ModelElement import ModelChange
+import lib.Snapshot as Snapshot
+import lib.ModelClone as ModelClone
 
 class Model(object):
     """ Simplified representation of an ORM model. """
@@ -29,29 +44,92 @@ class Model(object):
         #: (:class:`lib.Constraint.ConstraintSet`)
         self.constraints = ConstraintSet()
 
+        #: Index of the model's elements and roles by uid and full name
+        #: (:class:`ElementRegistry`)
+        self.registry = ElementRegistry()
+
+        self._subscribers = [] # Callbacks that receive each ModelChange
+        self._fingerprint = None # Fingerprint, created on first use
+
     def get(self, full_name):
-        """ Get a model element by name from the model. """
-        if full_name.startswith('ObjectTypes.'):
-            _set = self.object_types
-        elif full_name.startswith('FactTypes.'):
-            _set = self.fact_types
-        elif full_name.startswith('Constraints.'):
-            _set = self.constraints
-        else:
-            _set = None
+        """ Get a model element (or role) by full name from the model, e.g.
+            ``ObjectTypes.Person`` or ``FactTypes.PersonHasName.Roles.Person``.
+            Returns **None** if there is no such element. """
+        return self.registry.get(full_name)
 
-        return _set.get(full_name.partition(".")[2]) if _set else None
+    def get_by_uid(self, uid):
+        """ Get a model element (or role) by uid from the model.  Returns 
+            **None** if there is no such element. """
+        return self.registry.get_by_uid(uid)
 
-    def add(self, model_element):
-        """ Add a model element to the model. """        
+    def add(self, model_element, commit=True):
+        """ Add a model element to the model.  If *commit* is False, the side
+            effects of the element are assumed to be in place already, and 
+            no commit is reported to subscribers. """
         self._container_for(model_element).add(model_element)
-        model_element.commit() # Commit side effects (if any)
+        self.registry.add(model_element) # After add, which may rename it
+        if isinstance(model_element, (Constraint, FactType)):
+            model_element._model = self
+
+        self.notify(ModelChange.ADDED, model_element)
+        if commit:
+            model_element.commit() # Commit side effects (if any)
 
     def remove(self, model_element):
         """ Remove the model element from the model. """
         self._container_for(model_element).remove(model_element)        
+        self.registry.remove(model_element)
         model_element.rollback() # Rollback side effects (if any)
 
+        if isinstance(model_element, (Constraint, FactType)):
+            model_element._model = None
+        self.notify(ModelChange.REMOVED, model_element)
+
+    def subscribe(self, callback):
+        """ Call *callback* with a :class:`lib.ModelElement.ModelChange` for 
+            each subsequent change to the model. """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """ Stop calling *callback* for changes to the model. """
+        self._subscribers.remove(callback)
+
+    def notify(self, kind, model_element):
+        """ Report a change of *kind* to *model_element* to the subscribers.
+            This is called by the model, by its constraints and fact types,
+            and by transformations. """
+        if self._subscribers:
+            change = ModelChange(kind, model_element)
+            for callback in list(self._subscribers):
+                callback(change)
+
+    def fingerprint(self):
+        """ Returns a string that identifies the semantic content of the model,
+            and is updated incrementally as the model changes.  See 
+            :mod:`lib.ModelFingerprint`. """
+        if self._fingerprint is None:
+            # Deferred: lib.ModelFingerprint indirectly imports this module
+            from lib.ModelFingerprint import Fingerprint
+            self._fingerprint = Fingerprint(self)
+        return self._fingerprint.hexdigest()
+
+    def clone(self):
+        """ Returns a copy of the model that shares no mutable state with it.
+            See :mod:`lib.ModelClone`. """
+        return ModelClone.clone(self)
+
+    def save(self, path):
+        """ Save the model to a binary snapshot file at *path*.  See
+            :mod:`lib.Snapshot`. """
+        with open(path, "wb") as stream:
+            Snapshot.dump(self, stream)
+
+    @staticmethod
+    def load(path):
+        """ Returns the model saved to the snapshot file at *path*. """
+        with open(path, "rb") as stream:
+            return Snapshot.load(stream)
+
     def display(self):
         """ Prints the model to stdout. """
         self.object_types.display()
@@ -69,4 +147,47 @@ class Model(object):
         else:
             raise ValueError("Unexpected model element type")
 
+class ElementRegistry(object):
+    """ Index of the elements of a model, and of the roles of its fact types,
+        by uid and by full name.  :class:`Model` keeps the registry up to 
+        date as elements are added and removed, and a fact type in the 
+        model registers roles that are added to it later. """
+
+    def __init__(self):
+        self._by_uid = {}
+        self._by_fullname = {}
+
+    def __len__(self):
+        """ Returns the number of registered elements, including roles. """
+        return len(self._by_uid)
+
+    def add(self, element):
+        """ Register element, and the roles of element if it is a fact 
+            type. """
+        self._by_uid[element.uid] = element
+        self._by_fullname[element.fullname] = element
+
+        if isinstance(element, FactType):
+            for role in element.roles:
+                self.add(role)
+
+    def remove(self, element):
+        """ Unregister element and its roles, if they are registered. """
+        if isinstance(element, FactType):
+            for role in element.roles:
+                self.remove(role)
+
+        for index, key in [(self._by_uid, element.uid),
+                           (self._by_fullname, element.fullname)]:
+            if index.get(key) is element:
+                del index[key]
+
+    def get(self, full_name):
+        """ Retrieve an element by full name.  Returns **None** if the element
+            is not registered. """
+        return self._by_fullname.get(full_name)
 
+    def get_by_uid(self, uid):
+        """ Retrieve an element by uid.  Returns **None** if the element is 
+            not registered. """
+        return self._by_uid.get(uid)
@@ -0,0 +1,139 @@
+##############################################################################
+# Package: ormpy
+# File:    ModelCache.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" ModelCache.py provides a content-addressed, on-disk cache of models loaded
+    by :class:`lib.NormaLoader.NormaLoader`.  Each cache entry is keyed by the
+    hash of the .orm file's contents and the loader options, and stores the
+    fully linked :class:`lib.Model.Model`, as a :mod:`lib.Snapshot`, along
+    with the loader's omissions, unexpected nodes and slice boundary.  For 
+    example: ::
+
+        cache = ModelCache("/path/to/cache")
+        model = NormaLoader("/path/to/file/example.orm", cache=cache).model
+
+    Entries that have not been used for :attr:`ModelCache.max_age` seconds are
+    evicted, as are the least recently used entries whenever the total size of
+    the cache exceeds :attr:`ModelCache.max_size` bytes.
+"""
+
+import os
+import sys
+import time
+import errno
+import marshal
+import hashlib
+import logging
+import tempfile
+
+import lib.Snapshot as Snapshot
+
+class ModelCache(object):
+    """ A directory of cached models. """
+
+    VERSION = 3 #: Incremented whenever the format of an entry changes.
+
+    EXTENSION = ".model" #: File extension of a cache entry.
+
+    DEFAULT_MAX_SIZE = 512 * 1024 * 1024 #: Default maximum size (bytes)
+    DEFAULT_MAX_AGE = 30 * 24 * 60 * 60  #: Default maximum age (seconds)
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE,
+                 max_age=DEFAULT_MAX_AGE):
+        self.directory = directory #: Directory containing the cache entries
+        self.max_size = max_size   #: Maximum total size of entries in bytes
+        self.max_age = max_age     #: Maximum seconds since an entry was used
+
+        # See http://stackoverflow.com/a/14364249
+        try:
+            os.makedirs(directory)
+        except OSError:
+            if not os.path.isdir(directory): raise
+
+    def key(self, filename, *options):
+        """ Returns the cache key for *filename* loaded with *options*. """
+        sha = hashlib.sha1()
+
+        with open(filename, "rb") as stream:
+            for chunk in iter(lambda: stream.read(1 << 20), ""):
+                sha.update(chunk)
+
+        sha.update(repr((ModelCache.VERSION,) + options))
+        return sha.hexdigest()
+
+    def get(self, key):
+        """ Returns the (model, omissions, unexpected, boundary) tuple stored
+            under key, or **None** if there is no such entry. """
+        path = self._path(key)
+
+        try:
+            with open(path, "rb") as stream:
+                omissions, unexpected, boundary = marshal.load(stream)
+                entry = (Snapshot.load(stream), omissions, set(unexpected),
+                         boundary)
+        except EnvironmentError as ex:
+            if ex.errno != errno.ENOENT: raise
+            return None
+        except Exception: # Corrupt entry
+            logging.getLogger(__name__).debug("Removing corrupt %s", path)
+            self._remove(path)
+            return None
+
+        os.utime(path, None) # Mark entry as recently used
+        return entry
+
+    def put(self, key, model, omissions, unexpected, boundary=()):
+        """ Store a model under key, and then evict old entries. """
+        handle, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(handle, "wb") as stream:
+                notes = (omissions, list(unexpected), list(boundary))
+                marshal.dump(notes, stream, 2)
+                Snapshot.dump(model, stream)
+            os.rename(temp, self._path(key)) # Atomic on POSIX
+        except Exception:
+            # A model that can't be cached is still a valid model.
+            logging.getLogger(__name__).debug("Could not cache model",
+                                              exc_info=sys.exc_info())
+            self._remove(temp)
+
+        self.evict()
+
+    def evict(self):
+        """ Remove entries older than self.max_age, and then remove the least
+            recently used entries until the cache is no larger than
+            self.max_size. """
+        now = time.time()
+        entries = []
+
+        for name in os.listdir(self.directory):
+            if name.endswith(ModelCache.EXTENSION):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue # Removed by another process
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+
+        for mtime, size, path in entries:
+            if now - mtime > self.max_age or total > self.max_size:
+                self._remove(path)
+                total -= size
+
+    def _path(self, key):
+        """ Returns the path of the entry for key. """
+        return os.path.join(self.directory, key + ModelCache.EXTENSION)
+
+    @staticmethod
+    def _remove(path):
+        """ Remove a file, if it exists. """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,188 @@
+##############################################################################
+# Package: ormpy
+# File:    ModelClone.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" ModelClone.py makes an independent copy of a :class:`lib.Model.Model`,
+    so that a model can be transformed (e.g. by :class:`lib.ORMMinusModel`)
+    while the original is kept for later runs.  Cloning is much faster than
+    loading the model again, because no XML is parsed and no constraint is
+    committed: each element is copied attribute by attribute, and every
+    reference between elements (roles, covered_by lists, subtype links, join
+    paths, and so on) is redirected to the copy of its target.  For example: ::
+
+        model = NormaLoader("/path/to/file/example.orm").model
+        ormminus = ORMMinusModel(model.clone())  # model is unchanged
+
+    Domains, join paths and role sequences are copied too, and an object
+    shared by several elements (e.g. a value constraint's domain, which is
+    also the domain of the constrained object type) is copied once and
+    remains shared.  As in :mod:`lib.Snapshot`, plain lists are assumed not
+    to be shared.  Immutable values such as strings and dates are shared
+    with the original model.
+"""
+
+import gc
+from datetime import date, time, datetime, timedelta
+
+from lib.ModelElement import ModelElement, slots
+from lib.Constraint import Constraint
+
+# Types whose values are shared by the copy rather than copied
+IMMUTABLE = frozenset([type(None), bool, int, long, float, str, unicode,
+                       date, time, datetime, timedelta])
+
+def clone(model):
+    """ Returns a copy of *model* that shares no mutable state with it. """
+    # Suspend the cyclic garbage collector, which would otherwise dominate
+    # the run time on a large model, as in lib.Snapshot.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _Cloner().clone(model)
+    finally:
+        if enabled: gc.enable()
+
+class _Cloner(object):
+    """ Copies the object graph of a model. """
+
+    def __init__(self):
+        self.memo = {}     # id() of original object -> copy
+        self.keep = []     # Keeps originals alive, so that ids stay unique
+        self.pending = []  # (original, copy) of elements not yet filled in
+        self.fields = {}   # Class -> ([(getter, setter)] of its slots,
+                           #          whether it has a __dict__)
+
+    def clone(self, model):
+        """ Returns a copy of model. """
+        from lib.Model import Model # Deferred: lib.Model imports this module
+
+        # Constraints are added in their original order, since of_type()
+        # returns them in insertion order.
+        tables = [list(model.object_types), list(model.fact_types),
+                  model.constraints.of_type(Constraint)]
+        roles = [role for fact_type in tables[1] for role in fact_type.roles]
+
+        # Allocate the copies of the model's elements up front, so that most
+        # references can be redirected by a single lookup in self.memo.
+        # Elements are filled in iteratively rather than recursively, since
+        # the chain of references in a large model can be very long.
+        for originals in tables + [roles]:
+            for obj in originals:
+                self.element(obj)
+        while self.pending:
+            self.fill(*self.pending.pop())
+
+        result = Model()
+        memo = self.memo
+        for originals in tables:
+            for obj in originals:
+                result.add(memo[id(obj)], commit=False) # Side effects copied
+        return result
+
+    def element(self, obj):
+        """ Returns the copy of a model element, which may not be filled in
+            yet. """
+        try:
+            return self.memo[id(obj)]
+        except KeyError:
+            cls = type(obj)
+            self.memo[id(obj)] = copy = cls.__new__(cls)
+            self.keep.append(obj)
+            self.pending.append((obj, copy))
+            return copy
+
+    def fill(self, obj, copy):
+        """ Set the attributes of copy to copies of the attributes of obj. """
+        cls = type(obj)
+        try:
+            fields, has_dict = self.fields[cls]
+        except KeyError:
+            # Bound once per class, rather than looked up once per attribute
+            fields = [(slot.__get__, slot.__set__) for _, slot in slots(cls)]
+            has_dict = hasattr(obj, "__dict__")
+            self.fields[cls] = (fields, has_dict)
+
+        memo = self.memo
+        for get, put in fields:
+            try:
+                attr = get(obj, cls)
+            except AttributeError:
+                continue # Slot has not been set
+
+            # Inline the commonest cases of self.value and self.list
+            kind = type(attr)
+            if kind is list:
+                try:
+                    attr = [memo[id(x)] for x in attr]
+                except KeyError:
+                    attr = self.list(attr)
+            elif kind not in IMMUTABLE:
+                try:
+                    attr = memo[id(attr)]
+                except KeyError: # Not yet copied
+                    attr = self.value(attr)
+            put(copy, attr)
+
+        if has_dict:
+            attrs = copy.__dict__
+            attrs.update(obj.__dict__)
+            for name, attr in obj.__dict__.iteritems():
+                if type(attr) not in IMMUTABLE:
+                    attrs[name] = self.value(attr)
+
+    def list(self, values):
+        """ Returns the copy of a list.  Lists of elements and lists of
+            immutable values make up the bulk of a model, and are copied
+            without a call to self.value per item. """
+        memo = self.memo
+        try:
+            return [memo[id(x)] for x in values]
+        except KeyError:
+            if IMMUTABLE.issuperset(map(type, values)):
+                return list(values) # e.g. contents of an EnumeratedDomain
+            return map(self.value, values)
+
+    def value(self, value):
+        """ Returns the copy of an attribute value. """
+        cls = type(value)
+        if cls in IMMUTABLE:
+            return value
+        elif cls is list: # Not shared, as in lib.Snapshot
+            return self.list(value)
+
+        try:
+            return self.memo[id(value)] # Includes every element seen so far
+        except KeyError:
+            pass
+
+        if isinstance(value, ModelElement):
+            return self.element(value)
+        elif cls is tuple:
+            if IMMUTABLE.issuperset(map(type, value)):
+                copy = tuple(list(value)) # e.g. an interval of a domain
+            else:
+                copy = tuple(map(self.value, value))
+        elif cls is dict:
+            copy = dict((self.value(k), self.value(v))
+                        for k, v in value.iteritems())
+        elif cls in (set, frozenset):
+            if IMMUTABLE.issuperset(map(type, value)):
+                copy = cls(value)
+            else:
+                copy = cls(map(self.value, value))
+        elif isinstance(value, list): # e.g. RoleSequence
+            copy = cls.__new__(cls)
+            copy.extend(self.list(value))
+            self.fill(value, copy)
+        elif hasattr(value, "__dict__") or slots(cls): # e.g. Domain, JoinPath
+            copy = cls.__new__(cls)
+            self.memo[id(value)] = copy # Before filling, in case of cycles
+            self.fill(value, copy)
+        else:
+            return value # Assumed to be immutable
+
+        self.memo[id(value)] = copy
+        self.keep.append(value)
+        return copy
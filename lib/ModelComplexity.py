@@ -0,0 +1,216 @@
+##############################################################################
+# Package: ormpy
+# File:    ModelComplexity.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" ModelComplexity.py measures the size and shape of a
+    :class:`lib.Model.Model`, to predict the cost of checking and populating
+    it before that work is started.  For example, to skip models whose
+    population would be too large: ::
+
+        model = NormaLoader("/path/to/file/example.orm").model
+        report = ComplexityReport(model, ubound=10)
+        if report.rows > 10**6:
+            print "Model is too large to populate."
+
+    The report is computed from the model as loaded, without solving its
+    system of inequalities, so the row estimate is an upper bound: it
+    assumes each object type and fact type reaches the smaller of *ubound*
+    and the largest size its domain or roles permit.
+"""
+
+from collections import Counter
+
+from lib.ORMMinusModel import ORMMinusModel
+from lib.ModelPartition import components
+from lib.Constraint import Constraint, FrequencyConstraint, \
+                           SubsetConstraint, SubtypeConstraint
+
+class ComplexityReport(object):
+    """ Measures of the complexity of a model under an upper bound on the
+        size of each model element. """
+
+    def __init__(self, model, ubound=ORMMinusModel.DEFAULT_SIZE):
+        self.ubound = ubound #: Upper bound on model element sizes
+
+        #: Number of ObjectTypes, FactTypes, Roles and Constraints
+        self.counts = Counter()
+
+        #: Number of object types, fact types and constraints by class name
+        self.kinds = Counter()
+
+        #: Number of fact types of each arity (number of roles)
+        self.arity = Counter()
+
+        #: Number of frequency (and uniqueness) constraints by span (number
+        #: of roles covered)
+        self.spans = Counter()
+
+        #: Length of the longest chain of subset constraints, where each
+        #: constraint leads from the fact types of its subset roles to those
+        #: of its superset roles.  A cycle counts as a single step.
+        self.subset_depth = 0
+
+        #: Largest number of fact types that one fact type is directly a
+        #: subset of
+        self.subset_fanout = 0
+
+        #: Length of the longest chain of subtype links
+        self.subtype_depth = 0
+
+        #: (product, fact type) for the fact type with the largest product of
+        #: the bounds of its roles, or None if the model has no fact types
+        self.largest_product = None
+
+        #: Upper estimate of the number of rows in a population of the model
+        self.rows = 0
+
+        #: Number of elements in each connected component of the model (see
+        #: :mod:`lib.ModelPartition`), largest first
+        self.components = []
+
+        self._count(model)
+        self._measure_constraints(model)
+        self._estimate_rows(model)
+        self.components = sorted((len(x) for x in components(model)),
+                                 reverse=True)
+
+    def _count(self, model):
+        """ Count the elements of the model. """
+        for kind, elements in [("ObjectTypes", model.object_types),
+                               ("FactTypes", model.fact_types),
+                               ("Constraints",
+                                model.constraints.of_type(Constraint))]:
+            for element in elements:
+                self.counts[kind] += 1
+                self.kinds[type(element).__name__] += 1
+
+        for fact_type in model.fact_types:
+            self.counts["Roles"] += len(fact_type.roles)
+            self.arity[len(fact_type.roles)] += 1
+
+    def _measure_constraints(self, model):
+        """ Measure frequency constraint spans and the subset and subtype
+            graphs. """
+        for cons in model.constraints.of_type(FrequencyConstraint):
+            self.spans[len(cons.covers)] += 1
+
+        subsets = {} # Fact type -> set of fact types it is a subset of
+        for cons in model.constraints.of_type(SubsetConstraint):
+            sources = set(_fact_types(cons.subset))
+            targets = set(_fact_types(cons.superset))
+            for source in sources:
+                subsets.setdefault(source, set()).update(targets -
+                                                         set([source]))
+        self.subset_depth = longest_path(subsets)
+        self.subset_fanout = max([len(x) for x in subsets.itervalues()] or [0])
+
+        subtypes = {} # Object type -> set of its direct supertypes
+        for cons in model.constraints.of_type(SubtypeConstraint):
+            subtypes.setdefault(cons.subtype, set()).add(cons.supertype)
+        self.subtype_depth = longest_path(subtypes)
+
+    def _estimate_rows(self, model):
+        """ Estimate the size of a population of the model. """
+        for obj_type in model.object_types:
+            self.rows += self._bound(obj_type)
+
+        for fact_type in model.fact_types:
+            product = 1
+            for role in fact_type.roles:
+                player = getattr(role, "player", None)
+                product *= self._bound(player) if player else self.ubound
+
+            if self.largest_product is None or \
+               product > self.largest_product[0]:
+                self.largest_product = (product, fact_type)
+            self.rows += min(self.ubound, product)
+
+    def _bound(self, obj_type):
+        """ Upper bound on the population of an object type. """
+        return min(self.ubound, obj_type.domain.max_size)
+
+    def display(self):
+        """ Prints the report to stdout. """
+        print "Element counts:"
+        for kind in ["ObjectTypes", "FactTypes", "Roles", "Constraints"]:
+            print " "*3, "{0:<32}{1:8d}".format(kind, self.counts[kind])
+        for kind in sorted(self.kinds):
+            print " "*3, "{0:<32}{1:8d}".format(kind, self.kinds[kind])
+
+        for title, histogram in [("Fact type arity:", self.arity),
+                                 ("Frequency constraint span:", self.spans)]:
+            print title
+            for size in sorted(histogram):
+                print " "*3, "{0:<32}{1:8d}".format(size, histogram[size])
+
+        print "Subset constraint depth: {0}".format(self.subset_depth)
+        print "Subset constraint fan-out: {0}".format(self.subset_fanout)
+        print "Subtype depth: {0}".format(self.subtype_depth)
+        if self.largest_product:
+            product, fact_type = self.largest_product
+            print "Largest role bound product (upper bound {0}): {1} ({2})"\
+                  .format(self.ubound, product, fact_type.fullname)
+        print "Estimated population rows: {0}".format(self.rows)
+        print "Connected components: {0} (largest: {1} elements)".format(
+            len(self.components), self.components[0] if self.components else 0)
+
+def longest_path(graph):
+    """ Returns the number of edges on the longest path in *graph*, a
+        dictionary from each node to the set of its successors.  The nodes
+        of a cycle are treated as a single node. """
+    # Find the strongly connected components with Tarjan's algorithm, which
+    # yields them successors first, and iteratively to avoid deep recursion.
+    index, lowlink, on_stack = {}, {}, set()
+    stack, sccs = [], []
+    for start in graph:
+        if start in index:
+            continue
+        work = [(start, iter(graph.get(start, ())))]
+        index[start] = lowlink[start] = len(index)
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = lowlink[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph.get(succ, ()))))
+                    break
+                elif succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    scc = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        scc.add(member)
+                        if member is node:
+                            break
+                    sccs.append(scc)
+
+    # Longest path over the components, whose successors come first
+    component_of = {}
+    depth = {}
+    for i, scc in enumerate(sccs):
+        for node in scc:
+            component_of[node] = i
+        depth[i] = max([depth[component_of[succ]] + 1
+                        for node in scc for succ in graph.get(node, ())
+                        if component_of[succ] != i] or [0])
+    return max(depth.values() or [0])
+
+def _fact_types(roles):
+    """ Yields the fact types of a sequence of roles. """
+    for role in roles:
+        fact_type = getattr(role, "fact_type", None)
+        if fact_type is not None:
+            yield fact_type
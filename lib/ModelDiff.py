@@ -0,0 +1,297 @@
+##############################################################################
+# Package: ormpy
+# File:    ModelDiff.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" ModelDiff.py computes the differences between two versions of a model,
+    matching elements by their uid (and, for elements that share a uid, such
+    as the constraints that NormaLoader splits an equality constraint into,
+    by their order in the model), and applies those differences to the older
+    version in place.  This supports checkers that keep a model loaded while
+    the modeler edits and saves the .orm file.  For example: ::
+
+        model = NormaLoader("/path/to/file/example.orm").model
+        ...  # The modeler saves a new version of example.orm
+        diff = reload_model(model, "/path/to/file/example.orm")
+        diff.display()
+
+    Only the changed object types, fact types (together with their roles), and
+    constraints are removed from or added to the model, via
+    :meth:`lib.Model.Model.remove` and :meth:`lib.Model.Model.add`.  An
+    unchanged element that refers to a changed element (e.g. a constraint on
+    a role of a changed fact type) is also replaced, so that no element of the
+    model refers to an element that is no longer in the model.
+"""
+
+from lib.ModelElement import ModelElement, attributes
+from lib.ObjectType import ObjectType
+from lib.FactType import FactType, Role
+from lib.Constraint import Constraint
+from lib.Domain import Domain
+from lib.NormaLoader import NormaLoader
+
+# Attributes that are set by committing other elements to the model, and
+# thus are not part of an element's own definition.
+DERIVED = {
+    ObjectType: frozenset(["roles", "covered_by", "ref_roles", "domain",
+                           "direct_subtypes", "direct_supertypes",
+                           "identifying_constraint"]),
+    FactType:   frozenset(["roles", "covered_by"]),
+    Role:       frozenset(["fact_type", "covered_by", "mandatory", "unique"]),
+    Constraint: frozenset(["covered_by"])
+}
+
+# Types whose values are their own encoding
+PRIMITIVES = frozenset([type(None), bool, int, long, float, str, unicode])
+
+class ModelDiff(object):
+    """ Differences between an *old* and a *new* version of a model.  The
+        elements of the new model are moved to the old model by
+        :meth:`apply`, so the new model must not be used afterwards. """
+
+    def __init__(self, old, new):
+        self.old = old #: The model to be updated
+        self.new = new #: The model holding the new version of each element
+
+        # Elements are identified by a key, (uid, i) for the i^th element of
+        # a model with that uid, since a uid need not be unique.
+        self._keys = {} # id() of element -> key
+
+        old_index, old_sigs, old_refs = self._index(old)
+        new_index, new_sigs, new_refs = self._index(new)
+
+        #: Elements (of the new model) that are not in the old model
+        self.added = [new_index[key] for key in new_sigs
+                      if key not in old_sigs]
+
+        #: Elements (of the old model) that are not in the new model
+        self.removed = [old_index[key] for key in old_sigs
+                        if key not in new_sigs]
+
+        #: Elements (of the new model) whose definition changed
+        self.modified = [new_index[key] for key in new_sigs
+                         if key in old_sigs and new_sigs[key] != old_sigs[key]]
+
+        # An element must be replaced if it refers to an element that is
+        # replaced, added, or removed.
+        changed = set(self._key(el) for el in self.added + self.removed +
+                                              self.modified)
+        users = {}
+        for refs in [old_refs, new_refs]:
+            for key, targets in refs.iteritems():
+                for target in targets:
+                    users.setdefault(target, set()).add(key)
+
+        stack = list(changed)
+        while stack:
+            for key in users.get(stack.pop(), []):
+                if key not in changed:
+                    changed.add(key)
+                    stack.append(key)
+
+        #: Unchanged elements (of the new model) that are replaced because
+        #: they refer to a changed element.
+        self.relinked = [new_index[key] for key in new_sigs
+                         if key in changed and key in old_sigs and
+                            new_sigs[key] == old_sigs[key]]
+
+        self._changed = changed
+
+        # Elements of the old model that are kept, including roles, by key
+        self._kept = dict((key, el) for key, el in old_index.iteritems()
+                          if self._unit(el) not in changed)
+
+    @property
+    def empty(self):
+        """ True iff the models are the same. """
+        return not (self.added or self.removed or self.modified)
+
+    def apply(self):
+        """ Update the old model to match the new model.  Elements of the old
+            model that are removed or replaced are rolled back, and elements
+            of the new model that are added or replaced are committed. """
+        changed = self._changed
+
+        # Constraints are removed and added in the order in which they were
+        # added to their models, so that e.g. an empty model updated to match
+        # another has its constraints in the same order.  Object types and
+        # fact types have no such order, and follow their models' iteration
+        # order.
+        removed = [el for el in _elements(self.old) 
+                   if self._key(el) in changed]
+        added = [el for el in _elements(self.new) 
+                 if self._key(el) in changed]
+
+        for cls in [Constraint, FactType, ObjectType]:
+            for element in removed:
+                if isinstance(element, cls):
+                    self.old.remove(element)
+
+        for cls in [ObjectType, FactType, Constraint]:
+            for element in added:
+                if isinstance(element, cls):
+                    self._relink(element)
+                    self.old.add(element)
+
+    def display(self):
+        """ Prints the differences to stdout. """
+        for title, elements in [("Added", self.added),
+                                ("Removed", self.removed),
+                                ("Modified", self.modified),
+                                ("Relinked", self.relinked)]:
+            print "{0}:".format(title)
+            for name in sorted(el.fullname for el in elements):
+                print " "*3, name # 4 leading spaces
+
+    def _key(self, element):
+        """ Returns the key of an element (see __init__).  An element outside
+            both models is keyed by its uid alone. """
+        return self._keys.get(id(element), (element.uid, 0))
+
+    def _unit(self, element):
+        """ Returns the key of the element that is added or removed along with
+            element (the fact type of a role, or else the element itself). """
+        if isinstance(element, Role):
+            return self._key(element.fact_type)
+        return self._key(element)
+
+    def _index(self, model):
+        """ Returns dictionaries that map each element's key to the element
+            (including roles), to its signature, and to the set of keys of
+            the elements it refers to. """
+        index, signatures, refs = {}, {}, {}
+        counts = {} # uid -> number of elements with that uid so far
+
+        elements = _elements(model)
+        for element in elements:
+            parts = [element]
+            if isinstance(element, FactType):
+                parts += element.roles
+            for part in parts:
+                key = (part.uid, counts.get(part.uid, 0))
+                counts[part.uid] = key[1] + 1
+                self._keys[id(part)] = key
+                index[key] = part
+
+        for element in elements:
+            key = self._key(element)
+            targets = set()
+            signatures[key] = self._signature(element, targets)
+            targets.discard(key)
+            refs[key] = targets
+
+        return index, signatures, refs
+
+    def _signature(self, element, refs):
+        """ Returns a value that is equal for two elements iff they have the
+            same definition.  The keys of elements it refers to are added to
+            refs. """
+        derived = derived_attributes(element)
+        signature = [type(element).__name__]
+
+        for attr, value in sorted(attributes(element)):
+            if attr in derived:
+                continue
+            elif type(value) in PRIMITIVES:
+                signature.append((attr, value))
+            else:
+                signature.append((attr, self._encode(value, refs)))
+
+        if isinstance(element, FactType):
+            for role in element.roles:
+                signature.append(self._signature(role, refs))
+
+        return tuple(signature)
+
+    def _encode(self, value, refs):
+        """ Returns a hashable encoding of an attribute value, in which each
+            model element is replaced by its key. """
+        encode = lambda x: self._encode(x, refs)
+
+        if type(value) in PRIMITIVES:
+            return value
+        elif isinstance(value, ModelElement):
+            refs.add(self._unit(value))
+            return ("element", self._key(value))
+        elif type(value) is list and PRIMITIVES.issuperset(map(type, value)):
+            return tuple(value) # e.g. contents of an EnumeratedDomain
+        elif isinstance(value, (list, tuple)):
+            items = tuple(encode(x) for x in value)
+            if has_attributes(value): # e.g. RoleSequence
+                items += (encode(dict(attributes(value))),)
+            return items
+        elif isinstance(value, (set, frozenset)):
+            return tuple(sorted(encode(x) for x in value))
+        elif isinstance(value, dict):
+            return tuple(sorted((k, encode(x)) for k, x in value.iteritems()))
+        elif has_attributes(value): # e.g. Domain, JoinPath
+            return (type(value).__name__, encode(dict(attributes(value))))
+        else:
+            return value
+
+    def _relink(self, element):
+        """ Redirect the references from an element of the new model to kept
+            elements of the old model, and clear the attributes derived from
+            the new model. """
+        if isinstance(element, ObjectType):
+            element.roles, element.covered_by, element.ref_roles = [], [], []
+            element.direct_subtypes, element.direct_supertypes = [], []
+            element.invalidate()
+            element.domain = element.data_type
+        elif isinstance(element, FactType):
+            element.covered_by = []
+            for role in element.roles:
+                role.covered_by, role.mandatory, role.unique = [], False, False
+                self._relink_attrs(role)
+
+        self._relink_attrs(element)
+
+    def _relink_attrs(self, obj):
+        """ Redirect references held by the non-derived attributes of obj. """
+        for attr, value in attributes(obj):
+            if attr not in derived_attributes(obj):
+                setattr(obj, attr, self._relink_value(value))
+
+    def _relink_value(self, value):
+        """ Returns value with references to kept elements redirected. """
+        if isinstance(value, ModelElement):
+            return self._kept.get(self._key(value), value)
+        elif isinstance(value, list):
+            value[:] = [self._relink_value(x) for x in value]
+            if has_attributes(value): # e.g. RoleSequence
+                self._relink_attrs(value)
+            return value
+        elif isinstance(value, tuple):
+            return tuple(self._relink_value(x) for x in value)
+        elif has_attributes(value) and not isinstance(value, Domain):
+            self._relink_attrs(value) # e.g. JoinPath
+        return value
+
+def _elements(model):
+    """ Returns the object types, fact types and constraints of *model*.
+        The constraints are in the order in which they were added; the object
+        types and fact types are in iteration (hash) order. """
+    return list(model.object_types) + list(model.fact_types) + \
+           model.constraints.of_type(Constraint)
+
+def derived_attributes(obj, memo={}):
+    """ Returns the names of the derived attributes of *obj*. """
+    cls = type(obj)
+    if cls not in memo:
+        memo[cls] = frozenset()
+        for base, attrs in DERIVED.iteritems():
+            if issubclass(cls, base):
+                memo[cls] = attrs
+    return memo[cls]
+
+def has_attributes(obj):
+    """ True iff *obj* can have instance attributes (in __dict__ or slots). """
+    return hasattr(obj, "__dict__") or hasattr(obj, "__slots__")
+
+def reload_model(model, filename, deontic=False):
+    """ Load *filename* with :class:`lib.NormaLoader.NormaLoader` and update
+        *model* to match it.  Returns the :class:`ModelDiff`. """
+    diff = ModelDiff(model, NormaLoader(filename, deontic=deontic).model)
+    diff.apply()
+    return diff
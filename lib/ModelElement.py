@@ -6,21 +6,35 @@
 
 """ ModelElement.py provides an abstract class for a model element (a generic
     element in a model from which an object type, fact type, and constraint
-    can be derived) as well as an abstract class for a set of model elements.
+    can be derived), an abstract class for a set of model elements, and a
+    class for the records of changes to a model.
+
+    Model elements store their attributes in ``__slots__`` rather than in a
+    per-instance ``__dict__``, and their uids and names are interned, which
+    keeps large models compact in memory.  Each subclass of ModelElement must
+    declare ``__slots__`` for the attributes it adds (an empty tuple if it 
+    adds none), or its instances will get a ``__dict__`` again.
+    :func:`attributes` lists the attributes of an element regardless of how
+    they are stored.  Slots named in a class's ``_transient`` tuple hold
+    bookkeeping that is not part of the element (e.g. the registry of the
+    model that holds it) and are not listed.
 """
 
 import uuid
+from heapq import heappush, heappop
 
 class ModelElement(object):
     """ An abstract element in an ORM model. """
 
+    __slots__ = ("_uid", "_name")
+
     def __init__(self, uid=None, name="", *args, **kwargs):
         super(ModelElement, self).__init__(*args, **kwargs)
 
         # The UID (Unique ID) and Name cannot change once the model element
         # is created.  Therefore, it is defined as a ready-only property.
-        self._uid = uid or uuid.uuid4().hex
-        self._name = name
+        self._uid = intern_string(uid or uuid.uuid4().hex)
+        self._name = intern_string(name)
 
     @property
     def uid(self):
@@ -54,6 +68,12 @@ class ModelElementSet(object):
         self._set = {}
         self.name = name #: The name of the set. May be used for display, etc.
 
+        # For each name that has collided: the next integer suffix to try,
+        # and a heap of the smaller suffixes that were freed by remove().
+        # Every suffix below the next one is in use or on the heap.
+        self._next = {}
+        self._freed = {}
+
     def __iter__(self):
         """ Permit iteration over the set. """
         return self._set.itervalues()
@@ -62,22 +82,51 @@ class ModelElementSet(object):
         """ Add an element to the set. If the name exists in the set, rename
             the element by adding an integer suffix to make it unique in
             the set.  For example, if an element named Person is added
-            three times, the set will contain Person, Person2, and Person3. """
-        i = 2
+            three times, the set will contain Person, Person2, and Person3.
+            The smallest unused suffix is chosen, in amortized constant 
+            time. """
         name = element.name
 
-        while element.name in self._set:
-            element._name = name + str(i) # Need to access underlying _name
-            i = i + 1
+        if name in self._set:
+            new_name = None
+            freed = self._freed.get(name)
+
+            while freed: # Discard suffixes that have been reused since
+                i = heappop(freed)
+                if name + str(i) not in self._set:
+                    new_name = name + str(i)
+                    break
+
+            if new_name is None:
+                i = self._next.get(name, 2)
+                while name + str(i) in self._set:
+                    i = i + 1
+                self._next[name] = i + 1
+                new_name = name + str(i)
+
+            element._name = intern_string(new_name) # Underlying _name
 
         self._set[element.name] = element
 
     def remove(self, element):
         """ Remove element from the set, if it is present. """
+        name = element.name
         try:
-            del self._set[element.name]
+            del self._set[name]
         except KeyError:
-            pass
+            return
+
+        # If name has an integer suffix below the next one allocated for its
+        # base name, the suffix is free again.  A name such as Person12 may
+        # have more than one base name (Person1 and Person).
+        for j in xrange(len(name) - 1, 0, -1):
+            digit = name[j]
+            if not "0" <= digit <= "9":
+                break
+            elif digit != "0":
+                base, i = name[:j], int(name[j:])
+                if 2 <= i < self._next.get(base, 0):
+                    heappush(self._freed.setdefault(base, []), i)
 
     def get(self, name):
         """ Retrieve an element by name.  Returns **None** if the element is
@@ -96,3 +145,66 @@ class ModelElementSet(object):
         print "{0}:".format(self.name)
         for element_name in sorted(list(self._set)):
             print " "*3, element_name # 4 leading spaces
+
+class ModelChange(object):
+    """ A record of a change to a model, which :class:`lib.Model.Model` passes
+        to its subscribers.  Adding an element to a model is recorded as 
+        ADDED and, for a constraint, then as COMMITTED once its side effects
+        are in place.  Removing an element is recorded, for a constraint, as
+        ROLLED_BACK and then as REMOVED.  A constraint in a model that is
+        rolled back and committed again (e.g. by a transformation that
+        modifies it) is recorded as ROLLED_BACK and COMMITTED.  A fact type
+        in a model that gains a role, or whose roles are given root roles,
+        is recorded as MODIFIED. """
+
+    __slots__ = ("kind", "element")
+
+    ADDED = "added"             #: The element was added to the model
+    REMOVED = "removed"         #: The element was removed from the model
+    COMMITTED = "committed"     #: The constraint's side effects were committed
+    ROLLED_BACK = "rolled back" #: The constraint's side effects were undone
+    MODIFIED = "modified"       #: The fact type's roles changed
+
+    def __init__(self, kind, element):
+        self.kind = kind       #: One of the kinds of change listed above
+        self.element = element #: The model element that changed
+
+    def __repr__(self):
+        return "ModelChange({0}, {1})".format(self.kind, 
+            getattr(self.element, "fullname", self.element))
+
+def intern_string(value):
+    """ Returns the interned copy of *value* if it is a byte string, so that 
+        equal uids and names share one string object, or else *value*. """
+    return intern(value) if type(value) is str else value
+
+def slots(cls, memo={}):
+    """ Returns a list of (name, descriptor) pairs for the slots declared by
+        *cls* and its base classes, other than transient slots. """
+    try:
+        return memo[cls]
+    except KeyError:
+        pairs = []
+        for base in reversed(cls.__mro__):
+            names = base.__dict__.get("__slots__", ())
+            if isinstance(names, basestring):
+                names = (names,)
+            skip = ("__dict__", "__weakref__") + \
+                   base.__dict__.get("_transient", ())
+            pairs += [(name, base.__dict__[name]) for name in names
+                      if name not in skip]
+        memo[cls] = pairs
+        return pairs
+
+def attributes(obj):
+    """ Returns a list of (name, value) pairs for the instance attributes of 
+        *obj*, whether they are stored in slots or in ``__dict__``.  Slots 
+        that have not been set are omitted. """
+    pairs = []
+    for name, slot in slots(type(obj)):
+        try:
+            pairs.append((name, slot.__get__(obj, type(obj))))
+        except AttributeError:
+            pass
+    pairs.extend(getattr(obj, "__dict__", {}).iteritems())
+    return pairs
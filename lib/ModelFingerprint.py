@@ -0,0 +1,124 @@
+##############################################################################
+# Package: ormpy
+# File:    ModelFingerprint.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" ModelFingerprint.py computes a fingerprint of the semantic content of a
+    :class:`lib.Model.Model`: the kind, name and definition of each object
+    type, fact type (together with its roles) and constraint, including role
+    players, constraint coverage, domains and cardinality ranges.  Two models
+    with the same content have the same fingerprint, regardless of the order
+    in which their elements were added or of the iteration order of any set
+    or dictionary, so the fingerprint can key caches of results computed
+    from a model (e.g. ORM- solutions or populations) across runs.  For
+    example: ::
+
+        model = NormaLoader("/path/to/file/example.orm").model
+        key = model.fingerprint()
+
+    Elements refer to each other by full name rather than by uid, so a model
+    transformed twice has the same fingerprint, even though the elements the
+    transformations generate have random uids.  Attributes that are derived
+    from other elements when they are committed (see
+    :data:`lib.ModelDiff.DERIVED`) are not part of an element's definition.
+
+    Each element has its own digest, and the fingerprint of the model is
+    the sum of these digests.  A :class:`Fingerprint` subscribes to the
+    changes to its model (see :class:`lib.ModelElement.ModelChange`) and 
+    recomputes only the digests of the elements that were added, removed, 
+    committed again or modified since it was last read.  Changes to an 
+    element that are not reported to the model are not seen.
+"""
+
+import hashlib
+
+from lib.ModelElement import ModelElement, ModelChange, attributes
+from lib.FactType import FactType
+from lib.ModelDiff import derived_attributes, has_attributes
+
+BITS = 160 #: Size of a fingerprint in bits (that of a SHA-1 digest)
+
+# Types whose values are their own encoding
+_PRIMITIVES = frozenset([type(None), bool, int, long, float, str, unicode])
+
+class Fingerprint(object):
+    """ Incrementally maintained fingerprint of a model. """
+
+    def __init__(self, model):
+        self.model = model #: The model whose fingerprint is maintained
+
+        self._digests = {} # Element -> digest included in self._total
+        self._total = 0    # Sum of self._digests
+        self._members = set(model.object_types) | set(model.fact_types) | \
+                        set(model.constraints) # Elements in the model
+        self._dirty = set(self._members)
+
+        model.subscribe(self._changed)
+
+    def hexdigest(self):
+        """ Returns the fingerprint of the model as a string of hex digits.
+        """
+        for element in self._dirty:
+            self._total -= self._digests.pop(element, 0)
+            if element in self._members:
+                self._digests[element] = digest = element_digest(element)
+                self._total += digest
+        self._dirty.clear()
+
+        return "{0:0{1}x}".format(self._total % (1 << BITS), BITS // 4)
+
+    def close(self):
+        """ Stop following changes to the model. """
+        self.model.unsubscribe(self._changed)
+
+    def _changed(self, change):
+        """ Note an element whose digest may have changed. """
+        if change.kind == ModelChange.ADDED:
+            self._members.add(change.element)
+        elif change.kind == ModelChange.REMOVED:
+            self._members.discard(change.element)
+        self._dirty.add(change.element)
+
+def element_digest(element):
+    """ Returns the digest of an element's definition as an integer. """
+    data = repr(_signature(element))
+    return int(hashlib.sha1(data).hexdigest(), 16)
+
+def _signature(element):
+    """ Returns a canonical encoding of an element's definition. """
+    derived = derived_attributes(element)
+    signature = [type(element).__name__, element.name]
+
+    for attr, value in sorted(attributes(element)):
+        if attr not in derived and attr not in ("_uid", "_name"):
+            signature.append((attr, _encode(value)))
+
+    if isinstance(element, FactType):
+        for role in element.roles:
+            signature.append(_signature(role))
+
+    return tuple(signature)
+
+def _encode(value):
+    """ Returns a canonical encoding of an attribute value, in which each
+        model element is replaced by its full name, and the items of sets
+        and dictionaries are sorted. """
+    if type(value) in _PRIMITIVES:
+        return value
+    elif isinstance(value, ModelElement):
+        return ("element", value.fullname)
+    elif isinstance(value, (list, tuple)):
+        items = tuple(_encode(x) for x in value)
+        if has_attributes(value): # e.g. RoleSequence
+            items += (_encode(dict(attributes(value))),)
+        return items
+    elif isinstance(value, (set, frozenset)):
+        return ("set",) + tuple(sorted(_encode(x) for x in value))
+    elif isinstance(value, dict):
+        return ("dict",) + tuple(sorted((_encode(k), _encode(x))
+                                        for k, x in value.iteritems()))
+    elif has_attributes(value): # e.g. Domain, JoinPath, CardinalityRange
+        return (type(value).__name__, _encode(dict(attributes(value))))
+    else:
+        return repr(value) # e.g. a date
@@ -0,0 +1,116 @@
+##############################################################################
+# Package: ormpy
+# File:    ModelPartition.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" ModelPartition.py splits a :class:`lib.Model.Model` into its connected
+    components.  Two elements are connected if one refers to the other, e.g.
+    through a role player, a subtype link, the coverage of a constraint, or
+    a join path; a role connects its fact type to everything the role is
+    connected to.  No constraint spans two components, so each component
+    can be checked (see :class:`lib.ORMMinusModel.PartitionedORMMinusModel`)
+    and populated on its own.  For example: ::
+
+        model = NormaLoader("/path/to/file/example.orm").model
+        for component in partition(model.clone()):
+            print ORMMinusModel(component).solution
+
+    The elements of a model are moved to the models returned by
+    :func:`partition`, so the partitioned model must not be used afterwards.
+"""
+
+from lib.Model import Model
+from lib.ModelElement import ModelElement, attributes
+from lib.FactType import FactType, Role
+from lib.Constraint import Constraint
+from lib.Domain import Domain
+
+def components(model):
+    """ Returns the connected components of *model*, as a list of lists of
+        model elements.  Each list holds the object types, fact types and
+        constraints of a component, in that order, and components are
+        ordered by their first element. """
+    elements = list(model.object_types) + list(model.fact_types) + \
+               model.constraints.of_type(Constraint)
+
+    parent = {} # id() of element -> id() of its parent in the union-find
+
+    def find(x):
+        """ Returns the id of the representative of x's component. """
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root: # Path compression
+            parent[x], x = root, parent[x]
+        return root
+
+    for element in elements:
+        parent[id(element)] = id(element)
+
+    # Elements outside the model (e.g. the fact type of a role covered by a 
+    # constraint) are searched too, since they may connect elements of it.
+    pending = list(elements)
+    while pending:
+        element = pending.pop()
+        for other in _neighbours(element):
+            if id(other) not in parent:
+                parent[id(other)] = id(other)
+                pending.append(other)
+            root1, root2 = find(id(element)), find(id(other))
+            if root1 != root2:
+                parent[root2] = root1
+
+    result = {} # Representative -> component
+    order = []
+    for element in elements:
+        root = find(id(element))
+        if root not in result:
+            result[root] = []
+            order.append(root)
+        result[root].append(element)
+    return [result[root] for root in order]
+
+def partition(model):
+    """ Returns a list of models, one per connected component of *model*.
+        The elements of *model* are moved to the new models, and their side
+        effects are kept, so *model* must not be used afterwards. """
+    result = []
+    for component in components(model):
+        part = Model()
+        for element in component:
+            part.add(element, commit=False) # Side effects already in place
+        result.append(part)
+    return result
+
+def _neighbours(element):
+    """ Yields the model elements, other than roles, that element refers to.
+        A role is replaced by its fact type.  The roles of a fact type are
+        searched as if they were part of the fact type. """
+    stack = [x for _, x in attributes(element)]
+    if isinstance(element, FactType):
+        for role in element.roles:
+            stack.extend(x for _, x in attributes(role))
+    seen = set()
+
+    while stack:
+        value = stack.pop()
+        if isinstance(value, Role):
+            value = getattr(value, "fact_type", None)
+        if isinstance(value, ModelElement):
+            if value is not element:
+                yield value
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            if id(value) not in seen: # e.g. a RoleSequence
+                seen.add(id(value))
+                stack.extend(value)
+                stack.extend(x for _, x in attributes(value))
+        elif isinstance(value, dict):
+            stack.extend(value.iterkeys())
+            stack.extend(value.itervalues())
+        elif isinstance(value, Domain) or not hasattr(value, "__dict__") \
+                                       and not hasattr(value, "__slots__"):
+            continue # Primitive values and domains refer to no element
+        elif id(value) not in seen: # e.g. a JoinPath
+            seen.add(id(value))
+            stack.extend(x for _, x in attributes(value))
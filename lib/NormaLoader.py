@@ -19,7 +19,9 @@
     structure when loading the file into a :class:`lib.Model.Model` object
     (much of the .orm file is not relevant to the analyses performed by ORMPY).
     All information outside of the <orm:ORMModel> node is ignored, which
-    includes things like diagram (shape) data and extensions.  NormaLoader
+    includes things like diagram (shape) data and extensions.  The file is 
+    parsed incrementally, so ignored nodes are discarded as soon as they are 
+    read and never accumulate in memory.  NormaLoader
     also ignores the following (not necessarily exhaustive) list of items:
 
     * Sample (instance) data
@@ -38,11 +40,32 @@
     **Data Types:** NormaLoader maps each data type specified in the .orm file
     to a subclass of :class:`lib.Domain.Domain`. NormaLoader ignores the 
     length and scale facets specified in the .orm file.
+
+    **Compressed Files:** NormaLoader also reads .orm.gz and .orm.bz2 
+    files, .orm files within .zip archives, and file-like objects (see
+    :func:`open_norma_file`).  Compressed files are decompressed as they are
+    parsed, without temporary files.
+
+    **Slices:** Given the names of one or more *seed* elements, NormaLoader
+    loads only the part of the model within a given number of hops of the
+    seeds (see :class:`NormaLoader`).  The fact types and constraints that 
+    are excluded because they cross the edge of the slice are listed in the
+    *boundary* attribute after loading the input file.
+
+    **Batch Loading:** :func:`load_many` loads a list of .orm files in a pool
+    of worker processes and returns a :class:`LoadResult` for each file.
 """
 
-import xml.etree.cElementTree as xml
+import bz2
+import gzip
 import logging
+import multiprocessing
 import os
+import re
+import zipfile
+from contextlib import closing, contextmanager
+from timeit import default_timer as timer
+from collections import Counter
 from datetime import datetime, date, time
 
 from lib.Model import Model
@@ -51,6 +74,8 @@ import lib.FactType as FactType
 import lib.Constraint as Constraint
 import lib.Domain as Domain
 from lib.JoinPath import JoinPath, JoinPathException
+import lib.Snapshot as Snapshot
+import lib.XmlBackend as XmlBackend
 
 # Constants
 NS_ROOT = "{http://schemas.neumont.edu/ORM/2006-04/ORMRoot}"
@@ -92,6 +117,21 @@ DATA_TYPES = {
     "ObjectIdOtherDataType"                      : Domain.IntegerDomain
 }
 
+# Name of an .orm file within a .zip archive, e.g. models.zip/example.orm
+ARCHIVE_MEMBER = re.compile(r"(.*?\.zip)[/\\](.+)$", re.IGNORECASE)
+
+# Collections under <orm:ORMModel> that NormaLoader loads.  All other children
+# of <orm:ORMModel> are discarded while the file is parsed.
+LOADED_COLLECTIONS = frozenset(NS_CORE + tag for tag in 
+    ["DataTypes", "Objects", "Facts", "Constraints"])
+
+# Nodes whose contents NormaLoader never reads (their loader is noop), which
+# are cleared while the file is parsed.  Sample data, in particular, can make
+# up a large share of an .orm file.
+IGNORED_NODES = frozenset(NS_CORE + tag for tag in 
+    ["Definitions", "Notes", "Abbreviations", "Instances", "RoleInstances",
+     "ReadingOrders", "Extensions"])
+
 class NormaLoader(object):
     """ Loads an .orm file produced by the NORMA modeling tool into a
         :class:`lib.Model.Model`.  There are no public methods in this class.
@@ -99,12 +139,33 @@ class NormaLoader(object):
 
             loader = NormaLoader("/path/to/file/example.orm")
             model = loader.model
+
+        If a :class:`lib.ModelCache.ModelCache` is provided via the *cache*
+        parameter and the cache holds the model for an identical file, the 
+        model is taken from the cache and the .orm file is not parsed.
+
+        If *seeds* is a list of object type or fact type names, only the 
+        slice of the model within *radius* hops of the seeds is loaded.  One
+        hop leads from an object type, through a fact type it plays a role in,
+        to the other role players of that fact type.  The slice also includes
+        the supertypes of its object types and the fact type nested by each 
+        objectified type (with their role players), so that it is a 
+        well-formed model.  A fact type is loaded if all of its role players 
+        are in the slice, and a constraint is loaded if all of the roles it 
+        covers are loaded.
+
+        The time spent in each phase of loading is reported in the *stats*
+        attribute (see :class:`LoadStats`).
+
+        The file is parsed by the XML backend named by *backend* (see
+        :mod:`lib.XmlBackend`), or by the default backend if it is **None**.
     """
 
     ###########################################################################
     # Constructor: Only public method!
     ###########################################################################
-    def __init__(self, filename, deontic=False):
+    def __init__(self, filename, deontic=False, cache=None, seeds=None,
+                 radius=1, backend=None):
         """ Initialize object and load *filename*. """
 
         #: The ORM model (:class:`lib.Model.Model`) loaded from the .orm file.
@@ -114,26 +175,98 @@ class NormaLoader(object):
         # Items in the .orm file omitted by NormaLoader
         self.omissions = [] #: Intentionally omitted model elements
         self.unexpected = set() #: Unexpected nodes in the XML file
+        self.boundary = [] #: Elements excluded at the edge of the slice
 
-        # Find root of XML tree       
-        self._model_root = self._parse_norma_file(filename)
+        #: Profile of the load (:class:`LoadStats`)
+        self.stats = LoadStats()
 
-        # Load file
-        self._load_data_types()
-        self._load_object_types()
-        self._load_fact_types() # Also loads subtypes
-        self._load_constraints(deontic)
+        self._backend = XmlBackend.get_backend(backend)
+        self.stats.backend = self._backend.name
 
-        # Post-processing
-        self._fix_nested_fact_type_refs() 
+        if cache is None or hasattr(filename, "read"): # Can't hash a stream
+            self._load(filename, deontic, seeds, radius)
+        else:
+            self._load_cached(filename, deontic, cache, seeds, radius)
 
         # Report any issues to the user
         self._log_issues(filename, self.omissions, "model element", "ignored")      
         self._log_issues(filename, self.unexpected, "XML node", "unexpected")
+        self._log_issues(filename, self.boundary, "model element", 
+                         "cut from the slice")
 
     ###########################################################################
     # Private Utility Functions
     ###########################################################################
+    def _load(self, filename, deontic, seeds=None, radius=1):
+        """ Load *filename*, or the slice of it around *seeds*, into 
+            self.model. """
+
+        phase = self._run_phase
+
+        # Index the collections under the root of the XML tree in one pass
+        self._sections = {}
+        for node in phase("parse", self._parse_norma_file, filename):
+            self._sections.setdefault(local_tag(node), node)
+
+        # Work deferred until the nodes it depends on have been loaded
+        self._restrictions = [] # (constraint node, GUID of covered element)
+        self._fixups = []       # (element, attribute) pairs holding a GUID
+
+        # GUIDs of object types and fact types in the slice and GUIDs of the 
+        # roles cut from the slice, or None if the whole model is loaded.
+        self._slice = self._cut = None
+        if seeds is not None:
+            phase("slice", self._select_slice, seeds, radius)
+
+        # Load file
+        phase("data types", self._load_data_types)
+        phase("object types", self._load_object_types)
+        phase("fact types", self._load_fact_types) # Also loads subtypes
+        phase("constraints", self._load_constraints, deontic)
+
+        # Post-processing
+        phase("fixups", self._resolve_fixups)
+
+        # Release the XML tree
+        self._sections = self._restrictions = self._fixups = None
+        self._slice = self._cut = None
+
+    def _load_cached(self, filename, deontic, cache, seeds=None, radius=1):
+        """ Take the model for *filename* from the cache, or load the file
+            into self.model and store the result in the cache. """
+        start = timer()
+        archive, member = split_archive_path(filename)
+        options = (deontic,) if member is None else (deontic, member)
+        if seeds is not None:
+            options += (sorted(seeds), radius)
+        key = cache.key(archive, *options)
+        entry = cache.get(key)
+
+        if entry is None:
+            self._load(filename, deontic, seeds, radius)
+            self._run_phase("cache", cache.put, key, self.model, 
+                            self.omissions, self.unexpected, self.boundary)
+        else:
+            self.model, self.omissions, self.unexpected, self.boundary = entry
+            self.stats.phases.append(
+                ("cache", timer() - start, self._model_size()))
+
+    def _run_phase(self, name, function, *args):
+        """ Call function(*args), record its time and the number of elements
+            it added to the model in self.stats, and return its result. """
+        size = self._model_size()
+        start = timer()
+        result = function(*args)
+        elapsed = timer() - start
+        self.stats.phases.append((name, elapsed, self._model_size() - size))
+        return result
+
+    def _model_size(self):
+        """ Returns the number of elements in self.model. """
+        model = self.model
+        return model.object_types.count() + model.fact_types.count() + \
+               model.constraints.count()
+
     def _add(self, model_element):
         """ Add model element to the model. """
         self._elements[model_element.uid] = model_element 
@@ -147,17 +280,42 @@ class NormaLoader(object):
         return model_element_type(uid=uid, name=name, **kwargs)
 
     def _parse_norma_file(self, filename):
-        """ Parse a NORMA File and return the ORMModel node. """
-        if filename.split(".")[-1].upper() != "ORM":
-            raise Exception("Input filename must have .orm extension.")
-
-        tree = xml.parse(filename)
-        root = tree.getroot()
-
-        if root.tag != NS_ROOT + "ORM2":
-            raise Exception("Root of input file must be <ormRoot:ORM2>.")
-
-        model_node = find(root, "ORMModel")
+        """ Parse a NORMA File and return the ORMModel node.  The file is read
+            incrementally: nodes outside of <orm:ORMModel> (e.g. diagram shapes
+            and extensions) are discarded as soon as they are complete, the
+            contents of nodes that NormaLoader ignores are cleared, and parsing
+            stops as soon as the ORMModel node is complete.  Thus, the memory
+            needed to parse the file grows with the size of the model rather
+            than the size of the file.  The time saved depends on the order
+            of the file: data after the ORMModel node (where NORMA writes
+            its diagrams) is never read, but data before it is parsed node
+            by node, which is slower than a full parse of that data. """
+        model_node = None
+        path = [] # Stack of open XML nodes, starting at the root node
+
+        with open_norma_file(filename) as stream:
+            for event, node in self._backend.iterparse(stream):
+                if event == "start":
+                    self.stats.nodes += 1
+                    if not path and node.tag != NS_ROOT + "ORM2":
+                        msg = "Root of input file must be <ormRoot:ORM2>."
+                        raise Exception(msg)
+                    elif len(path) == 1 and model_node is None and \
+                         node.tag == NS_CORE + "ORMModel":
+                        model_node = node
+                    path.append(node)
+                    continue
+
+                path.pop()
+
+                if node is model_node or not path: # ORMModel or root complete
+                    break
+                elif len(path) < 2 or path[1] is not model_node:
+                    del path[-1][-1] # Discard node outside of <orm:ORMModel>
+                elif len(path) == 2 and node.tag not in LOADED_COLLECTIONS:
+                    del model_node[-1] # Discard collection we don't load
+                elif node.tag in IGNORED_NODES:
+                    node.clear() # Keep node so its loader still sees it
 
         if model_node is None:
             raise Exception("Cannot find <orm:ORMModel> in input file.")
@@ -171,7 +329,7 @@ class NormaLoader(object):
 
         if size > 0:
             subject = ("{0}s were" if size > 1 else "{0} was").format(subject)
-            filename = os.path.basename(filename)
+            filename = os.path.basename(source_name(filename))
             template = "%d %s %s while loading %s."
 
             logger.warning(template, size, subject, issue_type, filename)
@@ -179,38 +337,165 @@ class NormaLoader(object):
             for issue in issue_list:
                 logger.info("%s %s", issue_type.capitalize(), issue)
 
+    def _section(self, name):
+        """ Returns the collection of nodes named 'name' under the ORMModel
+            node. """
+        node = self._sections.get(name)
+        return node if node is not None else []
+
     def _call_loader(self, loader, node, *args):
         """ Call the loader method listed in the loader map for a given node."""
         tag = local_tag(node)
+        start = timer()
         try:            
             return loader[tag](node, *args)
         except KeyError: # No loading function defined.
             self.unexpected.add(tag) 
             return None
-
-    def _move_node_to_constraints(self, node, parent):
-        """ Make an xml node a subelement of the Constraints sequence node. """
-
-        tag = local_tag(node)
-
-        # Special handling for ValueRestriction and CardinalityRestriction:
-        # we move the node that is 1 level down instead (e.g. ValueConstraint)
+        finally:
+            self.stats.dispatch[tag] += 1
+            self.stats.dispatch_time[tag] += timer() - start
+
+    def _defer_restriction(self, node, parent):
+        """ Queue the constraint within a ValueRestriction or 
+            CardinalityRestriction node to be loaded, as a constraint covering
+            parent, after the nodes under <Constraints>.  The covered element
+            is looked up by GUID when the constraint is loaded, because parent 
+            is not part of the model if it is implicit. """
         special = {'ValueRestriction'       : 'value constraint', 
                    'CardinalityRestriction' : 'cardinality constraint'}
         
-        if tag in special.keys():
-            if len(node) != 1: 
-                raise ValueError("Unexpected {0} format".format(special[tag]))
-            node = node[0] # Move 1 level down
-                            
-        root = self._model_root
-        constraints_node = find(root, "Constraints") 
+        if len(node) != 1: 
+            msg = "Unexpected {0} format".format(special[local_tag(node)])
+            raise ValueError(msg)
+
+        self._restrictions.append((node[0], parent.uid))
+
+    def _resolve_fixups(self):
+        """ Replace the GUID held by each attribute in the fixup table with
+            the element it refers to.  MUST be called after all elements are
+            loaded. """
+        for element, attr in self._fixups:
+            setattr(element, attr, self._elements[getattr(element, attr)])
+
+    ##########################################################################
+    # Private Functions to Select a Slice of the Model
+    ##########################################################################
+    def _select_slice(self, seeds, radius):
+        """ Set self._slice to the GUIDs of the object types and fact types
+            in the slice within radius hops of the elements named in seeds,
+            and self._cut to the GUIDs of the roles of the other fact types.
+            Fact types that are cut but have a role player in the slice are
+            added to self.boundary. """
+        names = {}      # Name of object type or fact type -> GUID
+        implicit = set() # GUIDs of implicit object types
+        nested = {}     # GUID of objectified type -> GUID of nested fact type
+        supertypes = {} # GUID of object type -> GUIDs of its supertypes
+        facts = {}      # GUID of fact type -> (node, GUIDs of roles, players)
+        played = {}     # GUID of object type -> GUIDs of its fact types
+
+        for node in self._section("Objects"):
+            uid = node.get("id")
+            names.setdefault(node.get("Name"), uid)
+            predicate = find(node, "NestedPredicate")
+
+            if node.get("IsImplicitBooleanValue") == "true":
+                implicit.add(uid)
+            elif predicate is None:
+                pass
+            elif predicate.get("IsImplied") == "true":
+                implicit.add(uid)
+            else:
+                nested[uid] = predicate.get("ref")
 
-        if constraints_node == None: # Create a Constraints node if needed
-            constraints_node = xml.SubElement(root, NS_CORE + "Constraints")
+        for node in self._section("Facts"):
+            tag = local_tag(node)
+            if tag not in ["Fact", "SubtypeFact"]:
+                continue
 
-        node.set('_covered_element', parent.uid)
-        constraints_node.append(node)
+            uid = node.get("id")
+            names.setdefault(node.get("_Name") or node.get("Name"), uid)
+            roles = [role for role in node_collection(node, "FactRoles")
+                     if find(role, "RolePlayer") is not None]
+            players = [find(role, "RolePlayer").get("ref") for role in roles]
+            facts[uid] = (node, [role.get("id") for role in roles], players)
+
+            for player in players:
+                played.setdefault(player, []).append(uid)
+
+            if tag == "SubtypeFact":
+                roles = find(node, "FactRoles")
+                sub = find(find(roles, "SubtypeMetaRole"), "RolePlayer")
+                sup = find(find(roles, "SupertypeMetaRole"), "RolePlayer")
+                supertypes.setdefault(sub.get("ref"), []) \
+                          .append(sup.get("ref"))
+
+        # Breadth-first search from the seeds.  A seed fact type contributes
+        # its role players.
+        inside = set()
+        for name in seeds:
+            uid = names.get(name)
+            if uid is None:
+                raise Exception("{0} is not in the model.".format(name))
+            inside.update(facts[uid][2] if uid in facts else [uid])
+
+        frontier = list(inside)
+        for _ in xrange(radius):
+            reached = []
+            for uid in frontier:
+                for fact in played.get(uid, []):
+                    for player in facts[fact][2]:
+                        if player not in inside:
+                            inside.add(player)
+                            reached.append(player)
+            frontier = reached
+
+        # Close the slice under supertypes and nested fact types
+        stack = list(inside)
+        while stack:
+            uid = stack.pop()
+            needed = supertypes.get(uid, [])
+            if uid in nested and nested[uid] in facts:
+                needed = needed + facts[nested[uid]][2]
+            for other in needed:
+                if other not in inside:
+                    inside.add(other)
+                    stack.append(other)
+
+        # Select the fact types whose role players are all in the slice
+        self._slice = set(inside)
+        self._cut = set()
+        for uid, (node, roles, players) in facts.iteritems():
+            if all(p in inside or p in implicit for p in players):
+                self._slice.add(uid)
+            else:
+                self._cut.update(roles)
+                if any(p in inside for p in players):
+                    kind = "Fact type" if local_tag(node) == "Fact" \
+                           else "Subtype fact"
+                    name = node.get("_Name") or node.get("Name")
+                    self.boundary.append(kind + " " + name)
+
+    def _in_slice(self, xml_node):
+        """ Returns True if the object type or fact type rooted at xml_node
+            is in the slice being loaded. """
+        return self._slice is None or xml_node.get("id") in self._slice
+
+    def _crosses_cut(self, xml_node):
+        """ Returns True if the constraint rooted at xml_node covers a role
+            that was cut from the slice.  If it also covers a role in the 
+            slice, the constraint is added to self.boundary. """
+        refs = set(node.get("ref") for node in xml_node.iter()
+                   if local_tag(node) in ["Role", "PathedRole"])
+
+        if self._cut is None or self._cut.isdisjoint(refs):
+            return False
+
+        implied = xml_node.get("IsImplied") == "true"
+        if not implied and any(ref in self._elements for ref in refs):
+            name = xml_node.get("Name") or xml_node.get("_Name")
+            self.boundary.append("Constraint " + name)
+        return True
 
     ##########################################################################
     # Private Functions to Load Conceptual Data Types
@@ -218,7 +503,7 @@ class NormaLoader(object):
     def _load_data_types(self):
         """ Load the data types in the model so that we can assign the
             conceptual data type to each value type. """
-        for child in node_collection(self._model_root, "DataTypes"):
+        for child in self._section("DataTypes"):
             data_type = local_tag(child) # Data type node tag
             data_id = child.get("id")
 
@@ -241,9 +526,10 @@ class NormaLoader(object):
             'ValueType'       : ObjectType.ValueType,
             'ObjectifiedType' : ObjectType.ObjectifiedType,
         }
-        for node in node_collection(self._model_root, "Objects"):
+        for node in self._section("Objects"):
             tag = local_tag(node)
-            self._load_object_type(node, type_of[tag])
+            if self._in_slice(node):
+                self._load_object_type(node, type_of[tag])
 
     def _load_object_type(self, xml_node, target_type):
         """ Loads object type rooted at xml_node into target type. """
@@ -252,8 +538,8 @@ class NormaLoader(object):
             'SubtypeDerivationRule' : self._load_subtype_derivation,
             'PreferredIdentifier'   : self._load_preferred_identifier,
             'ConceptualDataType'    : self._load_conceptual_data_type,
-            'ValueRestriction'      : self._move_node_to_constraints,
-            'CardinalityRestriction': self._move_node_to_constraints,
+            'ValueRestriction'      : self._defer_restriction,
+            'CardinalityRestriction': self._defer_restriction,
             'Definitions'           : noop,
             'Notes'                 : noop,
             'Abbreviations'         : noop,
@@ -276,6 +562,10 @@ class NormaLoader(object):
         if object_type.implicit == False:
             self._add(object_type)
 
+            # The nested fact type is loaded after the objectified type
+            if isinstance(object_type, ObjectType.ObjectifiedType):
+                self._fixups.append((object_type, "nested_fact_type"))
+
     @staticmethod
     def _load_nested_fact_type(xml_node, object_type):
         """ Loads NestedPredicate xml_node into object_type. """
@@ -283,15 +573,6 @@ class NormaLoader(object):
             object_type.implicit = True
         object_type.nested_fact_type = xml_node.get("ref") # GUID of fact type
 
-    def _fix_nested_fact_type_refs(self):
-        """ Updates objectified type's nested_fact_type attribute to point to
-            the actual fact type and not just the GUID.  MUST be called after
-            both object types and fact types are loaded. """
-        for object_type in self.model.object_types:
-            if isinstance(object_type, ObjectType.ObjectifiedType):
-                guid = object_type.nested_fact_type 
-                object_type.nested_fact_type = self._elements[guid]
-
     def _load_subtype_derivation(self, xml_node, object_type):
         """ Loads SubtypeDerivationRule into object_type. """
         self.omissions.append("Subtype derivation rule for " + object_type.name)
@@ -320,8 +601,10 @@ class NormaLoader(object):
             'SubtypeFact' : self._load_subtype_fact,
             'ImpliedFact' : noop
         }
-        for node in node_collection(self._model_root, "Facts"):
-            self._call_loader(loader, node)   
+        for node in self._section("Facts"):
+            if local_tag(node) not in ["Fact", "SubtypeFact"] or \
+               self._in_slice(node):
+                self._call_loader(loader, node)
 
     def _load_fact_type(self, xml_node):
         """ Load a fact type node into a fact type in the model. """
@@ -359,8 +642,8 @@ class NormaLoader(object):
         loader = {
             'RolePlayer'            : noop, # We call _load_role_player directly           
             'DerivationSource'      : self._load_role_derivation,            
-            'ValueRestriction'      : self._move_node_to_constraints, 
-            'CardinalityRestriction': self._move_node_to_constraints,
+            'ValueRestriction'      : self._defer_restriction, 
+            'CardinalityRestriction': self._defer_restriction,
             'RoleInstances'         : noop,
             'Extensions'            : noop
         }
@@ -390,8 +673,9 @@ class NormaLoader(object):
 
     def _load_subtype_fact(self, xml_node):
         """ Load a subtype fact, which indicates a subtype constraint.  Note,
-            we chose not to move this node under <Constraints>, because it must
-            be loaded prior to any associated XOR/IOR constraints. """
+            we chose not to defer this node until <Constraints> is loaded,
+            because it must be loaded prior to any associated XOR/IOR 
+            constraints. """
         attribs, name = get_basic_attribs(xml_node)
  
         # Get super and sub type XML nodes
@@ -442,11 +726,22 @@ class NormaLoader(object):
             'CardinalityConstraint'         : self._load_cardinality_constraint,
             'UnaryRoleCardinalityConstraint': self._load_cardinality_constraint
         }
-        for node in node_collection(self._model_root, "Constraints"):
+        # Constraints within a ValueRestriction or CardinalityRestriction 
+        # follow those under <Constraints>, and cover the restricted element.
+        nodes = [(node, None) for node in self._section("Constraints")]
+
+        for node, uid in nodes + self._restrictions:
             if deontic == False and node.get("Modality") == "Deontic":
                 continue
 
-            result = self._call_loader(loader, node)
+            if uid is None and self._crosses_cut(node):
+                continue
+
+            if uid is None:
+                result = self._call_loader(loader, node)
+            else:
+                covered = self._elements.get(uid)
+                result = self._call_loader(loader, node, covered)
     
             if not isinstance(result, list): 
                 result = [result]
@@ -500,9 +795,8 @@ class NormaLoader(object):
         cons_list = []
         superset_seq = sequences_node[0]        
         attribs['superset'] = self._load_role_sequence(superset_seq, name)
-        sequences_node.remove(superset_seq)
 
-        for sequence in sequences_node:
+        for sequence in sequences_node[1:]:
             attribs['subset'] = self._load_role_sequence(sequence, name)                
             cons_list.append(Constraint.EqualityConstraint(**attribs))
 
@@ -573,10 +867,10 @@ class NormaLoader(object):
         self.omissions.append("Value comparison constraint " + name)
         return None
 
-    def _load_value_constraint(self, node):
-        """ Load value constraint. """
+    def _load_value_constraint(self, node, covered=None):
+        """ Load value constraint on the covered element. """
         attribs, name = get_basic_attribs(node)
-        attribs['covers'] = covers = self._get_covered_element(node)
+        attribs['covers'] = covers = [covered] if covered else None
 
         data_type = covers[0].data_type if covers else None
 
@@ -598,10 +892,10 @@ class NormaLoader(object):
 
         return Constraint.ValueConstraint(domain, **attribs)
 
-    def _load_cardinality_constraint(self, node):
-        """ Load cardinality constraint. """
+    def _load_cardinality_constraint(self, node, covered=None):
+        """ Load cardinality constraint on the covered element. """
         attribs, name = get_basic_attribs(node)
-        attribs['covers'] = self._get_covered_element(node)
+        attribs['covers'] = [covered] if covered else None
         attribs['ranges'] = self._load_cardinality_ranges(node)
 
         return Constraint.CardinalityConstraint(**attribs)
@@ -618,17 +912,6 @@ class NormaLoader(object):
             ranges.append(Constraint.CardinalityRange(lower, upper))
         return ranges
 
-    def _get_covered_element(self, node):
-        """ Returns element covered by a constraint. Used by ValueConstraint
-            and CardinalityConstraint, which have been moved from their parent
-            nodes to the Constraints node. """
-        try:
-            # _covered_element is added via _move_node_to_constraints()
-            uid = node.get("_covered_element")
-            return [self._elements[uid]]
-        except KeyError:
-            return None
-
     def _load_role_sequence(self, xml_node, constraint_name):
         """ Returns a sequence of roles covered by a constraint.
             xml_node points to the RoleSequence node or its parent node. """
@@ -641,6 +924,14 @@ class NormaLoader(object):
         implied_roles = 0 # Number of implied roles in the sequence
         total_roles = 0   # Total number of roles in the sequence
 
+        # Fast path for a sequence of explicit roles without a join rule
+        refs = self._backend.role_refs(xml_node)
+        if refs is not None:
+            role_sequence.extend(self._elements.get(ref) for ref in refs)
+            implied_roles = sum(role is None for role in role_sequence)
+            total_roles = len(refs)
+            xml_node = [] # Skip the general case below
+
         for node in xml_node:
             if local_tag(node) == "Role":
                 role = self._load_constraint_role(node, name)
@@ -648,8 +939,9 @@ class NormaLoader(object):
                 total_roles += 1
                 role_sequence.append(role)
             elif local_tag(node) == "JoinRule":
+                loader = {'JoinRule': self._load_join_rule}
                 try:
-                    role_sequence.join_path = self._load_join_rule(node)
+                    role_sequence.join_path = self._call_loader(loader, node)
                 except JoinPathException as ex:
                     msg = "{0} because its join path {1}."
                     self.omissions.append(msg.format(name, ex.message))
@@ -779,8 +1071,13 @@ class NormaLoader(object):
 
         first_role = None # First role of this branch of the join path
 
-        for child in node:
-            if local_tag(child) != 'PathedRole':
+        # If the backend confirms that node only holds <PathedRole> nodes 
+        # without children, those checks are skipped below.
+        children = self._backend.pathed_roles(node)
+        checked = children is not None
+
+        for child in children if checked else node:
+            if not checked and local_tag(child) != 'PathedRole':
                 raise JoinPathException(unsupported_node(child, node))         
 
             purpose = child.get("Purpose")
@@ -791,7 +1088,7 @@ class NormaLoader(object):
 
             if role == None:
                 raise JoinPathException("includes an implicit role")           
-            elif len(child) != 0:
+            elif not checked and len(child) != 0:
                 raise JoinPathException(unsupported_node(child[0], child))     
             elif purpose == "PostOuterJoin":
                 raise JoinPathException("includes an outer join")              
@@ -811,9 +1108,224 @@ class NormaLoader(object):
 
         return first_role, prev_role # Permits joining with subsequent branches.              
 
+###############################################################################
+# Load Statistics
+###############################################################################
+class LoadStats(object):
+    """ Profile of a :class:`NormaLoader` run. """
+
+    def __init__(self):
+        #: List of (phase, seconds, elements) tuples in the order the phases 
+        #: ran, where elements is the number of elements added to the model.
+        #: The phases are parse, slice (if a slice is loaded), data types, 
+        #: object types, fact types, constraints and fixups, or only cache if
+        #: the model was taken from a :class:`lib.ModelCache.ModelCache`.
+        self.phases = []
+
+        self.nodes = 0 #: Number of XML nodes parsed from the file
+        self.backend = None #: Name of the XML backend (:mod:`lib.XmlBackend`)
+
+        #: Number of nodes passed to a loader method, by tag
+        self.dispatch = Counter()
+
+        #: Seconds spent in the loader method for each tag.  Loader methods 
+        #: are nested (e.g. Fact contains FactRoles contains Role), so the
+        #: time for a tag includes the time for the tags beneath it.
+        self.dispatch_time = Counter()
+
+    @property
+    def seconds(self):
+        """ Total seconds spent in all phases. """
+        return sum(seconds for _, seconds, _ in self.phases)
+
+    def display(self):
+        """ Prints the statistics to stdout. """
+        print "Load phases:"
+        for name, seconds, elements in self.phases:
+            print " "*3, "{0:<14}{1:9.3f} s{2:8d} elements".format(
+                name, seconds, elements)
+        print " "*3, "{0:<14}{1:9.3f} s".format("total", self.seconds)
+
+        print "XML nodes parsed: {0}".format(self.nodes)
+        print "XML backend: {0}".format(self.backend)
+
+        print "Loader dispatch:"
+        tags = sorted(self.dispatch, 
+                      key=lambda tag: (-self.dispatch_time[tag], tag))
+        for tag in tags:
+            print " "*3, "{0:<32}{1:8d}{2:9.3f} s".format(
+                tag, self.dispatch[tag], self.dispatch_time[tag])
+
+###############################################################################
+# Batch Loading
+###############################################################################
+class LoadResult(object):
+    """ The outcome of loading one file with :func:`load_many`. """
+
+    def __init__(self, filename, model=None, omissions=None, unexpected=None,
+                 error=None, snapshot=None, stats=None):
+        self.filename = filename #: Name of the .orm file
+        self.omissions = omissions or [] #: As in :class:`NormaLoader`
+        self.unexpected = unexpected or set() #: As in :class:`NormaLoader`
+        self.stats = stats #: As in :class:`NormaLoader` (**None** on error)
+        self.error = error #: Error message, or **None** if the file loaded
+
+        #: Snapshot (see :mod:`lib.Snapshot`) of a model loaded by a worker
+        #: process, until the model is first accessed.
+        self.snapshot = snapshot
+        self._model = model
+
+    @property
+    def model(self):
+        """ Loaded model, or **None** if loading failed.  A model loaded by
+            a worker process is decoded from its snapshot on first access, so
+            that decoding does not serialize the work of the pool. """
+        if self._model is None and self.snapshot is not None:
+            self._model = Snapshot.loads(self.snapshot)
+            self.snapshot = None
+        return self._model
+
+    @property
+    def ok(self):
+        """ True iff the file was loaded. """
+        return self.error is None
+
+def load_many(filenames, jobs=None, deontic=False, cache=None):
+    """ Load each file in *filenames* and return a list of 
+        :class:`LoadResult` objects in the same order.  Files are loaded by 
+        *jobs* worker processes (by default, one per CPU); if *jobs* is 1, 
+        or there is only one file, files are loaded in the calling 
+        process.  An error loading one file is recorded in its result and 
+        does not affect the other files.  The 
+        *deontic* and *cache* parameters are passed to :class:`NormaLoader`. 
+        Raises ValueError if *jobs* is less than 1.
+    """
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+    elif jobs < 1:
+        raise ValueError("Number of jobs must be at least 1.")
+
+    files = list(enumerate(filenames))
+
+    # Only models loaded by worker processes are sent back as snapshots
+    parallel = jobs > 1 and len(files) > 1
+    tasks = [(i, filename, deontic, cache, parallel) 
+             for i, filename in files]
+    results = [None] * len(tasks)
+
+    if not parallel:
+        for task in tasks:
+            i, result = _load_one(task)
+            results[i] = result
+        return results
+
+    # Start the largest files first, so that one large file loaded at the
+    # end does not leave the other workers idle.
+    tasks.sort(key=lambda task: _file_size(task[1]), reverse=True)
+
+    pool = multiprocessing.Pool(min(jobs, len(tasks)))
+    try:
+        for i, result in pool.imap_unordered(_load_one, tasks):
+            results[i] = result
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    return results
+
+def _load_one(task):
+    """ Load one file for load_many() and return (index, LoadResult).  If 
+        snapshot is True, the model is returned as a snapshot string, which is
+        cheaper to send between processes than a pickled model. """
+    i, filename, deontic, cache, snapshot = task
+    try:
+        loader = NormaLoader(filename, deontic=deontic, cache=cache)
+        if snapshot:
+            model, snapshot = None, Snapshot.dumps(loader.model)
+        else:
+            model, snapshot = loader.model, None
+        result = LoadResult(filename, model, loader.omissions, 
+                            loader.unexpected, snapshot=snapshot,
+                            stats=loader.stats)
+    except Exception as ex:
+        logging.getLogger(__name__).debug("Could not load %s", filename,
+                                          exc_info=True)
+        result = LoadResult(filename, error=str(ex) or type(ex).__name__)
+    return i, result
+
+def _file_size(filename):
+    """ Returns the size of a file, or 0 if it cannot be determined. """
+    try:
+        return os.path.getsize(filename)
+    except OSError:
+        return 0
+
 ###############################################################################
 # Utility Functions
 ###############################################################################
+@contextmanager
+def open_norma_file(source):
+    """ Context manager that yields a binary stream of the XML in *source*,
+        which is either a file-like object or the name of an .orm, .orm.gz, 
+        or .orm.bz2 file, of a .zip archive holding one .orm file, or of an 
+        .orm file within a .zip archive (e.g. ``models.zip/example.orm``).  
+        Compressed files are decompressed as the stream is read, so nothing
+        is extracted to disk.  A file-like object is not closed. """
+    if hasattr(source, "read"):
+        yield source
+        return
+
+    archive, member = split_archive_path(source)
+    if member is not None:
+        with zipfile.ZipFile(archive) as zip_file:
+            with closing(zip_file.open(member)) as stream:
+                yield stream
+        return
+
+    name = source.lower()
+    if name.endswith(".orm"):
+        stream = open(source, "rb")
+    elif name.endswith(".orm.gz"):
+        stream = gzip.GzipFile(source, "rb")
+    elif name.endswith(".orm.bz2"):
+        stream = bz2.BZ2File(source, "rb")
+    else:
+        raise Exception("Input filename must have .orm extension.")
+
+    with closing(stream):
+        yield stream
+
+def split_archive_path(filename):
+    """ Returns (archive, member) if *filename* names a .zip archive or an 
+        .orm file within one, or (filename, None) otherwise.  A .zip archive
+        named on its own must hold exactly one .orm file. """
+    match = ARCHIVE_MEMBER.match(filename)
+    if match:
+        member = match.group(2).replace("\\", "/")
+        if not member.lower().endswith(".orm"):
+            raise Exception("Input filename must have .orm extension.")
+        return match.group(1), member
+    elif filename.lower().endswith(".zip"):
+        with zipfile.ZipFile(filename) as zip_file:
+            members = [name for name in zip_file.namelist()
+                       if name.lower().endswith(".orm")]
+        if len(members) != 1:
+            msg = "Input archive must contain exactly one .orm file."
+            raise Exception(msg)
+        return filename, members[0]
+    else:
+        return filename, None
+
+def source_name(source):
+    """ Returns the name of a file or file-like object passed to 
+        :class:`NormaLoader`. """
+    if hasattr(source, "read"):
+        return getattr(source, "name", None) or "<stream>"
+    return source
+
 def noop(*args, **kwargs):
     """ Do nothing. """
     pass
@@ -828,7 +1340,8 @@ def find(xml_node, name):
 
 def node_collection(xml_node, name):
     """ Return the collection of nodes named 'name' under a parent xml node. """
-    return find(xml_node, name) or []
+    node = find(xml_node, name)
+    return node if node is not None else []
 
 def get_basic_attribs(xml_node):
     """ Return a dictionary of commonly needed attributes from an xml_node. """
@@ -10,6 +10,10 @@
 
 import sys
 import logging
+import multiprocessing
+
+import lib.ModelPartition as ModelPartition
+import lib.Snapshot as Snapshot
 
 from lib.InequalitySystem \
     import InequalitySystem, Inequality, Variable, Constant, Sum, Product
@@ -36,14 +40,21 @@ class ORMMinusModel(object):
 
         :param model: The corresponding :class:`lib.Model.Model`
         :param ubound: Upper bound on the size of model elements in the solution
+        :param clone: If True, transform a clone of model (see 
+                      :meth:`lib.Model.Model.clone`) and leave model unchanged
 
-        .. warning:: Generating an ORMMinusModel makes irreversible semantic
-           changes to the underlying :class:`lib.Model.Model`.            
+        .. warning:: Unless *clone* is True, generating an ORMMinusModel makes
+           irreversible semantic changes to the underlying 
+           :class:`lib.Model.Model`.
     """
 
     DEFAULT_SIZE = 15 #: Default upper bound on model element cardinalities.
 
-    def __init__(self, model=None, ubound=DEFAULT_SIZE, experimental=False):
+    def __init__(self, model=None, ubound=DEFAULT_SIZE, experimental=False,
+                 clone=False):
+        if clone:
+            model = model.clone()
+
         # Initialize public attributes
         self.base_model = model #: Underlying ORM Model
         self.object_types = model.object_types #: Object types
@@ -352,3 +363,120 @@ class ORMMinusModel(object):
                     self._add(Inequality(lhs=superset_var, rhs=subset_var))
         else:
             self._ignore(cons)
+
+class PartitionedORMMinusModel(object):
+    """ An ORM- model that is checked, and optionally populated, one connected
+        component at a time (see :mod:`lib.ModelPartition`).  No constraint
+        spans two components, so the model is satisfiable iff each component
+        is, and the solutions and populations of the components together
+        form those of the whole model.
+
+        :param model: The corresponding :class:`lib.Model.Model`
+        :param ubound: Upper bound on the size of model elements in the solution
+        :param clone: If True, partition a clone of model and leave model
+                      unchanged
+        :param populate: If True, also generate a population of each component
+        :param processes: Number of processes in which to check components in
+                          parallel; if 1, they are checked in this process
+
+        An element generated by a transformation whose full name is already 
+        in the solution of an earlier component is renamed by an integer
+        suffix, as in :class:`lib.ModelElement.ModelElementSet`.
+
+        .. warning:: Unless *clone* is True, the elements of model are moved
+           to its components and transformed, so model must not be used 
+           afterwards.
+    """
+
+    def __init__(self, model=None, ubound=ORMMinusModel.DEFAULT_SIZE,
+                 experimental=False, clone=False, populate=False, 
+                 processes=1):
+        if clone:
+            model = model.clone()
+        parts = ModelPartition.partition(model)
+
+        self.components = len(parts) #: Number of components in the model
+        self.ignored = [] #: Full names of ignored constraints
+
+        #: True iff a component is changed by a strengthening transformation
+        self.strengthened = False
+
+        #: Solution of the model, or None if any component is unsatisfiable
+        self.solution = {}
+
+        #: A :class:`lib.Population.Population` of the model if *populate* is
+        #: True and the model is satisfiable, else None
+        self.population = None
+
+        if processes > 1 and len(parts) > 1:
+            args = [(Snapshot.dumps(part), ubound, experimental, populate)
+                    for part in parts]
+            pool = multiprocessing.Pool(min(processes, len(parts)))
+            try:
+                results = pool.map(_check_snapshot, args)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_check_component(part, ubound, experimental, populate)
+                       for part in parts]
+
+        self._merge(results, populate)
+
+    def _merge(self, results, populate):
+        """ Merge the results of checking each component. """
+        from lib.Population import Population # Population imports this module
+        population = Population()
+
+        for solution, elements, ignored, strengthened, objects, facts \
+                in results:
+            self.ignored += ignored
+            self.strengthened |= strengthened
+
+            if solution is None:
+                self.solution = None
+            if self.solution is None:
+                continue
+
+            # Constants are named by their value, so only the variables of
+            # elements are renamed.
+            names = {} # Names of this component that are renamed in merge
+            for name in elements:
+                if name in self.solution:
+                    i = 2
+                    while name + str(i) in self.solution or \
+                          name + str(i) in solution:
+                        i = i + 1
+                    names[name] = name + str(i)
+
+            for name, value in solution.iteritems():
+                self.solution[names.get(name, name)] = value
+            for name, pop in (objects or {}).iteritems():
+                population.object_types[names.get(name, name)] = pop
+            for name, pop in (facts or {}).iteritems():
+                population.fact_types[names.get(name, name)] = pop
+
+        if populate and self.solution is not None:
+            self.population = population
+
+def _check_component(model, ubound, experimental, populate):
+    """ Check (and populate) one component of a model, and return the 
+        results as a tuple of plain values. """
+    ormminus = ORMMinusModel(model, ubound=ubound, experimental=experimental)
+    objects, facts = None, None
+    if populate and ormminus.solution is not None:
+        from lib.Population import Population # Population imports this module
+        population = Population(ormminus)
+        objects, facts = population.object_types, population.fact_types
+
+    elements = [var.name for var in ormminus._variables.itervalues()]
+    ignored = [cons.fullname for cons in ormminus.ignored]
+    return (ormminus.solution, elements, ignored, ormminus.strengthened, 
+            objects, facts)
+
+def _check_snapshot(args):
+    """ Wrapper for _check_component in a worker process, which receives the
+        component as a snapshot (see :mod:`lib.Snapshot`). """
+    data, ubound, experimental, populate = args
+    return _check_component(Snapshot.loads(data), ubound, experimental, 
+                            populate)
@@ -21,6 +21,12 @@ class ObjectTypeSet(ModelElementSet):
 class ObjectType(ModelElement):
     """ Abstract class inherited by all object types. """
 
+    # _derived caches the properties derived from roles and ref_roles
+    __slots__ = ("independent", "implicit", "roles", "covered_by", 
+                 "ref_roles", "direct_subtypes", "direct_supertypes",
+                 "_data_type", "domain", "_derived")
+    _transient = ("_derived",)
+
     def __init__(self, independent=False, data_type=None, *args, **kwargs):
         super(ObjectType, self).__init__(*args, **kwargs)
 
@@ -52,6 +58,8 @@ class ObjectType(ModelElement):
         #: to self.data_type but may be overridden by a value constraint.
         self.domain = self._data_type
 
+        self._derived = None
+
     @property
     def primitive(self):
         """ True iff object type has no supertype. """
@@ -70,31 +78,51 @@ class ObjectType(ModelElement):
 
     @property
     def non_ref_roles(self):
-        """ Set of non-reference roles played by the object type. """
-        return set(self.roles) - set(self.ref_roles)
+        """ Set of non-reference roles played by the object type.  The set is
+            cached (see :meth:`invalidate`) and must not be modified. """
+        return self._derived_roles()[0]
 
     @property
     def subject_to_idmc(self):
         """ True iff object type is subject to the implicit disjunctive 
             mandatory constraint. """
         return self.primitive and not self.independent and \
-               len(self.non_ref_roles) > 0 and \
-               not any([role.mandatory for role in self.non_ref_roles])
+               self._derived_roles()[1]
+
+    def invalidate(self):
+        """ Discard the cached properties derived from the roles played by the
+            object type.  This method must be called whenever roles or 
+            ref_roles change, or whether one of the roles is mandatory. The
+            commit and rollback methods of roles and constraints call it. """
+        self._derived = None
+
+    def _derived_roles(self):
+        """ Returns the set of non-reference roles, and whether there is at 
+            least one such role and none of them is mandatory. """
+        derived = getattr(self, "_derived", None) # Unset if cloned or loaded
+        if derived is None:
+            non_ref_roles = set(self.roles) - set(self.ref_roles)
+            derived = self._derived = (non_ref_roles, 
+                len(non_ref_roles) > 0 and 
+                not any([role.mandatory for role in non_ref_roles]))
+        return derived
 
     def commit(self):
         """ Commit any side effects of adding this object type to a model."""
         pass # No side effects generated when creating an ObjectType
 
     def rollback(self):
-        """ Rollback any side effects of adding this object type to a model."""
-        # I don't see a need yet to rollback an ObjectType.  Moreover, it's not
-        # clear to me what the right behavior would be: should I also rollback
-        # all roles/fact types/constraints/subtypes associated with this type?
-        raise NotImplementedError()
+        """ Rollback any side effects of adding this object type to a model.
+            Roles, fact types, and constraints that refer to this object type
+            are not rolled back; the caller must remove them first (see
+            :mod:`lib.ModelDiff`). """
+        pass # No side effects generated when creating an ObjectType
 
 class EntityType(ObjectType):
     """ An entity type is an object type that requires identification. """
 
+    __slots__ = ("identifying_constraint",)
+
     def __init__(self, identifying_constraint=None, *args, **kwargs):
         super(EntityType, self).__init__(*args, **kwargs)
 
@@ -105,12 +133,16 @@ class EntityType(ObjectType):
 class ValueType(ObjectType):
     """ A value type is a self-identifying object type. """
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super(ValueType, self).__init__(*args, **kwargs)
 
 class ObjectifiedType(EntityType):
     """ An objectified type is an entity type that objectifies a fact type. """
 
+    __slots__ = ("nested_fact_type",)
+
     def __init__(self, nested_fact_type=None, *args, **kwargs):
         super(ObjectifiedType, self).__init__(*args, **kwargs)
 
@@ -16,21 +16,23 @@ from lib.Constraint import FrequencyConstraint
 from lib.SubtypeGraph import SubtypeGraph
 from lib.Transformation import AbsorptionFactType
 
-from itertools import cycle
-
 class Population(object):
     """ A population of an ORMMinusModel. If the model is satisfiable, 
         then self.object_types and self.fact_types will contain the
         populations of objects and facts, respectively, that satisfy the
         constraints in the model.  For an unsatisfiable model, 
-        Popuation() will raise a ValueError exception."""
+        Popuation() will raise a ValueError exception.  If model is None,
+        the population is empty (e.g. to merge the populations of the 
+        components of a model into)."""
 
-    def __init__(self, model):
+    def __init__(self, model=None):
         super(Population, self).__init__()
         self._model = model
 
         #: A dictionary of object type populations.  Specifically, the key is
-        #: the object type name and the value is a list of objects.
+        #: the object type name and the value is a sequence of objects (a
+        #: :class:`lib.Domain.DomainView`, which computes each object when
+        #: it is used).
         self.object_types = {}  
 
         #: A dictionary of fact type populations.  Specifically, the key is the
@@ -41,7 +43,9 @@ class Population(object):
         self._roles = {}                          
 
         # Generate the population
-        if model.solution == None:
+        if model is None:
+            pass
+        elif model.solution == None:
             raise ValueError("Cannot populate an unsatisfiable model.")
         else:
             self._populate_object_types_and_roles()
@@ -65,7 +69,7 @@ class Population(object):
             domain = graph.root_of[obj_type].domain                       
 
             # Populate the object type from its root type's domain 
-            self.object_types[name] = list(domain.draw(n))
+            self.object_types[name] = domain.view(n)
 
             # Populate the root roles played by this object type
             self._populate_root_roles(obj_type)
@@ -82,7 +86,7 @@ class Population(object):
         # Create an iterator that will cycle over all objects in the object
         # type's domain in an endless loop.
         obj_name = obj_type.fullname
-        obj_cycle = cycle(self.object_types[obj_name])
+        obj_cycle = self.object_types[obj_name].cycle()
 
         # Get lists of root roles.  For non-experimental case (i.e. McGill), 
         # root_roles should equal obj_type.roles.
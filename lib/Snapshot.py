@@ -0,0 +1,400 @@
+##############################################################################
+# Package: ormpy
+# File:    Snapshot.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" Snapshot.py implements a compact, versioned binary format for a fully
+    loaded :class:`lib.Model.Model`.  Saving a model and loading it back is
+    much faster than re-reading the original .orm file, and the snapshot can
+    be shipped to machines that do not have the NORMA file.  For example: ::
+
+        model = NormaLoader("/path/to/file/example.orm").model
+        model.save("/path/to/file/example.snapshot")
+        ...
+        model = Model.load("/path/to/file/example.snapshot")
+
+    A snapshot consists of a short header (magic string and format version)
+    followed by a :mod:`marshal` encoding of flat tables.  The element table
+    holds every object type, fact type, role and constraint; the domain table
+    holds every :class:`lib.Domain.Domain` (including the contents of value
+    domains), and the sequence table holds every role sequence.  References
+    between elements, domains and sequences are stored as integer indexes
+    into these tables, so the object graph is rebuilt without
+    any GUID lookups and without re-committing constraints: derived state
+    such as covered_by lists, reference roles and subtype links is stored as
+    is.
+"""
+
+import gc
+import contextlib
+import sys
+import struct
+import marshal
+from datetime import date, time, datetime
+
+from lib.ModelElement import ModelElement, attributes, slots
+from lib.Domain import Domain
+from lib.FactType import RoleSequence
+from lib.JoinPath import JoinPath
+from lib.Constraint import Constraint, CardinalityRange
+
+MAGIC = "ORMPYSNP" #: Magic string at the start of every snapshot
+VERSION = 4 #: Incremented whenever the snapshot format changes
+
+_HEADER = struct.Struct(">8sH")
+
+# Tags for encoded values that marshal cannot represent directly.  Encoded
+# values are tuples whose first item is one of these tags; plain tuples are
+# themselves tagged, so a tuple is never ambiguous.  A list is stored as is
+# if it holds only primitive values.
+_ELEMENT, _ELEMENTS, _DOMAIN, _LIST, _RUNS, _SEQUENCE, _JOIN_PATH, _RANGE, \
+    _TUPLE, _SET, _DICT, _DATE, _TIME, _DATETIME = range(14)
+
+_PRIMITIVES = frozenset([type(None), bool, int, long, float, str, unicode])
+_INTEGERS = frozenset([int, long])
+
+def dumps(model):
+    """ Returns the snapshot of *model* as a string. """
+    with _no_gc():
+        return _Encoder().encode(model)
+
+def loads(data):
+    """ Returns the model stored in the snapshot string *data*. """
+    with _no_gc():
+        return _Decoder().decode(data)
+
+def dump(model, stream):
+    """ Write the snapshot of *model* to the binary file object *stream*. """
+    stream.write(dumps(model))
+
+def load(stream):
+    """ Returns the model stored in the binary file object *stream*. """
+    return loads(stream.read())
+
+class SnapshotError(Exception):
+    """ Raised when a model cannot be saved to or loaded from a snapshot. """
+    pass
+
+class _Encoder(object):
+    """ Flattens a model into class, element and domain tables. """
+
+    def __init__(self):
+        self.classes = []  # (module, class, attribute names) per schema
+        self.schemas = {}  # (class, attribute names) -> index in self.classes
+        self.elements = [] # (schema, attribute values) per element
+        self.domains = []  # (schema, attribute values) per domain
+        self.sequences = [] # (roles, join path) per role sequence
+        self.index = {}    # id() of element, domain or sequence -> index
+        self.pending = []  # Elements with an index but no record yet
+        self.keep = []     # Keeps indexed objects alive while encoding
+        self.encoders = {} # Class -> function that encodes its instances
+
+    def encode(self, model):
+        """ Returns the snapshot string for model. """
+        # Constraints are stored in their insertion order, since of_type()
+        # returns them in that order and ORM- checking depends on it.
+        tables = {}
+        for attr, elements in [("object_types", model.object_types),
+                               ("fact_types", model.fact_types),
+                               ("constraints", 
+                                model.constraints.of_type(Constraint))]:
+            tables[attr] = [self.element(e) for e in elements]
+
+        while self.pending:
+            obj = self.pending.pop()
+            self.elements[self.index[id(obj)]] = self.record(obj)
+
+        tables["classes"] = self.classes
+        tables["elements"] = self.elements
+        tables["domains"] = self.domains
+        tables["sequences"] = self.sequences
+
+        try:
+            body = marshal.dumps(tables, 2)
+        except ValueError as ex:
+            raise SnapshotError("Cannot encode snapshot: " + str(ex))
+
+        return _HEADER.pack(MAGIC, VERSION) + body
+
+    def element(self, obj):
+        """ Returns the table index of a model element. """
+        try:
+            return self.index[id(obj)]
+        except KeyError:
+            self.index[id(obj)] = i = len(self.elements)
+            self.elements.append(None) # Encoded once all indexes are known
+            self.pending.append(obj)
+            self.keep.append(obj)
+            return i
+
+    def domain(self, obj):
+        """ Returns the table index of a domain. """
+        try:
+            return self.index[id(obj)]
+        except KeyError:
+            self.index[id(obj)] = i = len(self.domains)
+            self.domains.append(None)
+            self.keep.append(obj)
+            self.domains[i] = self.record(obj)
+            return i
+
+    def sequence(self, obj):
+        """ Returns the table index of a role sequence.  Sequences may be
+            shared by several constraints (e.g. the superset of an equality
+            constraint over three or more sequences). """
+        try:
+            return self.index[id(obj)]
+        except KeyError:
+            self.index[id(obj)] = i = len(self.sequences)
+            self.sequences.append(None)
+            self.keep.append(obj)
+            self.sequences[i] = (self.list(obj), self.value(obj.join_path))
+            return i
+
+    def record(self, obj):
+        """ Returns the (schema, attribute values) record for obj. """
+        cls = type(obj)
+        names, values = [], []
+        for name, value in attributes(obj):
+            try:
+                values.append(self.value(value))
+            except SnapshotError as ex:
+                msg = "Cannot save {0} of {1}: {2}"
+                raise SnapshotError(msg.format(name, cls.__name__, ex.message))
+            names.append(name)
+
+        key = (cls, tuple(names))
+        try:
+            schema = self.schemas[key]
+        except KeyError:
+            self.schemas[key] = schema = len(self.classes)
+            self.classes.append((cls.__module__, cls.__name__, names))
+
+        return (schema, values)
+
+    def value(self, value):
+        """ Returns the encoding of an attribute value. """
+        cls = type(value)
+        if cls in _PRIMITIVES:
+            return value
+
+        try:
+            encoder = self.encoders[cls]
+        except KeyError:
+            encoder = self.encoders[cls] = self.encoder(cls)
+        return encoder(value)
+
+    def encoder(self, cls):
+        """ Returns the function that encodes values of class cls. """
+        if issubclass(cls, tuple(_PRIMITIVES)):
+            return lambda v: v
+        elif issubclass(cls, ModelElement):
+            return lambda v: (_ELEMENT, self.element(v))
+        elif issubclass(cls, Domain):
+            return lambda v: (_DOMAIN, self.domain(v))
+        elif issubclass(cls, RoleSequence):
+            return lambda v: (_SEQUENCE, self.sequence(v))
+        elif issubclass(cls, list):
+            return self.list
+        elif issubclass(cls, JoinPath):
+            return lambda v: (_JOIN_PATH, self.value(v.fact_types),
+                              self.value(v.joins))
+        elif issubclass(cls, CardinalityRange):
+            return lambda v: (_RANGE, v.lower, v.upper)
+        elif issubclass(cls, tuple):
+            return lambda v: (_TUPLE, self.list(v))
+        elif issubclass(cls, (set, frozenset)):
+            return lambda v: (_SET, self.list(v), isinstance(v, frozenset))
+        elif issubclass(cls, dict):
+            return lambda v: (_DICT, self.list(v.keys()), self.list(v.values()))
+        elif issubclass(cls, datetime): # Must precede date (a superclass)
+            return lambda v: (_DATETIME, v.toordinal(), _seconds(v.time()))
+        elif issubclass(cls, date):
+            return lambda v: (_DATE, v.toordinal())
+        elif issubclass(cls, time):
+            return lambda v: (_TIME, _seconds(v))
+        else:
+            raise SnapshotError("unsupported type " + cls.__name__)
+
+    def list(self, values):
+        """ Returns the encoding of a list of values.  Lists of elements
+            and lists of primitives, which make up the bulk of a model, have
+            compact encodings that are cheap to decode. """
+        types = set(map(type, values))
+
+        if types <= _PRIMITIVES:
+            runs = _runs(values) if types <= _INTEGERS else None
+            return (_RUNS, runs) if runs else list(values)
+        elif all(issubclass(cls, ModelElement) for cls in types):
+            return (_ELEMENTS, [self.element(v) for v in values])
+        else:
+            return (_LIST, [self.value(v) for v in values])
+
+class _Decoder(object):
+    """ Rebuilds a model from class, element and domain tables. """
+
+    def __init__(self):
+        self.elements = []
+        self.domains = []
+        self.sequences = []
+
+        self.decoders = {
+            _ELEMENT:   lambda v: self.elements[v[1]],
+            _ELEMENTS:  lambda v: [self.elements[i] for i in v[1]],
+            _DOMAIN:    lambda v: self.domains[v[1]],
+            _LIST:      lambda v: [self.value(x) for x in v[1]],
+            _RUNS:      lambda v: [i for start, stop in v[1]
+                                     for i in xrange(start, stop)],
+            _SEQUENCE:  lambda v: self.sequences[v[1]],
+            _JOIN_PATH: self.join_path,
+            _RANGE:     lambda v: CardinalityRange(v[1], v[2]),
+            _TUPLE:     lambda v: tuple(self.value(v[1])),
+            _SET:       lambda v: (frozenset if v[2] else set)(
+                                      self.value(v[1])),
+            _DICT:      lambda v: dict(zip(self.value(v[1]),
+                                           self.value(v[2]))),
+            _DATE:      lambda v: date.fromordinal(v[1]),
+            _TIME:      lambda v: _time(v[1]),
+            _DATETIME:  lambda v: datetime.combine(date.fromordinal(v[1]),
+                                                   _time(v[2])),
+        }
+
+    def decode(self, data):
+        """ Returns the model stored in the snapshot string data. """
+        from lib.Model import Model # Deferred: lib.Model imports this module
+
+        if len(data) < _HEADER.size:
+            raise SnapshotError("Input is not a model snapshot.")
+
+        magic, version = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise SnapshotError("Input is not a model snapshot.")
+        if version != VERSION:
+            msg = "Unsupported snapshot version {0} (expected {1})."
+            raise SnapshotError(msg.format(version, VERSION))
+
+        try:
+            tables = marshal.loads(data[_HEADER.size:])
+        except (ValueError, EOFError, TypeError):
+            raise SnapshotError("Snapshot is corrupt.")
+
+        try:
+            model = self.build(tables, Model())
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+            raise SnapshotError("Snapshot is corrupt.")
+        return model
+
+    def build(self, tables, model):
+        """ Populate model from the snapshot tables. """
+        classes = [(_class(module, name), names)
+                   for module, name, names in tables["classes"]]
+
+        # Allocate every object first, so that references can be resolved
+        # regardless of the order in which the records appear.
+        for table, records in [(self.elements, tables["elements"]),
+                               (self.domains, tables["domains"])]:
+            for schema, _ in records:
+                cls = classes[schema][0]
+                table.append(cls.__new__(cls))
+
+        value = self.value
+        for roles, join_path in tables["sequences"]:
+            self.sequences.append(RoleSequence(value(roles), value(join_path)))
+
+        setters = [_setter(cls, names) for cls, names in classes]
+        for table, records in [(self.elements, tables["elements"]),
+                               (self.domains, tables["domains"])]:
+            for obj, (schema, values) in zip(table, records):
+                setters[schema](obj, [value(v) for v in values])
+
+        for attr in ["object_types", "fact_types", "constraints"]:
+            for i in tables[attr]:
+                model.add(self.elements[i], commit=False) # Already stored
+        return model
+
+    def value(self, value):
+        """ Returns the attribute value for an encoding. """
+        if type(value) is tuple:
+            return self.decoders[value[0]](value)
+        else:
+            return value
+
+    def join_path(self, value):
+        """ Returns the JoinPath for an encoding. """
+        join_path = JoinPath()
+        join_path._fact_types = self.value(value[1])
+        join_path._joins = self.value(value[2])
+        return join_path
+
+@contextlib.contextmanager
+def _no_gc():
+    """ Suspend the cyclic garbage collector.  Encoding and decoding allocate
+        a great many containers, none of which are garbage, and the collector
+        would otherwise dominate the run time on a large model. """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled: gc.enable()
+
+def _setter(cls, names):
+    """ Returns a function that sets the attributes called names of an 
+        instance of cls to a list of values, whether the attributes are 
+        stored in slots or in __dict__. """
+    descriptors = dict(slots(cls))
+    if not descriptors:
+        return lambda obj, values: obj.__dict__.update(zip(names, values))
+
+    pairs = [(name, descriptors.get(name)) for name in names]
+    def setter(obj, values):
+        """ Set the attributes of obj. """
+        for (name, descriptor), value in zip(pairs, values):
+            if descriptor is None:
+                obj.__dict__[name] = value
+            else:
+                descriptor.__set__(obj, value)
+    return setter
+
+def _class(module, name):
+    """ Returns the class named by module and name.  Only model elements and
+        domains defined within this package may be instantiated. """
+    try:
+        if not module.startswith("lib."):
+            raise KeyError
+        __import__(module)
+        cls = getattr(sys.modules[module], name)
+        if not issubclass(cls, (ModelElement, Domain)):
+            raise KeyError
+    except (ImportError, AttributeError, KeyError, TypeError):
+        raise SnapshotError("Unknown class {0}.{1}".format(module, name))
+    return cls
+
+def _runs(values):
+    """ Returns values, a list of integers, as a list of [start, stop) ranges
+        if values consists of runs of consecutive integers that compress well,
+        else **None**. """
+    if len(values) < 8:
+        return None
+
+    runs = []
+    start = prev = values[0]
+    for v in values[1:]:
+        if v != prev + 1:
+            runs.append((start, prev + 1))
+            start = v
+        prev = v
+    runs.append((start, prev + 1))
+
+    return runs if len(runs) * 4 <= len(values) else None
+
+def _seconds(value):
+    """ Returns a time of day as (seconds, microseconds). """
+    return (value.hour * 3600 + value.minute * 60 + value.second,
+            value.microsecond)
+
+def _time(value):
+    """ Returns the time of day for a (seconds, microseconds) pair. """
+    seconds, micro = value
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60, micro)
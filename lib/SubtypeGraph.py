@@ -8,14 +8,25 @@
     subtype graph of an ORM model.
 """
 
+from lib.ModelElement import ModelChange
+from lib.ObjectType import ObjectType
+from lib.Constraint import SubtypeConstraint
+
 class SubtypeGraph(object):
     """ Subtype graph of an ORM model. 
 
-        .. warning:: If the subtype constraints in the associated model change
-           after the creation of the SubtypeGraph, the SubtypeGraph *will not*
-           automatically update and thus will reflect incorrect information. """
+        If *follow* is True, the graph subscribes to the model's changes (see
+        :meth:`lib.Model.Model.subscribe`) and updates itself as object types
+        and subtype constraints are added and removed, until :meth:`close` is
+        called.  A change that gives an object type more than one root type
+        then raises a ValueError from the method that made the change.
+
+        .. warning:: Unless *follow* is True, if the subtype constraints in 
+           the associated model change after the creation of the 
+           SubtypeGraph, the SubtypeGraph *will not* automatically update and
+           thus will reflect incorrect information. """
 
-    def __init__(self, model, *args, **kwargs):
+    def __init__(self, model, follow=False, *args, **kwargs):
         super(SubtypeGraph, self).__init__(*args, **kwargs)
 
         primitive = lambda x: x.primitive
@@ -37,6 +48,16 @@ class SubtypeGraph(object):
             for child in root.direct_subtypes:
                 self._populate_supertypes_dict(child, root, root)
 
+        self._model = model if follow else None
+        if follow:
+            model.subscribe(self._update)
+
+    def close(self):
+        """ Stop following changes to the model. """
+        if self._model is not None:
+            self._model.unsubscribe(self._update)
+            self._model = None
+
     def _populate_supertypes_dict(self, this, parent, root):
         """ Populate self.root_of and self.supertypes_of for this subtype and
             recursively for each of its subtypes.  """
@@ -59,5 +80,57 @@ class SubtypeGraph(object):
             or second is a supertype of first."""
         return (first == second) or \
                (first in self.supertypes_of[second]) or \
-               (second in self.supertypes_of[first])           
-
+               (second in self.supertypes_of[first])
+
+    def _update(self, change):
+        """ Update the graph for a change to the followed model. """
+        element = change.element
+        if isinstance(element, SubtypeConstraint):
+            if change.kind in (ModelChange.COMMITTED, ModelChange.ROLLED_BACK):
+                self._update_subtree(element.subtype)
+        elif isinstance(element, ObjectType):
+            if change.kind == ModelChange.ADDED:
+                self._update_subtree(element)
+            elif change.kind == ModelChange.REMOVED:
+                self.root_of.pop(element, None)
+                self.supertypes_of.pop(element, None)
+                if element in self.roots:
+                    self.roots.remove(element)
+
+    def _update_subtree(self, top):
+        """ Recompute self.root_of and self.supertypes_of for top and its 
+            direct and indirect subtypes, whose supertypes may have changed. 
+        """
+        # Order the subtree so that each type follows its supertypes
+        order, visited, stack = [], set(), [(top, False)]
+        while stack:
+            this, done = stack.pop()
+            if done:
+                order.append(this)
+            elif this not in visited:
+                visited.add(this)
+                stack.append((this, True))
+                stack.extend((child, False) for child in this.direct_subtypes)
+        order.reverse()
+
+        for this in order:
+            parents = this.direct_supertypes
+            if not parents:
+                root, known = this, set()
+            else:
+                roots = set(self.root_of[parent] for parent in parents)
+                if len(roots) > 1:
+                    msg = "Subtype graph containing {0} has more than one " \
+                          "root type"
+                    raise ValueError(msg.format(this.fullname))
+                root, known = roots.pop(), set(parents)
+                for parent in parents:
+                    known |= self.supertypes_of[parent]
+
+            self.root_of[this] = root
+            self.supertypes_of[this] = known
+
+        if top.primitive and top not in self.roots:
+            self.roots.append(top)
+        elif not top.primitive and top in self.roots:
+            self.roots.remove(top)
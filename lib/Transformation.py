@@ -15,6 +15,7 @@ from lib.Constraint import ValueConstraint, UniquenessConstraint, \
                            FrequencyConstraint, MandatoryConstraint, \
                            SubsetConstraint, EqualityConstraint
 from lib.FactType import Role, FactType, RoleSequence
+from lib.ModelElement import ModelChange
 from lib.ObjectType import ObjectifiedType
 from lib.SubtypeGraph import SubtypeGraph
 
@@ -226,7 +227,8 @@ class AbsorptionTransformation(Transformation):
                     self._add(MandatoryConstraint(covers=[new_role], name=mc_name))
 
                 # Remove original fact type from the model. Can't call 
-                # self._remove here because fact_type.rollback is unimplemented
+                # self._remove here because fact_type.rollback does not
+                # remove the constraints on its roles
                 self._remove_fact_type(old_role.fact_type) 
 
             self._add(UniquenessConstraint(covers=new_roles, name=uc_name,
@@ -292,10 +294,8 @@ class AbsorptionTransformation(Transformation):
         for role in fact_type.roles:
             # To remove constraints, I first need to make a copy of covered_by
             map(self._remove, [cons for cons in role.covered_by])
-            role.player.roles.remove(role)
 
-        self.model.fact_types.remove(fact_type)
-        self.removed.add(fact_type)
+        self._remove(fact_type) # Rollback removes roles from their players
 
     def _simple_iuc(self, cons):
         """ Returns True if cons is a simple internal uniqueness constraint. """
@@ -414,6 +414,7 @@ class OverlappingIFCTransformation(Transformation):
             # change the nature of what is and is not a ref role.
             if ref_roles:
                 outer.identifier_for.ref_roles = ref_roles
+                outer.identifier_for.invalidate()
 
             if inner.max_freq > 1:
                 inner.rollback()
@@ -480,6 +481,7 @@ class EUCStrengtheningTransformation(Transformation):
             # change the nature of what is and is not a reference role.
             if ref_roles:
                 euc.identifier_for.ref_roles = ref_roles
+                euc.identifier_for.invalidate()
 
             # The IUC does not become the identifying constraint because it 
             # doesn't cover all of the reference roles.
@@ -690,9 +692,14 @@ class RootRoleTransformation(Transformation):
             final.append( (root1, subsets1) )
 
         # Add an attribute to each role containing its root role
+        modified = set()
         for root, subset in final:
             for role in subset:
                 role.root_role = root
+                modified.add(role.fact_type)
+
+        for fact_type in modified:
+            self.model.notify(ModelChange.MODIFIED, fact_type)
 
         return self.model_changed
 
@@ -818,6 +825,7 @@ class JoinFactType(FactType):
 
             if orig_role in ref_roles and new_role not in ref_roles:
                 ref_roles.append(new_role)
+                orig_role.player.invalidate()
 
         FactType.commit(self)
 
@@ -0,0 +1,119 @@
+##############################################################################
+# Package: ormpy
+# File:    XmlBackend.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" XmlBackend.py provides the XML parsers used by
+    :class:`lib.NormaLoader.NormaLoader`.  Each backend parses an .orm file
+    incrementally and answers the queries that NormaLoader repeats for every
+    role sequence and join path in the model.  Two backends are available:
+
+    * **lxml**: Uses lxml_, with compiled XPath expressions for the role
+      sequence and join path queries.  Only available if lxml is installed.
+    * **etree**: Uses :mod:`xml.etree.cElementTree` from the standard library.
+
+    .. _lxml: http://lxml.de
+
+    The two backends load identical models.  Although lxml parses faster,
+    each access to a node through lxml is slower, so the etree backend loads
+    most models faster and is the default (see bench/XmlBackendBenchmark.py).
+"""
+
+import xml.etree.cElementTree as etree
+
+try:
+    import lxml.etree as lxml
+except ImportError:
+    lxml = None
+
+NS_CORE = "http://schemas.neumont.edu/ORM/2006-04/ORMCore"
+
+class EtreeBackend(object):
+    """ Backend using :mod:`xml.etree.cElementTree`. """
+
+    name = "etree" #: Name of the backend
+
+    @staticmethod
+    def iterparse(stream):
+        """ Returns an iterator of (event, node) pairs for the "start" and
+            "end" events of each node in stream. """
+        return etree.iterparse(stream, events=("start", "end"))
+
+    @staticmethod
+    def role_refs(sequence_node):
+        """ Returns the ref attributes of the <Role> children of a
+            <RoleSequence> node, or **None** unless every child is a <Role>
+            with a ref attribute and no <ProjectedFrom> child. """
+        role_tag = "{%s}Role" % NS_CORE
+        projected_tag = "{%s}ProjectedFrom" % NS_CORE
+        refs = []
+        for node in sequence_node:
+            ref = node.get("ref")
+            if node.tag != role_tag or ref is None or \
+               node.find(projected_tag) is not None:
+                return None
+            refs.append(ref)
+        return refs
+
+    @staticmethod
+    def pathed_roles(pathed_roles_node):
+        """ Returns the <PathedRole> children of a <PathedRoles> node, or
+            **None** unless every child is a <PathedRole> node without
+            children. """
+        pathed_role_tag = "{%s}PathedRole" % NS_CORE
+        nodes = list(pathed_roles_node)
+        for node in nodes:
+            if node.tag != pathed_role_tag or len(node) != 0:
+                return None
+        return nodes
+
+class LxmlBackend(EtreeBackend):
+    """ Backend using lxml, with compiled XPath queries. """
+
+    name = "lxml" #: Name of the backend
+
+    if lxml is not None:
+        _namespaces = {"orm": NS_CORE}
+        _role_refs = lxml.XPath(
+            "orm:Role[@ref and not(orm:ProjectedFrom)]/@ref",
+            namespaces=_namespaces, smart_strings=False)
+        _pathed_roles = lxml.XPath("orm:PathedRole[not(*)]",
+                                   namespaces=_namespaces)
+
+    @staticmethod
+    def iterparse(stream):
+        """ Returns an iterator of (event, node) pairs for the "start" and
+            "end" events of each node in stream.  Comments and processing
+            instructions are dropped, as they are by the etree backend. """
+        return lxml.iterparse(stream, events=("start", "end"),
+                              remove_comments=True, remove_pis=True)
+
+    @classmethod
+    def role_refs(cls, sequence_node):
+        """ Same as :meth:`EtreeBackend.role_refs`. """
+        refs = cls._role_refs(sequence_node)
+        return refs if len(refs) == len(sequence_node) else None
+
+    @classmethod
+    def pathed_roles(cls, pathed_roles_node):
+        """ Same as :meth:`EtreeBackend.pathed_roles`. """
+        nodes = cls._pathed_roles(pathed_roles_node)
+        return nodes if len(nodes) == len(pathed_roles_node) else None
+
+#: Backends by name
+BACKENDS = {EtreeBackend.name: EtreeBackend, LxmlBackend.name: LxmlBackend}
+
+def available():
+    """ Returns the names of the backends that can be used. """
+    return sorted(name for name in BACKENDS if name != "lxml" or lxml)
+
+DEFAULT = EtreeBackend.name #: Name of the default backend
+
+def get_backend(name=None):
+    """ Returns the backend called *name*, or the default backend if *name* 
+        is **None**. """
+    name = name or DEFAULT
+    if name not in available():
+        raise ValueError("XML backend {0} is not available.".format(name))
+    return BACKENDS[name]
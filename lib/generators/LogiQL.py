@@ -274,6 +274,12 @@ class LogiQL(object):
                 Type_constructor(_: v) -> v = "val1"; v = "val2"; v = "val3".
             If value constraint covers a role, the format is:
                 Pred(_, x), Type_constructor(x: v) -> v = "val1"; v = "val2".
+            A range of two or more integers a..b is written as
+                (string:int:convert[v] >= a, string:int:convert[v] <= b,
+                 int:string:convert[string:int:convert[v]] = v)
+            rather than value by value.  The last conjunct admits only the
+            canonical string of each integer, so that e.g. "007" is not
+            accepted for 7.
         """
         element = cons.covers[0]
         if isinstance(element, ObjectType):
@@ -282,8 +288,16 @@ class LogiQL(object):
             pred = pred_with_args(element.fact_type, [element], "x")
             head = "{0}, {1}(x:v)".format(pred, constructor(element, local=False))
 
-        domain = cons.domain.draw(cons.domain.max_size)
-        tail = '; '.join(['v="{0}"'.format(v) for v in domain])
+        values = []
+        for run in cons.domain.runs():
+            if len(run) == 2 and run[0] != run[1]:
+                values.append("(string:int:convert[v] >= {0}, "
+                              "string:int:convert[v] <= {1}, "
+                              "int:string:convert[string:int:convert[v]] = v)"
+                              .format(*run))
+            else:
+                values.append('v="{0}"'.format(run[0]))
+        tail = '; '.join(values)
 
         return "{0} -> {1}.".format(head, tail)
 
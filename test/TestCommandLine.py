@@ -19,7 +19,9 @@ from nose.plugins.logcapture import LogCapture
 
 import sys
 import os
+import shutil
 import logging
+import tempfile
 from StringIO import StringIO
 
 STDOUT = sys.stdout
@@ -79,6 +81,17 @@ class TestCommandLine(TestCase):
         args = CommandLine.parse_args(["-p", "--custom-size-file", "/dev/null", "test.orm"])
         self.assertEquals(args.random, False)
         self.assertEquals(args.custom_size_file, "/dev/null")
+        self.assertEquals(args.cache_dir, None)
+        self.assertFalse(args.load_stats)
+        self.assertFalse(args.complexity)
+        self.assertEquals(args.seeds, None)
+        self.assertEquals(args.radius, 1)
+
+        args = CommandLine.parse_args(["--slice", "A", "--slice", "B",
+                                       "--radius", "2", "test.orm"])
+        self.assertEquals(args.seeds, ["A", "B"])
+        self.assertEquals(args.radius, 2)
+        self.assertEquals(args.filename, "test.orm")
 
 
     def test_log_config(self):
@@ -112,6 +125,22 @@ class TestCommandLine(TestCase):
         self.assertEquals(model.fact_types.count(), 0)
         self.assertEquals(model.constraints.count(), 0)
 
+    def test_import_model_with_cache(self):
+        """ Test import of a model via the --cache-dir option. """
+        cache_dir = tempfile.mkdtemp()
+        path = os.path.join(self.data_dir, "no_fact_types.orm")
+        args = CommandLine.parse_args(["-c", "--cache-dir", cache_dir, path])
+
+        try:
+            CommandLine.import_model(path, args)
+            self.assertEquals(len(os.listdir(cache_dir)), 1)
+            model = CommandLine.import_model(path, args)
+        finally:
+            shutil.rmtree(cache_dir)
+
+        self.assertEquals(model.object_types.count(), 1)
+        self.assertIsNotNone(model.object_types.get("A"))
+
     def test_import_fail(self):
         """ Test failed import of a model. """
         self.log.beforeTest(None)
@@ -332,6 +361,46 @@ class TestCommandLine(TestCase):
         self.assertEquals(read_stdout(), "Model is satisfiable.\n")
         restore_stdout()
 
+    def test_execute_load_stats(self):
+        """ Test execution with --load-stats parameter. """
+        path = os.path.join(self.data_dir, "no_fact_types.orm")
+        capture_stdout()
+        CommandLine.execute(["--load-stats", path])
+        output = read_stdout()
+        restore_stdout()
+
+        lines = output.splitlines()
+        self.assertEquals(lines[0], "Load phases:")
+        self.assertEquals([line.split()[0] for line in lines[1:8]],
+            ["parse", "data", "object", "fact", "constraints", "fixups", 
+             "total"])
+        self.assertIn("XML nodes parsed: ", output)
+        self.assertIn("Loader dispatch:", output)
+
+    def test_execute_complexity(self):
+        """ Test execution with --complexity parameter. """
+        path = os.path.join(self.data_dir, "no_fact_types.orm")
+        capture_stdout()
+        CommandLine.execute(["--complexity", "-u", "5", path])
+        output = read_stdout()
+        restore_stdout()
+
+        lines = output.splitlines()
+        self.assertEquals(lines[0], "Element counts:")
+        self.assertEquals(lines[1].split(), ["ObjectTypes", "1"])
+        self.assertIn("Estimated population rows: 5\n", output)
+
+    def test_execute_slice(self):
+        """ Test execution with --slice and --radius parameters. """
+        path = os.path.join(self.data_dir, "join_rule_valid_linear_path_euc.orm")
+        capture_stdout()
+        CommandLine.execute(["-m", "--slice", "A", "--radius", "0", path])
+        output = read_stdout()
+        restore_stdout()
+
+        self.assertEquals(output, "Object Types:\n    A\nFact Types:\n"
+            "Constraints:\n    ObjectTypeCardinalityConstraint4\n")
+
     def test_execute_print_and_check(self):
         """ Test execution with --print-model and --check-model parameter. """
         path = os.path.join(self.data_dir, "no_fact_types.orm")
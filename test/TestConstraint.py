@@ -122,6 +122,17 @@ class TestConstraint(TestCase):
         self.assertEquals(ex.exception.message,
             "Value constraints only support integer ranges")       
 
+    def test_vc_large_range(self):
+        """ Test a value constraint range of a million integers. """
+        cons = Constraint.ValueConstraint(name="VC1")
+        cons.domain.add_range("1", "1000000")
+        cons.domain.add_range("0", "2000000", min_open=True)
+        self.assertEquals(cons.size, 2000000)
+        self.assertEquals(cons.domain.max_size, 2000000)
+        self.assertEquals(cons.domain.draw(3), [1, 2, 3])
+        self.assertIn(1999999, cons.domain)
+        self.assertNotIn(0, cons.domain)
+
     def test_add_subset_roles(self):
         """ Test adding subset and superset roles to subset constraint. """
         role1 = Role(name="R1")
@@ -162,6 +173,60 @@ class TestConstraint(TestCase):
         expect = []
         self.assertItemsEqual(actual, expect)
 
+    def test_of_type_hierarchy(self):
+        """ Test that of_type includes subclasses, in the order the 
+            constraints were added. """
+        cons_set = Constraint.ConstraintSet()
+        names = ["U1", "F1", "U2", "E1", "S1", "F2"]
+        classes = [Constraint.UniquenessConstraint,
+                   Constraint.FrequencyConstraint, 
+                   Constraint.UniquenessConstraint,
+                   Constraint.EqualityConstraint,
+                   Constraint.SubsetConstraint,
+                   Constraint.FrequencyConstraint]
+        for name, cls in zip(names, classes):
+            cons_set.add(cls(uid=name, name=name, covers=[]))
+
+        names = lambda cons_type: [c.name for c in cons_set.of_type(cons_type)]
+        self.assertEquals(names(Constraint.FrequencyConstraint),
+                          ["U1", "F1", "U2", "F2"])
+        self.assertEquals(names(Constraint.UniquenessConstraint), 
+                          ["U1", "U2"])
+        self.assertEquals(names(Constraint.SubsetConstraint), ["E1", "S1"])
+        self.assertEquals(names(Constraint.Constraint), 
+                          ["U1", "F1", "U2", "E1", "S1", "F2"])
+        self.assertItemsEqual(names((Constraint.UniquenessConstraint, 
+                                     Constraint.EqualityConstraint)),
+                              ["U1", "U2", "E1"])
+
+    def test_of_type_after_remove(self):
+        """ Test that of_type omits removed constraints and keeps the order
+            of the others. """
+        cons_set = Constraint.ConstraintSet()
+        constraints = [Constraint.MandatoryConstraint(uid=str(i), name="M", 
+                                                      covers=[]) 
+                       for i in xrange(10)]
+        for cons in constraints:
+            cons_set.add(cons)
+
+        for cons in constraints[:8:2] + constraints[1:3]:
+            cons_set.remove(cons)
+        cons_set.remove(Constraint.MandatoryConstraint(name="Unknown"))
+
+        expected = [constraints[i] for i in [3, 5, 7, 8, 9]]
+        self.assertEquals(cons_set.of_type(Constraint.MandatoryConstraint),
+                          expected)
+
+        cons = Constraint.MandatoryConstraint(uid="10", name="M")
+        cons_set.add(cons)
+        self.assertEquals(cons.name, "M")
+        self.assertEquals(cons_set.of_type(Constraint.MandatoryConstraint),
+                          expected + [cons])
+
+        # The result is a copy
+        cons_set.of_type(Constraint.MandatoryConstraint).pop()
+        self.assertEquals(len(cons_set.of_type(Constraint.Constraint)), 6)
+
     def test_mandatory_is_simple(self):
         """ Test simple property on MandatoryConstraint. """
         role1 = Role(uid="R1", name="R1")
@@ -394,12 +459,6 @@ class TestConstraint(TestCase):
         self.assertEquals(obj2.direct_subtypes, [obj1])
         self.assertEquals(obj2.direct_supertypes, [])
 
-        with self.assertRaises(NotImplementedError):
-            cons.rollback()
-
-        # The commented out code below was used before I decided to raise
-        # NotImplementedError for rollback.  See the comments in rollback().
-        """
         cons.rollback()
 
         self.assertEquals(obj1.covered_by, [])
@@ -408,7 +467,6 @@ class TestConstraint(TestCase):
         self.assertEquals(obj2.covered_by, [])
         self.assertEquals(obj2.direct_subtypes, [])
         self.assertEquals(obj2.direct_supertypes, [])
-        """
 
     def test_commit_and_rollback_affect_on_role_unique(self):
         """ Test affect of commit and rollback on role.unique """
@@ -6,11 +6,13 @@
 
 """ This file contains unit tests for the lib.Domain module. """
 
-from unittest import TestCase
+from unittest import TestCase, skipIf
 
 import lib.Domain as Domain
 
 import sys
+from array import array
+from itertools import islice
 from datetime import date, time, datetime
 
 class TestDomain(TestCase):
@@ -174,6 +176,129 @@ class TestDomain(TestCase):
         expected = [0, 1, 2, 3, 4]
         self.assertItemsEqual(actual, expected)
 
+    def test_nth_and_slice(self):
+        """ Confirm nth and slice agree with draw on every kind of domain. """
+        enum = Domain.EnumeratedDomain()
+        enum.add(["b", "a", "c"])
+        interval = Domain.IntervalDomain()
+        interval.add([5, 1, 2, 3, "x", 2.5])
+        interval.add(4)
+        interval.add_range(7, 9)
+        domains = [Domain.IntegerDomain(), Domain.FloatDomain(), 
+                   Domain.BoolDomain(), Domain.StringDomain("s"), 
+                   Domain.DateDomain(), Domain.TimeDomain(), 
+                   Domain.DateTimeDomain(), enum, interval]
+
+        for domain in domains:
+            values = domain.draw(12)
+            n = len(values)
+            whole = n < 12 # Negative indices count from the end of values
+            for i in xrange(-n if whole else 0, n):
+                self.assertEquals(domain.nth(i), values[i])
+            for start in xrange(-3 if whole else 0, n + 2):
+                for stop in ([-1, None] if whole else []) + [0, 1, 3, n]:
+                    self.assertEquals(domain.slice(start, stop), 
+                                      values[start:stop])
+
+        self.assertEquals(interval.draw(20), [1, 2, 2.5, 3, 5, "x", 4, 7, 8, 9])
+        with self.assertRaises(IndexError):
+            interval.nth(10)
+        with self.assertRaises(IndexError):
+            Domain.BoolDomain().nth(-3)
+        with self.assertRaises(IndexError):
+            Domain.EnumeratedDomain().nth(0)
+
+    def test_nth_large(self):
+        """ Confirm nth and slice reach far into a domain without drawing the
+            values before the index. """
+        self.assertEquals(Domain.IntegerDomain().nth(10**15), 10**15)
+        self.assertEquals(Domain.StringDomain().slice(10**15, 10**15 + 2), 
+                          [str(10**15), str(10**15 + 1)])
+
+        domain = Domain.IntervalDomain()
+        domain.add_range(-10**12, 10**12)
+        domain.add_range(10**18, 10**20)
+        self.assertEquals(domain.nth(2 * 10**12), 10**12)
+        self.assertEquals(domain.slice(2 * 10**12, 2 * 10**12 + 3), 
+                          [10**12, 10**18, 10**18 + 1])
+        self.assertEquals(domain.nth(-1), 10**18 + sys.maxsize - 2 * 10**12 - 2)
+
+    def test_nth_default(self):
+        """ Confirm nth steps through the values of a domain without a direct
+            way to compute them. """
+        domain = Domain.Domain(max_size=5)
+        domain._generate = lambda n: (i * i for i in xrange(n))
+        self.assertEquals(domain.nth(3), 9)
+        self.assertEquals(domain.slice(2, 10), [4, 9, 16])
+
+    def test_draw_array(self):
+        """ Confirm draw_array draws the same values as draw. """
+        domains = [Domain.IntegerDomain(), Domain.FloatDomain(), 
+                   Domain.DateDomain(date(2015, 12, 30)), 
+                   Domain.TimeDomain(time(23, 50)), 
+                   Domain.DateTimeDomain(), Domain.StringDomain()]
+        for domain in domains:
+            self.assertEquals(list(domain.draw_array(20)), domain.draw(20))
+            self.assertEquals(len(domain.draw_array(0)), 0)
+        self.assertEquals(len(domain.draw_array(10**5)), 10**5)
+
+    @skipIf(Domain.numpy is not None, "NumPy is installed")
+    def test_draw_array_builtin(self):
+        """ Confirm numeric domains draw into an array.array without NumPy.
+        """
+        values = Domain.IntegerDomain().draw_array(5)
+        self.assertEquals(values, array("l", [0, 1, 2, 3, 4]))
+        values = Domain.FloatDomain().draw_array(3)
+        self.assertEquals(values, array("d", [0.0, 0.1, 0.2]))
+        self.assertIsInstance(Domain.DateDomain().draw_array(3), list)
+
+    @skipIf(Domain.numpy is None, "NumPy is not installed")
+    def test_draw_array_numpy(self):
+        """ Confirm numeric and temporal domains draw into NumPy arrays. """
+        numpy = Domain.numpy
+        for domain, dtype in [(Domain.IntegerDomain(), "int64"),
+                              (Domain.FloatDomain(), "float64"),
+                              (Domain.DateDomain(), "datetime64[D]"),
+                              (Domain.DateTimeDomain(), "datetime64[us]")]:
+            values = domain.draw_array(1000)
+            self.assertEquals(values.dtype, numpy.dtype(dtype))
+            self.assertEquals(values.tolist(), domain.draw(1000))
+
+    def test_view(self):
+        """ Confirm a view holds the same elements as a draw. """
+        interval = Domain.IntervalDomain()
+        interval.add_range(1, 10000)
+        interval.add(["x", "y"])
+        for domain in [Domain.IntegerDomain(), Domain.StringDomain("s"),
+                       Domain.DateTimeDomain(), interval]:
+            values = domain.draw(10002)
+            view = domain.view(10002)
+            self.assertEquals(len(view), len(values))
+            self.assertEquals(list(view), values)
+            self.assertEquals(view, values)
+            self.assertEquals(values, view)
+            self.assertNotEquals(view, values[:-1])
+            self.assertEquals(view[5], values[5])
+            self.assertEquals(view[-1], values[-1])
+            self.assertEquals(view[5000:], values[5000:])
+            self.assertEquals(list(view[4000:9000][1:-1]), values[4001:8999])
+            self.assertEquals(view[1:10:3], values[1:10:3])
+            self.assertEquals(view[20:10], [])
+            with self.assertRaises(IndexError):
+                view[10002]
+
+        self.assertEquals(len(Domain.BoolDomain().view(10)), 2)
+        self.assertEquals(list(islice(Domain.BoolDomain().view(10).cycle(), 
+                                      5)), [False, True, False, True, False])
+        self.assertEquals(list(Domain.EnumeratedDomain().view(3).cycle()), [])
+
+    def test_view_large(self):
+        """ Confirm a view of more elements than could be drawn. """
+        view = Domain.IntegerDomain().view(sys.maxsize)
+        self.assertEquals(len(view), sys.maxsize)
+        self.assertEquals(view[-1], sys.maxsize - 1)
+        self.assertEquals(list(islice(view[10**15:], 2)), [10**15, 10**15 + 1])
+
     def test_enumerated(self):
         """ Test EnumeratedDomain. """
         domain = Domain.EnumeratedDomain()
@@ -222,6 +347,29 @@ class TestDomain(TestCase):
         self.assertItemsEqual(d1.difference(d2)._domain, [1,2])
         self.assertItemsEqual((d2 - d1)._domain, [5, 6])
 
+    def test_enumerated_order(self):
+        """ Confirm set operations keep the order of their operands' values
+            and membership is tested against the values in the domain. """
+        d1 = Domain.EnumeratedDomain()
+        d2 = Domain.EnumeratedDomain()
+        for x in [9, "b", 2, 7, "a"]:
+            d1.add(x)
+        for x in [7, 3, "a", 1, 2.0]:
+            d2.add(x)
+
+        self.assertIn("b", d1)
+        self.assertIn(2.0, d1)
+        self.assertNotIn(3, d1)
+        self.assertEquals((d1 & d2)._domain, [2, 7, "a"])
+        self.assertEquals((d2 & d1)._domain, [7, "a", 2.0])
+        self.assertEquals((d1 - d2)._domain, [9, "b"])
+        self.assertEquals((d1 + d2)._domain, [9, "b", 2, 7, "a", 3, 1])
+        self.assertEquals(d1._domain, [9, "b", 2, 7, "a"])
+
+        combined = d1 + d2
+        combined.add(3)
+        self.assertEquals(combined.size, 7)
+
     def test_enumerated_concat(self):
         """ Test concatenating two enumerated domains. """
         d1 = Domain.EnumeratedDomain()
@@ -234,6 +382,74 @@ class TestDomain(TestCase):
         self.assertEquals((d1 + d2)._domain, [1,2,3,4,5,6])
         self.assertEquals((d2 + d1)._domain, [3,4,5,6,1,2])
 
+    def test_interval(self):
+        """ Test IntervalDomain. """
+        domain = Domain.IntervalDomain()
+
+        self.assertItemsEqual(domain.draw(10), [])
+        self.assertEquals(domain.max_size, 0)
+
+        domain.add(5)
+        domain.add(['c', 3, 'a', 4, 2.5])
+        self.assertEquals(domain.draw(10), [5, 2.5, 3, 4, 'a', 'c'])
+
+        # Add elements already in the domain
+        domain.add('a')
+        domain.add(5.0)
+        domain.add_range(3, 4)
+        self.assertEquals(domain.draw(10), [5, 2.5, 3, 4, 'a', 'c'])
+
+        # Add a range with partial overlap
+        domain.add_range(1, 8)
+        self.assertEquals(domain.draw(10), [5, 2.5, 3, 4, 'a', 'c', 1, 2, 6, 
+                                            7])
+        self.assertEquals(domain.size, 11)
+        self.assertEquals(domain.runs(), [(5, 5), (2.5,), (3, 4), ('a',), 
+                                          ('c',), (1, 2), (6, 8)])
+        self.assertEquals(domain._intervals, [(1, 8)])
+
+    def test_interval_large(self):
+        """ Test an IntervalDomain of more values than could be listed. """
+        domain = Domain.IntervalDomain()
+        domain.add_range(-10**12, 10**12)
+        domain.add_range(10**18, 10**20)
+        self.assertEquals(domain.size, 2 * 10**12 + 1 + 99 * 10**18 + 1)
+        self.assertEquals(domain.max_size, sys.maxsize)
+        self.assertEquals(domain.draw(2), [-10**12, -10**12 + 1])
+        self.assertIn(10**20, domain)
+        self.assertNotIn(10**12 + 1, domain)
+
+        other = Domain.IntervalDomain()
+        other.add_range(0, 10**18)
+        self.assertEquals((domain & other)._runs, [(0, 10**12), 
+                                                   (10**18, 10**18)])
+        self.assertEquals((domain - other)._runs, [(-10**12, -1), 
+                                                   (10**18 + 1, 10**20)])
+        self.assertEquals((other + domain)._runs, [(0, 10**18),
+                          (-10**12, -1), (10**18 + 1, 10**20)])
+
+    def test_interval_matches_enumerated(self):
+        """ Confirm set operations on IntervalDomains give the values, in the
+            same order, as on EnumeratedDomains. """
+        values = [[1, 2, 3, 4, 9, "x", 2.5, 6.0], 
+                  [3, 4, 5, 6, 2.0, "y", "x", 0.5, 6.0, 5.0, 8.0, 8]]
+        enums, intervals = [], []
+        for items in values:
+            enums.append(Domain.EnumeratedDomain())
+            intervals.append(Domain.IntervalDomain())
+            for domain in enums[-1], intervals[-1]:
+                domain.add(list(items))
+                domain.add(7)
+
+        for op in [lambda x, y: x + y, lambda x, y: x & y, 
+                   lambda x, y: x - y]:
+            for i, j in [(0, 1), (1, 0)]:
+                expected = op(enums[i], enums[j])
+                actual = op(intervals[i], intervals[j])
+                self.assertEquals([(type(x), x) for x in actual.draw(20)],
+                                  [(type(x), x) for x in expected.draw(20)])
+                self.assertIs(type(actual), Domain.IntervalDomain)
+
     def test_successful_cast(self):
         """ Test successful cast operation on several types. """
         self.assertEquals(Domain.IntegerDomain.cast("3"), 3)
@@ -56,9 +56,17 @@ class TestFactType(TestCase):
         self.assertItemsEqual(obj2.roles, [role2])
 
     def test_role_rollback(self):
-        """ Confirm rollback of a role raises NotImplementedError. """
-        with self.assertRaises(NotImplementedError):
-            Role().rollback()
+        """ Confirm rollback of a role removes it from its player's roles. """
+        player = ObjectType(name="A")
+        role = Role(player=player)
+        role.commit()
+        self.assertEquals(player.roles, [role])
+
+        role.rollback()
+        self.assertEquals(player.roles, [])
+
+        role.rollback() # Rolling back twice is harmless
+        self.assertEquals(player.roles, [])
 
     def test_duplicate_role_name(self):
         """ Test that a new name is generated for a role if the role name is
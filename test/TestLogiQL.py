@@ -343,14 +343,57 @@ class TestLogiQL(TestCase):
                     "    // Dummy constraint\n",
                     "    string(x) -> string(x).\n",
                     "    // ValueTypeValueConstraint1\n",
-                    '    model:types:A_constructor(_:v) -> v="1"; v="2"; v="3"; v="4"; v="5".\n',
+                    '    model:types:A_constructor(_:v) -> (string:int:convert[v] >= 1, string:int:convert[v] <= 5, int:string:convert[string:int:convert[v]] = v).\n',
                     '    // RoleValueConstraint1\n',
-                    '    model:predicates:AAndBHaveC(_, x, _), model:types:B_constructor(x:v) -> v="7"; v="8"; v="9".\n',
+                    '    model:predicates:AAndBHaveC(_, x, _), model:types:B_constructor(x:v) -> (string:int:convert[v] >= 7, string:int:convert[v] <= 9, int:string:convert[string:int:convert[v]] = v).\n',
                     "  })\n",
                     "} <-- .\n"]
         
         self.assertItemsEqual(actual, expected)
 
+    def test_large_value_constraint(self):
+        """ Test writing out of a value constraint with a large range and 
+            single values. """
+        model = NormaLoader(TestData.path("value_constraints.orm")).model
+        make_all_independent(model) # So that IDMC doesn't apply
+        domain = model.constraints.get("ValueTypeValueConstraint1").domain
+        domain.add(12)
+        domain.add_range(100, 10**12)
+        domain.add("x")
+
+        tempdir = os.path.join(self.tempdir, "test_large_value_constraint")
+        logiql = LogiQL(model, None, tempdir, make=False)
+
+        actual = file_lines(os.path.join(tempdir, "model", "constraints.logic"))
+        self.assertIn('    model:types:A_constructor(_:v) -> '
+                      '(string:int:convert[v] >= 1, string:int:convert[v] <= 5, '
+                      'int:string:convert[string:int:convert[v]] = v); '
+                      'v="12"; '
+                      '(string:int:convert[v] >= 100, '
+                      'string:int:convert[v] <= 1000000000000, '
+                      'int:string:convert[string:int:convert[v]] = v); '
+                      'v="x".\n',
+                      actual)
+
+    def test_non_canonical_value_constraint(self):
+        """ Test that a numeric string that is not the canonical form of an
+            integer is written as a string value, and that ranges admit
+            only canonical integers. """
+        model = NormaLoader(TestData.path("value_constraints.orm")).model
+        make_all_independent(model) # So that IDMC doesn't apply
+        domain = model.constraints.get("ValueTypeValueConstraint1").domain
+        domain.add("007")
+
+        tempdir = os.path.join(self.tempdir, "test_non_canonical_value_constraint")
+        logiql = LogiQL(model, None, tempdir, make=False)
+
+        actual = file_lines(os.path.join(tempdir, "model", "constraints.logic"))
+        self.assertIn('    model:types:A_constructor(_:v) -> '
+                      '(string:int:convert[v] >= 1, string:int:convert[v] <= 5, '
+                      'int:string:convert[string:int:convert[v]] = v); '
+                      'v="007".\n',
+                      actual)
+
     def test_internal_uniq_constraint(self):
         """ Test writing out of internal uniqueness constraints. """
         model = NormaLoader(TestData.path("uniqueness_constraints_2.orm")).model
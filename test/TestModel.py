@@ -13,6 +13,7 @@ from lib.Model import Model
 from lib.ObjectType import ObjectType
 from lib.FactType import FactType, Role
 from lib.Constraint import Constraint
+from lib.ModelElement import ModelChange
 
 class TestModel(TestCase):
     """ Unit tests for the Model class. """
@@ -49,16 +50,9 @@ class TestModel(TestCase):
         self.assertEquals(model.object_types.count(), 1)
         self.assertEquals(model.object_types.get("O1"), obj1)
 
-        with self.assertRaises(NotImplementedError):
-            model.remove(obj1)
-
-        # I decided for now to just raise a NotImplementedError for rollback,
-        # since I'm not sure what the right behavior should be.
-        """
         model.remove(obj1)
         self.assertEquals(model.object_types.count(), 0)
         self.assertEquals(model.object_types.get("O1"), None)
-        """
 
     def test_add_remove_fact_type(self):
         """ Test adding and removing a fact type from the model. """
@@ -70,16 +64,13 @@ class TestModel(TestCase):
         self.assertEquals(model.fact_types.count(), 1)
         self.assertEquals(model.fact_types.get("F1"), fact)
 
-        with self.assertRaises(NotImplementedError):
-            model.remove(fact)
+        player = fact.roles[0].player
+        self.assertEquals(player.roles, fact.roles)
 
-        # I decided for now to just raise a NotImplementedError for rollback,
-        # since I'm not sure what the right behavior should be.
-        """
         model.remove(fact)
         self.assertEquals(model.fact_types.count(), 0)
         self.assertEquals(model.fact_types.get("F1"), None)
-        """
+        self.assertEquals(player.roles, [])
 
     def test_add_remove_generic_constraint(self):
         """ Test adding and removing a generic constraint from the model. """
@@ -136,3 +127,90 @@ class TestModel(TestCase):
         self.assertEquals(model.get("ObjectTypes."), None)
         self.assertEquals(model.get("F1"), None)       
 
+
+    def test_get_roles(self):
+        """ Test get() method on roles, including roles added after the fact
+            type was added to the model. """
+        model = Model()
+        obj = ObjectType(name="O1")
+        fact = FactType(name="F1")
+        role1 = fact.add_role(player=obj, name="R1")
+        model.add(obj)
+        model.add(fact)
+        role2 = fact.add_role(player=obj, name="R2")
+
+        self.assertIs(model.get("FactTypes.F1.Roles.R1"), role1)
+        self.assertIs(model.get("FactTypes.F1.Roles.R2"), role2)
+        self.assertIs(model.get_by_uid(role1.uid), role1)
+        self.assertIs(model.get_by_uid(role2.uid), role2)
+
+        model.remove(fact)
+        self.assertIsNone(model.get("FactTypes.F1.Roles.R1"))
+        self.assertIsNone(model.get_by_uid(role2.uid))
+
+        fact.add_role(player=obj, name="R3") # Not registered once removed
+        self.assertIsNone(model.get("FactTypes.F1.Roles.R3"))
+        self.assertEquals(len(model.registry), 1)
+
+    def test_get_by_uid(self):
+        """ Test get_by_uid() method. """
+        model = Model()
+        obj1 = ObjectType(name="O1", uid="1")
+        obj2 = ObjectType(name="O1", uid="2")
+        cons = Constraint(name="C1", uid="3")
+
+        model.add(obj1)
+        model.add(obj2)
+        model.add(cons)
+
+        self.assertIs(model.get_by_uid("1"), obj1)
+        self.assertIs(model.get_by_uid("2"), obj2)
+        self.assertIs(model.get_by_uid("3"), cons)
+        self.assertIsNone(model.get_by_uid("4"))
+
+        # Renamed when added, and registered by its new name
+        self.assertIs(model.get("ObjectTypes.O12"), obj2)
+
+        model.remove(obj1)
+        self.assertIsNone(model.get_by_uid("1"))
+        self.assertIsNone(model.get("ObjectTypes.O1"))
+        self.assertIs(model.get("ObjectTypes.O12"), obj2)
+
+    def test_add_without_commit(self):
+        """ Test adding an element whose side effects are already in place. """
+        model = Model()
+        obj1 = ObjectType(name="O1")
+        cons1 = Constraint(name="C1", covers=[obj1])
+        model.add(obj1)
+        model.add(cons1, commit=False)
+
+        self.assertIs(model.get("Constraints.C1"), cons1)
+        self.assertEquals(obj1.covered_by, [])
+
+    def test_subscribe(self):
+        """ Test that subscribers receive a record of each change. """
+        model = Model()
+        journal = []
+        model.subscribe(journal.append)
+
+        obj = ObjectType(name="O1")
+        cons = Constraint(name="C1", covers=[obj])
+        model.add(obj)
+        model.add(cons)
+        cons.rollback() # As done by transformations that modify constraints
+        cons.commit()
+        model.remove(cons)
+        cons.commit() # No longer in the model
+
+        self.assertEquals([(c.kind, c.element) for c in journal], 
+                          [(ModelChange.ADDED, obj),
+                           (ModelChange.ADDED, cons),
+                           (ModelChange.COMMITTED, cons),
+                           (ModelChange.ROLLED_BACK, cons),
+                           (ModelChange.COMMITTED, cons),
+                           (ModelChange.ROLLED_BACK, cons),
+                           (ModelChange.REMOVED, cons)])
+
+        model.unsubscribe(journal.append)
+        model.remove(obj)
+        self.assertEquals(len(journal), 7)
@@ -0,0 +1,143 @@
+##############################################################################
+# Package: ormpy
+# File:    TestModelCache.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" This file contains unit tests for the lib.ModelCache module. """
+
+import os
+import time
+import shutil
+import tempfile
+from unittest import TestCase
+
+import lib.TestDataLocator as TestDataLocator
+from lib.ModelCache import ModelCache
+from lib.NormaLoader import NormaLoader
+from lib.ObjectType import ObjectifiedType
+
+class TestModelCache(TestCase):
+    """ Unit tests for the ModelCache class. """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def entries(self):
+        """ Return the names of the entries in the cache directory. """
+        return [f for f in os.listdir(self.cache_dir) if f.endswith(".model")]
+
+    def test_cache_hit_skips_parse(self):
+        """ Confirm a cache hit returns the model without parsing the file. """
+        fname = TestDataLocator.path("join_rule_valid_linear_path_euc.orm")
+        cache = ModelCache(self.cache_dir)
+
+        first = NormaLoader(fname, cache=cache)
+        self.assertEquals(len(self.entries()), 1)
+
+        class NoParseLoader(NormaLoader):
+            def _parse_norma_file(self, filename):
+                raise Exception("File was parsed")
+
+        second = NoParseLoader(fname, cache=cache)
+        model = second.model
+
+        self.assertEquals(second.omissions, first.omissions)
+        self.assertEquals(second.unexpected, first.unexpected)
+        self.assertEquals(model.object_types.count(),
+                          first.model.object_types.count())
+        self.assertEquals(model.constraints.count(),
+                          first.model.constraints.count())
+
+        # Cross references between elements survive the round trip
+        euc = model.constraints.get("EUC")
+        role = euc.covers[0]
+        self.assertIn(role, role.fact_type.roles)
+        self.assertIn(euc, role.covered_by)
+        self.assertIn(role, role.player.roles)
+        self.assertIs(euc.covers.join_path.fact_types[0],
+                      model.fact_types.get(role.fact_type.name))
+
+    def test_cache_links_subtypes_and_objectifications(self):
+        """ Confirm subtypes and objectifications are linked after a hit. """
+        for fname in ["subtypes.orm", "objectification.orm"]:
+            path = TestDataLocator.path(fname)
+            cache = ModelCache(self.cache_dir)
+            NormaLoader(path, cache=cache)
+            model = NormaLoader(path, cache=cache).model
+
+            for obj in model.object_types:
+                for sub in obj.direct_subtypes:
+                    self.assertIn(obj, sub.direct_supertypes)
+                if isinstance(obj, ObjectifiedType):
+                    self.assertIs(obj.nested_fact_type,
+                        model.fact_types.get(obj.nested_fact_type.name))
+
+    def test_deontic_flag_is_part_of_key(self):
+        """ Confirm deontic and alethic loads are cached separately. """
+        fname = TestDataLocator.path("deontic_constraints.orm")
+        cache = ModelCache(self.cache_dir)
+
+        alethic = NormaLoader(fname, cache=cache).model
+        deontic = NormaLoader(fname, deontic=True, cache=cache).model
+
+        self.assertEquals(len(self.entries()), 2)
+        self.assertNotEquals(cache.key(fname, False), cache.key(fname, True))
+        self.assertTrue(deontic.constraints.count() >
+                        alethic.constraints.count())
+
+        alethic2 = NormaLoader(fname, cache=cache).model
+        self.assertEquals(alethic2.constraints.count(),
+                          alethic.constraints.count())
+
+    def test_corrupt_entry_is_a_miss(self):
+        """ Confirm a corrupt entry is removed and the file is reloaded. """
+        fname = TestDataLocator.path("simple_model.orm")
+        cache = ModelCache(self.cache_dir)
+        key = cache.key(fname, False)
+
+        with open(os.path.join(self.cache_dir, key + ".model"), "w") as out:
+            out.write("not a model")
+
+        self.assertIsNone(cache.get(key))
+        self.assertEquals(self.entries(), [])
+
+        model = NormaLoader(fname, cache=cache).model
+        self.assertTrue(model.object_types.count() > 0)
+        self.assertIsNotNone(cache.get(key))
+
+    def test_evict_by_age(self):
+        """ Confirm entries unused for longer than max_age are evicted. """
+        cache = ModelCache(self.cache_dir, max_age=60)
+        NormaLoader(TestDataLocator.path("simple_model.orm"), cache=cache)
+        old = os.path.join(self.cache_dir, self.entries()[0])
+
+        stale = time.time() - 120
+        os.utime(old, (stale, stale))
+
+        NormaLoader(TestDataLocator.path("subtypes.orm"), cache=cache)
+        self.assertEquals(len(self.entries()), 1)
+        self.assertFalse(os.path.exists(old))
+
+    def test_evict_by_size(self):
+        """ Confirm least recently used entries are evicted when the cache
+            exceeds max_size. """
+        cache = ModelCache(self.cache_dir)
+        NormaLoader(TestDataLocator.path("simple_model.orm"), cache=cache)
+        old = os.path.join(self.cache_dir, self.entries()[0])
+
+        stale = time.time() - 120
+        os.utime(old, (stale, stale))
+
+        NormaLoader(TestDataLocator.path("subtypes.orm"), cache=cache)
+        self.assertEquals(len(self.entries()), 2)
+        new = [f for f in self.entries() if f != os.path.basename(old)][0]
+
+        # Room for the most recently used entry only
+        cache.max_size = os.path.getsize(os.path.join(self.cache_dir, new))
+        cache.evict()
+
+        self.assertEquals(self.entries(), [new])
@@ -0,0 +1,160 @@
+##############################################################################
+# Package: ormpy
+# File:    TestModelClone.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" This file contains unit tests for the lib.ModelClone module. """
+
+import os
+from datetime import date, time, datetime
+from unittest import TestCase
+
+import lib.TestDataLocator as TestDataLocator
+import lib.Snapshot as Snapshot
+from lib.Model import Model
+from lib.ModelElement import attributes
+from lib.NormaLoader import NormaLoader
+from lib.ORMMinusModel import ORMMinusModel
+from lib.ObjectType import ObjectType
+from lib.FactType import FactType
+from lib.Constraint import Constraint, SubtypeConstraint
+
+IMMUTABLE = (type(None), bool, int, long, float, str, unicode,
+             date, time, datetime)
+
+class TestModelClone(TestCase):
+    """ Unit tests for the ModelClone module. """
+
+    def assertCloned(self, expected, actual):
+        """ Assert that actual is a copy of expected that shares no mutable
+            object with it. """
+        for attr in ["object_types", "fact_types", "constraints"]:
+            exp = sorted(getattr(expected, attr), key=lambda x: x.name)
+            act = sorted(getattr(actual, attr), key=lambda x: x.name)
+            self.assertEquals([x.name for x in exp], [x.name for x in act])
+            for x, y in zip(exp, act):
+                self.assertClonedValue(x, y, {})
+
+    def assertClonedValue(self, expected, actual, seen):
+        """ Recursively compare two attribute values.  seen maps the id of
+            each object already compared to the object it was matched with,
+            which confirms that shared references remain shared. """
+        self.assertIs(type(actual), type(expected))
+
+        if isinstance(expected, IMMUTABLE):
+            self.assertEquals(actual, expected)
+            return
+
+        if id(expected) in seen:
+            self.assertIs(seen[id(expected)], actual)
+            return
+        seen[id(expected)] = actual
+        self.assertIsNot(actual, expected)
+
+        if isinstance(expected, (list, tuple)):
+            self.assertEquals(len(actual), len(expected))
+            for x, y in zip(expected, actual):
+                self.assertClonedValue(x, y, seen)
+        if isinstance(expected, (set, frozenset)):
+            self.assertEquals(len(actual), len(expected))
+        if isinstance(expected, dict):
+            self.assertEquals(len(actual), len(expected))
+        if hasattr(expected, "__dict__") or hasattr(expected, "__slots__"):
+            exp, act = dict(attributes(expected)), dict(attributes(actual))
+            self.assertItemsEqual(act.keys(), exp.keys())
+            for key in exp:
+                self.assertClonedValue(exp[key], act[key], seen)
+
+    def test_clone_test_models(self):
+        """ Confirm every loadable test model is cloned correctly. """
+        count = 0
+        for fname in sorted(os.listdir(TestDataLocator.get_data_dir())):
+            if not fname.endswith(".orm"):
+                continue
+            try:
+                model = NormaLoader(TestDataLocator.path(fname)).model
+            except Exception:
+                continue # Invalid test models are expected to fail to load
+
+            self.assertCloned(model, model.clone())
+            count += 1
+
+        self.assertTrue(count > 50)
+
+    def test_references_remapped(self):
+        """ Confirm references between elements point into the clone. """
+        fname = TestDataLocator.path("join_rule_valid_linear_path_euc.orm")
+        copy = NormaLoader(fname).model.clone()
+
+        euc = copy.constraints.get("EUC")
+        role = euc.covers[0]
+        self.assertIs(copy.get_by_uid(role.uid), role)
+        self.assertIs(copy.get(role.fullname), role)
+        self.assertIn(role, role.fact_type.roles)
+        self.assertIn(euc, role.covered_by)
+        self.assertIn(role, role.player.roles)
+        self.assertIs(euc.covers.join_path.fact_types[0],
+                      copy.fact_types.get(role.fact_type.name))
+
+        # Roles added to a cloned fact type are registered in the clone
+        new_role = role.fact_type.add_role(player=role.player)
+        self.assertIs(copy.get_by_uid(new_role.uid), new_role)
+
+    def test_subtype_links(self):
+        """ Confirm subtype links are remapped. """
+        model = Model()
+        sup, sub = ObjectType(name="A"), ObjectType(name="B")
+        model.add(sup)
+        model.add(sub)
+        model.add(SubtypeConstraint(sub, sup, name="S"))
+
+        copy = model.clone()
+        sup, sub = copy.get("ObjectTypes.A"), copy.get("ObjectTypes.B")
+        self.assertEquals(sup.direct_subtypes, [sub])
+        self.assertEquals(sub.direct_supertypes, [sup])
+        self.assertIs(copy.get("Constraints.S").supertype, sup)
+
+    def test_constraint_order(self):
+        """ Confirm constraints keep the order in which they were added. """
+        model = Model()
+        obj = ObjectType(name="O1")
+        model.add(obj)
+        for name in ["C9", "C1", "C5", "C3"]:
+            model.add(Constraint(name=name, covers=[obj]))
+
+        copy = model.clone()
+        names = ["C9", "C1", "C5", "C3"]
+        constraints = copy.constraints.of_type(Constraint)
+        self.assertEquals([c.name for c in constraints], names)
+        covered_by = copy.get("ObjectTypes.O1").covered_by
+        self.assertEquals([c.name for c in covered_by], names)
+
+    def test_unset_slot(self):
+        """ Confirm a slot that is unset in the original is unset in the
+            clone, and that a fact type outside the model is cloned. """
+        model = Model()
+        fact = FactType(name="F1")
+        role = fact.add_role(player=ObjectType(name="O1"))
+        model.add(Constraint(name="C1", covers=[role]))
+
+        copy = model.clone()
+        role = copy.get("Constraints.C1").covers[0]
+        self.assertFalse(hasattr(role, "root_role"))
+        self.assertIsNone(copy.get(role.fullname)) # Fact type not in model
+        self.assertEquals(role.fact_type.add_role(player=role.player).name,
+                          "O12")
+
+    def test_ormminus_leaves_original(self):
+        """ Confirm ORMMinusModel does not change a model it clones. """
+        fname = TestDataLocator.path("absorption_valid_simple.orm")
+        model = NormaLoader(fname).model
+        before = Snapshot.dumps(model)
+
+        solution = ORMMinusModel(model, ubound=10, clone=True).solution
+        self.assertEquals(solution["FactTypes.EUC1"], 10)
+        self.assertEquals(Snapshot.dumps(model), before)
+
+        # The original can be checked again and gives the same result
+        solution = ORMMinusModel(model, ubound=10).solution
+        self.assertEquals(solution["FactTypes.EUC1"], 10)
@@ -0,0 +1,124 @@
+##############################################################################
+# Package: ormpy
+# File:    TestModelComplexity.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" This file contains unit tests for the lib.ModelComplexity module. """
+
+import sys
+from StringIO import StringIO
+from unittest import TestCase
+
+import lib.TestDataLocator as TestDataLocator
+from lib.ModelComplexity import ComplexityReport, longest_path
+from lib.Model import Model
+from lib.NormaLoader import NormaLoader
+from lib.ORMMinusModel import ORMMinusModel
+from lib.Population import Population
+from lib.ObjectType import ObjectType
+from lib.FactType import FactType
+from lib.Constraint import SubsetConstraint, ValueConstraint, \
+                           UniquenessConstraint
+
+class TestModelComplexity(TestCase):
+    """ Unit tests for the ModelComplexity module. """
+
+    def test_longest_path(self):
+        """ Confirm the longest path of a graph, with a cycle counted as a
+            single node. """
+        self.assertEquals(longest_path({}), 0)
+        self.assertEquals(longest_path({1: set([2]), 2: set([3])}), 2)
+        self.assertEquals(longest_path({1: set([2, 4]), 2: set([3]),
+                                        3: set([1, 5]), 5: set([6])}), 2)
+
+        chain = dict((i, set([i + 1])) for i in xrange(5000))
+        self.assertEquals(longest_path(chain), 5000)
+
+    def test_counts(self):
+        """ Confirm the element counts and histograms of a model. """
+        model = Model()
+        objs = [ObjectType(name=name) for name in "ABC"]
+        for obj in objs:
+            model.add(obj)
+
+        facts = []
+        for name, players in [("F1", objs), ("F2", objs[:2]), ("F3", objs[:2]),
+                              ("F4", objs[2:])]:
+            fact = FactType(name=name)
+            for player in players:
+                fact.add_role(player=player)
+            model.add(fact)
+            facts.append(fact)
+
+        model.add(UniquenessConstraint(name="U1", covers=facts[0].roles[:2]))
+        model.add(UniquenessConstraint(name="U2", covers=facts[1].roles[:1]))
+        for i, (sub, sup) in enumerate([(1, 2), (2, 0), (0, 3), (1, 3)]):
+            model.add(SubsetConstraint(name="S" + str(i),
+                      subset=facts[sub].roles[:1],
+                      superset=facts[sup].roles[:1]))
+
+        report = ComplexityReport(model, ubound=10)
+        self.assertEquals(report.counts, {"ObjectTypes": 3, "FactTypes": 4,
+                                          "Roles": 8, "Constraints": 6})
+        self.assertEquals(report.kinds["UniquenessConstraint"], 2)
+        self.assertEquals(report.arity, {1: 1, 2: 2, 3: 1})
+        self.assertEquals(report.spans, {1: 1, 2: 1})
+        self.assertEquals(report.subset_depth, 3)
+        self.assertEquals(report.subset_fanout, 2)
+        self.assertEquals(report.subtype_depth, 0)
+        self.assertEquals(report.largest_product, (1000, facts[0]))
+        self.assertEquals(report.rows, 3*10 + 4*10)
+        self.assertEquals(report.components, [13])
+
+    def test_bounds(self):
+        """ Confirm value constraints limit the estimated population. """
+        model = Model()
+        obj = ObjectType(name="A")
+        model.add(obj)
+        fact = FactType(name="AR")
+        fact.add_role(player=obj)
+        fact.add_role(player=obj)
+        model.add(fact)
+
+        cons = ValueConstraint(name="V1", covers=[obj])
+        cons.domain.add_range(1, 3)
+        model.add(cons)
+
+        report = ComplexityReport(model, ubound=100)
+        self.assertEquals(report.largest_product, (9, fact))
+        self.assertEquals(report.rows, 3 + 9)
+
+    def test_rows_bound_population(self):
+        """ Confirm the estimate bounds the population of test models. """
+        for fname in ["subset_variety.orm", "populate_fact_types.orm",
+                      "subtypes.orm", "fact_type_parts.orm"]:
+            model = NormaLoader(TestDataLocator.path(fname)).model
+            report = ComplexityReport(model, ubound=5)
+
+            pop = Population(ORMMinusModel(model, ubound=5))
+            rows = sum(len(x) for x in pop.object_types.itervalues()) + \
+                   sum(len(x) for x in pop.fact_types.itervalues())
+            self.assertTrue(0 < rows <= report.rows)
+
+    def test_subtype_depth(self):
+        """ Confirm the depth of the subtype graph of a test model. """
+        fname = TestDataLocator.path("subtypes.orm")
+        report = ComplexityReport(NormaLoader(fname).model)
+        self.assertEquals(report.subtype_depth, 3)
+        self.assertEquals(report.ubound, ORMMinusModel.DEFAULT_SIZE)
+
+    def test_display(self):
+        """ Confirm the report can be displayed. """
+        fname = TestDataLocator.path("subset_variety.orm")
+        report = ComplexityReport(NormaLoader(fname).model)
+        stdout, sys.stdout = sys.stdout, StringIO()
+        try:
+            report.display()
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+
+        self.assertIn("Subset constraint depth: 3\n", output)
+        self.assertIn("Connected components: 3 (largest: 33 elements)\n",
+                      output)
@@ -0,0 +1,210 @@
+##############################################################################
+# Package: ormpy
+# File:    TestModelDiff.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" This file contains unit tests for the lib.ModelDiff module. """
+
+import os
+import re
+import sys
+import shutil
+import tempfile
+from StringIO import StringIO
+from unittest import TestCase
+
+import lib.TestDataLocator as TestDataLocator
+from lib.ModelDiff import ModelDiff, reload_model
+from lib.NormaLoader import NormaLoader
+from lib.ORMMinusModel import ORMMinusModel
+from lib.Model import Model
+from lib.Constraint import Constraint, EqualityConstraint
+
+class TestModelDiff(TestCase):
+    """ Unit tests for the ModelDiff module. """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        fname = "join_rule_valid_linear_path_euc.orm"
+        self.fname = TestDataLocator.path(fname)
+        self.model = NormaLoader(self.fname).model
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def edit(self, pattern, replacement):
+        """ Write a copy of the test model with pattern replaced, and return
+            the name of the copy. """
+        with open(self.fname) as in_file:
+            text = in_file.read()
+
+        text, count = re.subn(pattern, replacement, text, count=1,
+                              flags=re.S)
+        self.assertEquals(count, 1)
+
+        path = os.path.join(self.temp_dir, "edited.orm")
+        with open(path, "w") as out_file:
+            out_file.write(text)
+        return path
+
+    def elements(self, model):
+        """ Returns a dictionary of the model's elements by name. """
+        return dict((el.fullname, el) for el in list(model.object_types) +
+                    list(model.fact_types) + list(model.constraints))
+
+    def assertSameAsLoaded(self, model, fname):
+        """ Assert that model is equivalent to a new load of fname. """
+        loaded = self.elements(NormaLoader(fname).model)
+        actual = self.elements(model)
+        self.assertItemsEqual(actual.keys(), loaded.keys())
+
+        names = lambda elements: sorted(x.fullname for x in elements)
+        for name, element in actual.iteritems():
+            expected = loaded[name]
+            self.assertEquals(element.uid, expected.uid)
+            self.assertEquals(names(getattr(element, "covered_by", [])),
+                              names(getattr(expected, "covered_by", [])))
+            if hasattr(element, "player"):
+                self.assertIs(element.player, actual[element.player.fullname])
+            if hasattr(element, "direct_subtypes"):
+                self.assertEquals(names(element.roles), names(expected.roles))
+                self.assertEquals(element.domain.draw(10),
+                                  expected.domain.draw(10))
+            for role in getattr(element, "roles", []):
+                if role.fact_type is element:
+                    self.assertIs(role.player,
+                                  actual[role.player.fullname])
+                    self.assertIn(role, role.player.roles)
+            for covered in element.covers or [] \
+                    if hasattr(element, "covers") else []:
+                self.assertIn(element, covered.covered_by)
+
+    def test_no_changes(self):
+        """ Confirm that reloading an unchanged file changes nothing. """
+        before = self.elements(self.model)
+        diff = reload_model(self.model, self.fname)
+
+        self.assertTrue(diff.empty)
+        self.assertEquals(diff.relinked, [])
+        after = self.elements(self.model)
+        for name, element in before.iteritems():
+            self.assertIs(after[name], element)
+
+    def test_modified_constraint(self):
+        """ Confirm that only a modified constraint is replaced. """
+        fname = self.edit('From="3" To="3"', 'From="3" To="4"')
+        before = self.elements(self.model)
+        diff = reload_model(self.model, fname)
+
+        name = "Constraints.ObjectTypeCardinalityConstraint2"
+        self.assertEquals([x.fullname for x in diff.modified], [name])
+        self.assertEquals(diff.added + diff.removed + diff.relinked, [])
+
+        after = self.elements(self.model)
+        self.assertEquals(after[name].ranges[0].upper, 4)
+        self.assertIsNot(after[name], before[name])
+        self.assertIs(after[name].covers[0], before["ObjectTypes.C"])
+        self.assertEquals(before["ObjectTypes.C"].covered_by, [after[name]])
+
+        for other in before:
+            if other != name:
+                self.assertIs(after[other], before[other])
+
+        self.assertSameAsLoaded(self.model, fname)
+
+    def test_removed_constraint(self):
+        """ Confirm that a removed constraint is rolled back. """
+        fname = self.edit(r'<orm:UniquenessConstraint [^>]*Name="EUC">.*?'
+                          r'</orm:UniquenessConstraint>', '')
+        euc = self.model.constraints.get("EUC")
+        diff = reload_model(self.model, fname)
+
+        self.assertEquals(diff.removed, [euc])
+        self.assertEquals(diff.added + diff.modified + diff.relinked, [])
+        self.assertIsNone(self.model.constraints.get("EUC"))
+        for role in euc.covers:
+            self.assertNotIn(euc, role.covered_by)
+
+        self.assertSameAsLoaded(self.model, fname)
+
+    def test_modified_object_type(self):
+        """ Confirm that the elements referring to a modified object type are
+            replaced. """
+        fname = self.edit('Name="A"', 'Name="Z"')
+        diff = reload_model(self.model, fname)
+
+        # The name of the role played by A changes to Z, too
+        self.assertItemsEqual([x.fullname for x in diff.modified],
+                              ["ObjectTypes.Z", "FactTypes.AHasB"])
+        self.assertItemsEqual([x.fullname for x in diff.relinked],
+            ["Constraints.EUC", # Its join path includes AHasB
+             "Constraints.InternalUniquenessConstraint2",
+             "Constraints.ObjectTypeCardinalityConstraint4"])
+        self.assertIsNone(self.model.object_types.get("A"))
+
+        self.assertSameAsLoaded(self.model, fname)
+
+        # The updated model can still be checked
+        solution = ORMMinusModel(self.model, ubound=10).solution
+        self.assertIsNotNone(solution)
+
+    def test_added_element(self):
+        """ Confirm that an element added to the file is added. """
+        fname = self.edit(r'<orm:UniquenessConstraint [^>]*Name="EUC">.*?'
+                          r'</orm:UniquenessConstraint>', '')
+        model = NormaLoader(fname).model
+        diff = ModelDiff(model, NormaLoader(self.fname).model)
+
+        self.assertEquals([x.fullname for x in diff.added],
+                          ["Constraints.EUC"])
+        self.assertEquals(diff.removed + diff.modified + diff.relinked, [])
+        self.assertFalse(diff.empty)
+        self.assertIsNone(model.constraints.get("EUC"))
+
+        diff.apply()
+        euc = model.constraints.get("EUC")
+        self.assertIs(euc, diff.added[0])
+        self.assertSameAsLoaded(model, self.fname)
+
+    def test_shared_uid(self):
+        """ Confirm constraints that share a uid (the parts of a split 
+            equality constraint) are added and removed separately, and that
+            elements are added in the order of the new model. """
+        fname = TestDataLocator.path("equality_four_role.orm")
+        loaded = NormaLoader(fname).model
+        names = [x.name for x in loaded.constraints.of_type(Constraint)]
+        shared = loaded.constraints.of_type(EqualityConstraint)
+        self.assertEquals(len(shared), 3)
+        self.assertEquals(len(set(x.uid for x in shared)), 1)
+
+        model = Model()
+        diff = ModelDiff(model, NormaLoader(fname).model)
+        self.assertEquals(len(diff.added), len(names) + 
+                          loaded.object_types.count() + 
+                          loaded.fact_types.count())
+        diff.apply()
+        self.assertEquals([x.name for x in 
+                           model.constraints.of_type(Constraint)], names)
+        self.assertSameAsLoaded(model, fname)
+
+        diff = ModelDiff(model, Model())
+        diff.apply()
+        self.assertEquals(model.constraints.of_type(Constraint), [])
+
+    def test_display(self):
+        """ Confirm the display of the differences. """
+        fname = self.edit(r'<orm:UniquenessConstraint [^>]*Name="EUC">.*?'
+                          r'</orm:UniquenessConstraint>', '')
+        diff = reload_model(self.model, fname)
+
+        saved = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            diff.display()
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = saved
+
+        self.assertEquals(output, "Added:\nRemoved:\n    Constraints.EUC\n"
+                                  "Modified:\nRelinked:\n")
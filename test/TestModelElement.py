@@ -10,14 +10,17 @@
 import sys
 from unittest import TestCase
 
-from lib.ModelElement import ModelElementSet, ModelElement
+from lib.ModelElement import ModelElementSet, ModelElement, attributes
 
+import lib.ObjectType as ObjectTypeModule
+import lib.FactType as FactTypeModule
+import lib.Constraint as ConstraintModule
 from lib.ObjectType import ObjectType
-from lib.FactType import FactType
-from lib.Constraint import Constraint
+from lib.FactType import FactType, RoleSequence
+from lib.Constraint import Constraint, SubsetConstraint
 
-# ModelElement currently has no public functions, just two public properties.
-# Thus, unit tests in this file are currently just for ModelElementSet.
+# ModelElement has no public functions, just two public properties.  Thus,
+# its unit tests below only cover how its attributes are stored.
 
 class TestModelElementSet(TestCase):
     """ Unit tests for :class:`lib.ModelElement.ModelElementSet` """
@@ -85,6 +88,59 @@ class TestModelElementSet(TestCase):
         self.assertIsInstance(_set.get("Item2"), FactType)
         self.assertIsInstance(_set.get("Item3"), FactType)
 
+    def test_rename_many(self):
+        """ Confirm many items with the same name are numbered in order. """
+        _set = ModelElementSet()
+        for i in xrange(5000):
+            _set.add(ObjectType(name="join_eq"))
+        self.assertEqual(_set.count(), 5000)
+        self.assertIsNotNone(_set.get("join_eq5000"))
+        self.assertIsNone(_set.get("join_eq5001"))
+
+    def test_rename_after_remove(self):
+        """ Confirm the smallest suffix freed by remove() is reused, as is an
+            explicitly named item's suffix. """
+        _set = ModelElementSet()
+        items = [ObjectType(name="Item") for i in xrange(6)]
+        for item in items:
+            _set.add(item)
+
+        _set.remove(items[4]) # Item5
+        _set.remove(items[2]) # Item3
+        explicit = ObjectType(name="Item3")
+        _set.add(explicit)
+
+        names = []
+        for i in xrange(3):
+            item = ObjectType(name="Item")
+            _set.add(item)
+            names.append(item.name)
+        self.assertEqual(names, ["Item5", "Item7", "Item8"])
+
+        _set.remove(explicit)
+        item = ObjectType(name="Item")
+        _set.add(item)
+        self.assertEqual(item.name, "Item3")
+
+    def test_rename_nested_suffix(self):
+        """ Confirm a freed name is reused for each name it could be derived
+            from (Item12 from Item1 or from Item). """
+        _set = ModelElementSet()
+        for name in ["Item1"] * 2 + ["Item"] * 11:
+            _set.add(ObjectType(name=name))
+        item12 = _set.get("Item12") # Second Item1, renamed
+        self.assertIsNone(_set.get("Item13"))
+
+        _set.remove(item12)
+        item = ObjectType(name="Item")
+        _set.add(item)
+        self.assertEqual(item.name, "Item12")
+
+        _set.remove(item)
+        item = ObjectType(name="Item1")
+        _set.add(item)
+        self.assertEqual(item.name, "Item12")
+
     def test_display_empty(self):
         """ Test display of empty set. """
         _set = ModelElementSet(name="Elements")
@@ -119,3 +175,58 @@ class TestModelElementSet(TestCase):
 
 
 
+
+class TestModelElement(TestCase):
+    """ Unit tests for the storage of :class:`lib.ModelElement.ModelElement` 
+        attributes. """
+
+    def test_no_instance_dict(self):
+        """ Confirm that no model element class gives its instances a
+            __dict__. """
+        count = 0
+        for module in [ObjectTypeModule, FactTypeModule, ConstraintModule]:
+            for cls in vars(module).values():
+                if isinstance(cls, type) and issubclass(cls, ModelElement) \
+                   and cls.__module__ == module.__name__:
+                    self.assertFalse(hasattr(cls(), "__dict__"), cls)
+                    count += 1
+        self.assertEquals(count, 15)
+
+    def test_interned_identifiers(self):
+        """ Confirm that equal uids and names share one string object. """
+        uid = "_7A039379-6C02-4811-B3F8-1B3CB9685BE5"
+        first = ObjectType(uid="".join(uid), name="".join("Person"))
+        second = ObjectType(uid="".join(uid), name="".join("Person"))
+        self.assertIs(first.uid, second.uid)
+        self.assertIs(first.name, second.name)
+
+        elements = ModelElementSet()
+        elements.add(first)
+        elements.add(second)
+        self.assertIs(second.name, intern("Person2"))
+
+    def test_unicode_identifiers(self):
+        """ Confirm that unicode names, which cannot be interned, are kept. """
+        element = ObjectType(name=u"Pers\xf6n")
+        self.assertEquals(element.name, u"Pers\xf6n")
+
+    def test_attributes(self):
+        """ Confirm that attributes() lists slots and __dict__ entries. """
+        cons = Constraint(uid="C1", name="C", covers=[])
+        self.assertItemsEqual(attributes(cons), 
+            [("_uid", "C1"), ("_name", "C"), ("covers", []), 
+             ("alethic", True)])
+
+        # Subset constraints ignore covers, so its slot is never set
+        cons = SubsetConstraint(uid="C2", name="S")
+        self.assertNotIn("covers", dict(attributes(cons)))
+
+        seq = RoleSequence()
+        self.assertEquals(attributes(seq), [("join_path", None)])
+
+        class Derived(ObjectType):
+            """ A subclass without __slots__. """
+        obj = Derived(uid="O1", name="O")
+        obj.extra = 5
+        self.assertEquals(dict(attributes(obj))["extra"], 5)
+        self.assertEquals(dict(attributes(obj))["_uid"], "O1")
@@ -0,0 +1,153 @@
+##############################################################################
+# Package: ormpy
+# File:    TestModelFingerprint.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" This file contains unit tests for the lib.ModelFingerprint module. """
+
+from unittest import TestCase
+
+import lib.TestDataLocator as TestDataLocator
+import lib.Snapshot as Snapshot
+from lib.Model import Model
+from lib.ModelFingerprint import Fingerprint, BITS
+from lib.NormaLoader import NormaLoader
+from lib.ORMMinusModel import ORMMinusModel
+from lib.ObjectType import ObjectType
+from lib.FactType import FactType
+from lib.Constraint import MandatoryConstraint, ValueConstraint
+
+class TestModelFingerprint(TestCase):
+    """ Unit tests for the ModelFingerprint module. """
+
+    def setUp(self):
+        fname = "join_rule_valid_linear_path_euc.orm"
+        self.fname = TestDataLocator.path(fname)
+        self.model = NormaLoader(self.fname).model
+
+    def build(self, order):
+        """ Returns a small model whose elements are added in *order*. """
+        obj1, obj2 = ObjectType(name="A"), ObjectType(name="B")
+        fact = FactType(name="AHasB")
+        fact.add_role(player=obj1, name="R1")
+        fact.add_role(player=obj2, name="R2")
+        mand = MandatoryConstraint(name="M1", covers=[fact.roles[0]])
+        elements = [obj1, obj2, fact, mand]
+
+        model = Model()
+        for i in order:
+            model.add(elements[i])
+        return model
+
+    def test_format(self):
+        """ Confirm the fingerprint is a fixed-width string of hex digits. """
+        key = self.model.fingerprint()
+        self.assertEquals(len(key), BITS // 4)
+        int(key, 16)
+
+    def test_same_content(self):
+        """ Confirm models with the same content have the same fingerprint. """
+        key = self.model.fingerprint()
+        self.assertEquals(NormaLoader(self.fname).model.fingerprint(), key)
+        self.assertEquals(self.model.clone().fingerprint(), key)
+        self.assertEquals(Snapshot.loads(Snapshot.dumps(self.model))
+                                  .fingerprint(), key)
+
+    def test_insertion_order(self):
+        """ Confirm the fingerprint does not depend on insertion order. """
+        self.assertEquals(self.build([0, 1, 2, 3]).fingerprint(),
+                          self.build([3, 2, 1, 0]).fingerprint())
+
+    def test_different_content(self):
+        """ Confirm a change to an element changes the fingerprint. """
+        other = self.build([0, 1, 2, 3])
+        other.get("ObjectTypes.B").independent = True
+        self.assertNotEquals(other.fingerprint(),
+                             self.build([0, 1, 2, 3]).fingerprint())
+
+        other = self.build([0, 1, 2, 3])
+        other.get("Constraints.M1").alethic = False
+        self.assertNotEquals(other.fingerprint(),
+                             self.build([0, 1, 2, 3]).fingerprint())
+
+    def test_incremental(self):
+        """ Confirm the fingerprint follows changes to the model. """
+        model = self.model
+        before = model.fingerprint()
+
+        obj = model.object_types.get("A")
+        cons = ValueConstraint(name="VC1", covers=[obj])
+        cons.domain.add_range(1, 5)
+        model.add(cons)
+        added = model.fingerprint()
+        self.assertNotEquals(added, before)
+        self.assertEquals(Fingerprint(model).hexdigest(), added)
+
+        model.remove(cons)
+        self.assertEquals(model.fingerprint(), before)
+        self.assertEquals(Fingerprint(model).hexdigest(), before)
+
+    def test_transformation(self):
+        """ Confirm an in-place transformation changes the fingerprint, and
+            that transforming the same model twice gives the same result. """
+        fname = TestDataLocator.path("absorption_valid_simple.orm")
+        model1, model2 = NormaLoader(fname).model, NormaLoader(fname).model
+        before = model1.fingerprint()
+
+        ORMMinusModel(model1, ubound=10)
+        ORMMinusModel(model2, ubound=10)
+        after = model1.fingerprint()
+        self.assertNotEquals(after, before)
+        self.assertEquals(Fingerprint(model1).hexdigest(), after)
+        self.assertEquals(model2.fingerprint(), after)
+
+    def test_shared_uid(self):
+        """ Confirm each of the constraints that share a uid (the parts of a
+            split equality constraint) is part of the fingerprint. """
+        fname = TestDataLocator.path("equality_four_role.orm")
+        model = NormaLoader(fname).model
+        before = model.fingerprint()
+        eq = model.constraints.get("EQ")
+        self.assertEquals(model.constraints.get("EQ2").uid, eq.uid)
+
+        model.remove(eq)
+        removed = model.fingerprint()
+        self.assertNotEquals(removed, before)
+        self.assertEquals(Fingerprint(model).hexdigest(), removed)
+
+        eq.subset, eq.superset = eq.superset, eq.subset
+        model.add(eq)
+        swapped = model.fingerprint()
+        self.assertNotEquals(swapped, before)
+        self.assertNotEquals(swapped, removed)
+        self.assertEquals(Fingerprint(model).hexdigest(), swapped)
+
+    def test_experimental_transformation(self):
+        """ Confirm the fingerprint follows the roles added and the root
+            roles set by the experimental transformations. """
+        for fname in ["absorption_valid_simple.orm", 
+                      "join_rule_valid_linear_path_euc.orm",
+                      "subset_population_test.orm"]:
+            model = NormaLoader(TestDataLocator.path(fname)).model
+            before = model.fingerprint()
+            ORMMinusModel(model, ubound=10, experimental=True)
+            after = model.fingerprint()
+            self.assertNotEquals(after, before)
+            self.assertEquals(Fingerprint(model).hexdigest(), after)
+
+        fact = next(iter(model.fact_types))
+        fact.add_role(player=next(iter(model.object_types)))
+        self.assertEquals(model.fingerprint(), Fingerprint(model).hexdigest())
+
+    def test_close(self):
+        """ Confirm a closed fingerprint no longer follows the model. """
+        model = self.build([0, 1, 2])
+        fingerprint = Fingerprint(model)
+        before = fingerprint.hexdigest()
+        fingerprint.close()
+        model.add(MandatoryConstraint(name="M2",
+                                      covers=[model.get("FactTypes.AHasB")
+                                              .roles[1]]))
+        self.assertEquals(fingerprint.hexdigest(), before)
+        self.assertNotEquals(model.fingerprint(), before)
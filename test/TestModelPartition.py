@@ -0,0 +1,161 @@
+##############################################################################
+# Package: ormpy
+# File:    TestModelPartition.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" This file contains unit tests for the lib.ModelPartition module and for
+    lib.ORMMinusModel.PartitionedORMMinusModel. """
+
+import os
+from unittest import TestCase
+
+import lib.TestDataLocator as TestDataLocator
+from lib.ModelPartition import components, partition
+from lib.Model import Model
+from lib.NormaLoader import NormaLoader
+from lib.ORMMinusModel import ORMMinusModel, PartitionedORMMinusModel
+from lib.Population import Population
+from lib.ObjectType import ObjectType
+from lib.FactType import FactType
+from lib.Constraint import SubtypeConstraint, SubsetConstraint, \
+                           MandatoryConstraint, CardinalityConstraint, \
+                           CardinalityRange
+
+class TestModelPartition(TestCase):
+    """ Unit tests for the ModelPartition module. """
+
+    def build(self):
+        """ Returns a model with three components: {A, B, AHasB, M1},
+            {C, D, S1} and {E}. """
+        model = Model()
+        objs = dict((name, ObjectType(name=name)) for name in "ABCDE")
+        for name in "ABCDE":
+            model.add(objs[name])
+
+        fact = FactType(name="AHasB")
+        fact.add_role(player=objs["A"], name="R1")
+        fact.add_role(player=objs["B"], name="R2")
+        model.add(fact)
+        model.add(MandatoryConstraint(name="M1", covers=[fact.roles[0]]))
+        model.add(SubtypeConstraint(objs["C"], objs["D"], name="S1"))
+        return model
+
+    def names(self, components):
+        """ Returns the set of sets of full names of components. """
+        return set(frozenset(x.fullname for x in component)
+                   for component in components)
+
+    def test_components(self):
+        """ Confirm the components of a model. """
+        self.assertEquals(self.names(components(self.build())),
+                          set([frozenset(["ObjectTypes.A", "ObjectTypes.B",
+                                          "FactTypes.AHasB",
+                                          "Constraints.M1"]),
+                               frozenset(["ObjectTypes.C", "ObjectTypes.D",
+                                          "Constraints.S1"]),
+                               frozenset(["ObjectTypes.E"])]))
+
+    def test_constraint_connects_fact_types(self):
+        """ Confirm a constraint over roles of two fact types connects them.
+        """
+        model = Model()
+        facts = []
+        for name in ["F1", "F2"]:
+            fact = FactType(name=name)
+            obj = ObjectType(name=name + "Player")
+            fact.add_role(player=obj)
+            model.add(obj)
+            model.add(fact)
+            facts.append(fact)
+        self.assertEquals(len(components(model)), 2)
+
+        model.add(SubsetConstraint(name="S1", subset=[facts[0].roles[0]],
+                                   superset=[facts[1].roles[0]]))
+        self.assertEquals(len(components(model)), 1)
+
+    def test_partition(self):
+        """ Confirm partition moves the elements of each component to a new
+            model. """
+        model = self.build()
+        fact = model.get("FactTypes.AHasB")
+        parts = partition(model)
+
+        self.assertEquals(len(parts), 3)
+        part = [p for p in parts if p.get("FactTypes.AHasB")][0]
+        self.assertIs(part.get("FactTypes.AHasB"), fact)
+        self.assertIs(part.get(fact.roles[0].fullname), fact.roles[0])
+        self.assertIs(part.get("ObjectTypes.A"), fact.roles[0].player)
+        self.assertEquals([x.name for x in part.constraints.of_type(
+                           MandatoryConstraint)], ["M1"])
+        self.assertTrue(fact.roles[0].mandatory) # Side effects kept
+
+    def test_partitioned_ormminus_test_models(self):
+        """ Confirm checking and populating each component gives the same
+            solution and population as the whole model. """
+        count = 0
+        for fname in sorted(os.listdir(TestDataLocator.get_data_dir())):
+            if not fname.endswith(".orm"):
+                continue
+            try:
+                model = NormaLoader(TestDataLocator.path(fname)).model
+                whole = ORMMinusModel(model.clone())
+            except Exception:
+                continue # Invalid test models are expected to fail
+
+            parts = PartitionedORMMinusModel(model, populate=True)
+            self.assertEquals(parts.solution, whole.solution)
+            self.assertEquals(parts.strengthened, whole.strengthened)
+            self.assertItemsEqual(parts.ignored,
+                                  [x.fullname for x in whole.ignored])
+
+            if whole.solution is not None:
+                population = Population(whole)
+                self.assertEquals(parts.population.object_types,
+                                  population.object_types)
+                self.assertEquals(parts.population.fact_types,
+                                  population.fact_types)
+            count += parts.components > 1
+
+        self.assertTrue(count > 10)
+
+    def test_parallel(self):
+        """ Confirm checking components in parallel gives the same result as
+            checking them in sequence. """
+        fname = TestDataLocator.path("overlapping_iuc_transform.orm")
+        model = NormaLoader(fname).model
+
+        serial = PartitionedORMMinusModel(model, populate=True, clone=True)
+        parallel = PartitionedORMMinusModel(model, populate=True,
+                                            processes=4)
+        self.assertTrue(serial.components > 1)
+        self.assertEquals(parallel.solution, serial.solution)
+        self.assertEquals(parallel.population.fact_types,
+                          serial.population.fact_types)
+
+    def test_unsatisfiable_component(self):
+        """ Confirm the model is unsatisfiable if any component is. """
+        model = self.build()
+        model.add(CardinalityConstraint(name="C1", covers=[
+                  model.get("ObjectTypes.E")], ranges=[CardinalityRange(20)]))
+
+        parts = PartitionedORMMinusModel(model, ubound=10, populate=True,
+                                         clone=True)
+        self.assertIsNone(parts.solution)
+        self.assertIsNone(parts.population)
+        self.assertIsNone(ORMMinusModel(model, ubound=10).solution)
+
+    def test_generated_name_clash(self):
+        """ Confirm an element name in the solutions of two components is
+            made unique, but a constant is not. """
+        parts = PartitionedORMMinusModel(Model())
+        self.assertEquals(parts.components, 0)
+        self.assertEquals(parts.solution, {})
+
+        solution = {"Constraints.join_uc": 3, "2": 2}
+        results = [(dict(solution), ["Constraints.join_uc"], [], False,
+                    None, None)] * 2
+        parts._merge(results, populate=False)
+        self.assertEquals(parts.solution, {"Constraints.join_uc": 3,
+                                           "Constraints.join_uc2": 3,
+                                           "2": 2})
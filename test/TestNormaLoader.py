@@ -7,14 +7,23 @@
 """ This file contains unit tests for the lib.NormaLoader class """
 
 import os
+import bz2
+import gzip
+import shutil
+import tempfile
+import zipfile
+import xml.etree.cElementTree as xml
+from contextlib import closing
+from StringIO import StringIO
 from unittest import TestCase
 from datetime import datetime, date, time
 from nose.plugins.logcapture import LogCapture
 
 import lib.TestDataLocator as TestDataLocator
 
-from lib.NormaLoader import NormaLoader
+from lib.NormaLoader import NormaLoader, NS_CORE, local_tag, load_many
 from lib.ModelElement import ModelElement
+from lib.ModelCache import ModelCache
 from lib.FactType import FactType
 
 import lib.ObjectType as ObjectType
@@ -1002,3 +1011,377 @@ class TestNormaLoader(TestCase):
         self.assertEquals(eq3.superset, [obj.roles[0]])
         self.assertEquals(eq3.subset, [obj.roles[3]])
         self.assertEquals(eq3.covers, eq3.subset + eq3.superset)
+
+    def test_parse_stops_after_model_node(self):
+        """ Confirm that parsing stops at the end of the ORMModel node, so 
+            that (possibly malformed) diagram data is never read. """
+        with open(self.data_dir + "empty_model.orm") as infile:
+            text = infile.read()
+
+        # Truncate the file in the middle of the diagram data
+        text = text[:text.index("<ormDiagram:Subject")]
+
+        handle, fname = tempfile.mkstemp(suffix=".orm")
+        with os.fdopen(handle, "w") as outfile:
+            outfile.write(text)
+
+        try:
+            model = NormaLoader(fname).model
+        finally:
+            os.remove(fname)
+
+        self.assertEqual(model.object_types.count(), 0)
+
+    def test_parse_discards_ignored_nodes(self):
+        """ Confirm that the parsed ORMModel node only contains collections 
+            that are loaded and that ignored nodes are cleared. """
+        fname = self.data_dir + "canonical_example.orm"
+        loader = NormaLoader(fname)
+        root = loader._parse_norma_file(fname)
+
+        tags = [local_tag(node) for node in root]
+        self.assertItemsEqual(tags, 
+            ["Objects", "Facts", "Constraints", "DataTypes"])
+
+        instances = list(root.iter(NS_CORE + "Instances"))
+        self.assertTrue(len(instances) > 0)
+        self.assertTrue(all(len(node) == 0 for node in instances))
+
+    def test_load_does_not_modify_tree(self):
+        """ Confirm that loading leaves the parsed XML tree unchanged and 
+            releases it once the model is loaded. """
+        fname = self.data_dir + "value_constraints_on_subtypes.orm"
+        trees = []
+
+        class TreeLoader(NormaLoader):
+            def _parse_norma_file(self, filename):
+                root = NormaLoader._parse_norma_file(self, filename)
+                trees.append((root, xml.tostring(root)))
+                return root
+
+        loader = TreeLoader(fname)
+        root, before = trees[0]
+
+        self.assertEquals(xml.tostring(root), before)
+        self.assertIsNone(loader._sections)
+
+        # Value constraints are still loaded from their ValueRestriction node
+        cons = [c for c in loader.model.constraints 
+                if isinstance(c, Constraint.ValueConstraint)]
+        self.assertTrue(len(cons) > 0)
+        self.assertTrue(all(c.covers for c in cons))
+
+    def test_load_many(self):
+        """ Confirm that load_many loads files in parallel, returns results in 
+            input order, and collects errors instead of raising them. """
+        names = ["canonical_example.orm", "bad_root_element.orm", 
+                 "subtypes.orm", "no_such_file.orm", "omitted_constraints.orm"]
+        paths = [self.data_dir + name for name in names]
+
+        results = load_many(paths, jobs=3)
+
+        self.assertEquals([r.filename for r in results], paths)
+        self.assertEquals([r.ok for r in results], 
+                          [True, False, True, False, True])
+        self.assertEquals(results[1].error, 
+                          "Root of input file must be <ormRoot:ORM2>.")
+        self.assertIsNone(results[3].model)
+        self.assertIn("No such file", results[3].error)
+
+        for path, result in zip(paths, results):
+            if result.ok:
+                loader = NormaLoader(path)
+                self.assertEquals(result.omissions, loader.omissions)
+                self.assertEquals(result.unexpected, loader.unexpected)
+                self.assertItemsEqual(
+                    [c.name for c in result.model.constraints],
+                    [c.name for c in loader.model.constraints])
+
+    def test_load_many_in_process(self):
+        """ Confirm that load_many with one job matches a parallel load. """
+        paths = [self.data_dir + name for name in 
+                 ["deontic_constraints.orm", "bad_value_constraint.orm"]]
+
+        serial = load_many(paths, jobs=1, deontic=True)
+        parallel = load_many(paths, jobs=2, deontic=True)
+
+        for one, other in zip(serial, parallel):
+            self.assertEquals(one.error, other.error)
+            self.assertEquals(one.omissions, other.omissions)
+            self.assertEquals(one.unexpected, other.unexpected)
+            self.assertEquals(one.model.constraints.count(), 
+                              other.model.constraints.count())
+
+    def test_load_many_one_file(self):
+        """ Confirm that load_many loads a single file in process, without a
+            snapshot round trip, even if more than one job is allowed. """
+        paths = [self.data_dir + "deontic_constraints.orm"]
+        result = load_many(paths, jobs=2)[0]
+
+        self.assertIsNone(result.snapshot)
+        self.assertIsNotNone(result.model)
+
+    def test_load_many_bad_jobs(self):
+        """ Confirm that load_many rejects fewer than one job. """
+        paths = [self.data_dir + "deontic_constraints.orm"]
+
+        for jobs in [0, -1]:
+            with self.assertRaises(ValueError) as ex:
+                load_many(paths, jobs=jobs)
+
+            self.assertEquals(ex.exception.message, 
+                "Number of jobs must be at least 1.")
+
+    def test_load_stats(self):
+        """ Confirm that the loader reports the time and elements added in each
+            phase, the number of nodes parsed and the nodes dispatched. """
+        fname = self.data_dir + "join_rule_valid_linear_path_euc.orm"
+        loader = NormaLoader(fname)
+        stats = loader.stats
+        model = loader.model
+
+        self.assertEquals([phase[0] for phase in stats.phases], 
+            ["parse", "data types", "object types", "fact types", 
+             "constraints", "fixups"])
+        self.assertTrue(all(seconds >= 0 for _, seconds, _ in stats.phases))
+        self.assertAlmostEquals(stats.seconds, 
+                                sum(phase[1] for phase in stats.phases))
+
+        elements = dict((phase[0], phase[2]) for phase in stats.phases)
+        self.assertEquals(elements["object types"], model.object_types.count())
+        self.assertEquals(elements["fact types"], model.fact_types.count())
+        self.assertEquals(elements["constraints"], model.constraints.count())
+
+        # Parsing stops at the end of the ORMModel node
+        root = xml.parse(fname).getroot()
+        model_node = root.find(NS_CORE + "ORMModel")
+        self.assertTrue(len(list(model_node.iter())) < stats.nodes)
+        self.assertTrue(stats.nodes < len(list(root.iter())))
+
+        self.assertEquals(stats.dispatch["Fact"], 
+                          len(list(root.iter(NS_CORE + "Fact"))))
+        self.assertEquals(stats.dispatch["JoinRule"], 1)
+        self.assertTrue(stats.dispatch_time["Fact"] >= 
+                        stats.dispatch_time["Role"])
+
+    def test_load_stats_cache_hit(self):
+        """ Confirm that a cache hit is reported as a single phase. """
+        cache_dir = tempfile.mkdtemp()
+        try:
+            fname = self.data_dir + "simple_model.orm"
+            cache = ModelCache(cache_dir)
+
+            miss = NormaLoader(fname, cache=cache).stats
+            hit = NormaLoader(fname, cache=cache)
+        finally:
+            shutil.rmtree(cache_dir)
+
+        self.assertEquals(miss.phases[-1][0], "cache")
+        self.assertEquals(len(hit.stats.phases), 1)
+        self.assertEquals(hit.stats.phases[0][0], "cache")
+        self.assertEquals(hit.stats.phases[0][2], 
+                          hit.model.object_types.count() + 
+                          hit.model.fact_types.count() +
+                          hit.model.constraints.count())
+        self.assertEquals(hit.stats.nodes, 0)
+
+    def test_slice_radius(self):
+        """ Confirm that a slice includes the elements within radius hops of
+            the seeds and reports the fact types and constraints that cross
+            the edge of the slice. """
+        fname = self.data_dir + "join_rule_valid_linear_path_euc.orm"
+        names = lambda elements: sorted(x.name for x in elements)
+
+        loader = NormaLoader(fname, seeds=["A"], radius=0)
+        self.assertEquals(names(loader.model.object_types), ["A"])
+        self.assertEquals(names(loader.model.fact_types), [])
+        self.assertEquals(loader.boundary, ["Fact type AHasB"])
+
+        loader = NormaLoader(fname, seeds=["A"], radius=1)
+        self.assertEquals(names(loader.model.object_types), ["A", "B"])
+        self.assertEquals(names(loader.model.fact_types), ["AHasB"])
+        self.assertEquals(names(loader.model.constraints), 
+            ["InternalUniquenessConstraint2", 
+             "ObjectTypeCardinalityConstraint1",
+             "ObjectTypeCardinalityConstraint4"])
+        self.assertItemsEqual(loader.boundary, 
+            ["Fact type BHasC", "Fact type BLikesC", "Constraint EUC"])
+
+        loader = NormaLoader(fname, seeds=["AHasB"], radius=1)
+        self.assertEquals(names(loader.model.object_types), ["A", "B", "C"])
+        self.assertEquals(names(loader.model.fact_types), 
+                          ["AHasB", "BHasC", "BLikesC"])
+        self.assertIn("Constraint EUC", loader.boundary)
+
+        self.assertIn("WARNING: 2 model elements were cut from the slice "
+                      "while loading join_rule_valid_linear_path_euc.orm.",
+                      self.log.formatLogRecords())
+
+    def test_slice_closure(self):
+        """ Confirm that a slice includes the supertypes of its object types
+            and the fact types nested by its objectified types. """
+        names = lambda elements: sorted(x.name for x in elements)
+
+        fname = self.data_dir + "subtype_with_derivation.orm"
+        model = NormaLoader(fname, seeds=["B"], radius=0).model
+        self.assertEquals(names(model.object_types), ["A", "B", "C", "Z"])
+        self.assertEquals(names(model.constraints), 
+            ["AIsASubtypeOfZ", "BIsASubtypeOfA", "BIsASubtypeOfC", 
+             "CIsASubtypeOfZ"])
+
+        fname = self.data_dir + "objectification.orm"
+        model = NormaLoader(fname, seeds=["AEnjoysB"], radius=0).model
+        self.assertEquals(names(model.object_types), ["A", "AEnjoysB", "B"])
+        self.assertIs(model.object_types.get("AEnjoysB").nested_fact_type,
+                      model.fact_types.get("AEnjoysB"))
+
+    def test_slice_of_whole_model(self):
+        """ Confirm that a slice seeded with every object type is the whole
+            model. """
+        fname = self.data_dir + "join_rule_valid_linear_path_euc.orm"
+        names = lambda elements: sorted(x.name for x in elements)
+
+        full = NormaLoader(fname)
+        seeds = names(full.model.object_types)
+        loader = NormaLoader(fname, seeds=seeds, radius=0)
+
+        for attr in ["object_types", "fact_types", "constraints"]:
+            self.assertEquals(names(getattr(loader.model, attr)),
+                              names(getattr(full.model, attr)))
+        self.assertEquals(loader.boundary, [])
+        self.assertEquals(loader.stats.phases[1][0], "slice")
+
+    def test_slice_unknown_seed(self):
+        """ Confirm that an exception is raised for an unknown seed. """
+        with self.assertRaises(Exception) as ex:
+            NormaLoader(self.data_dir + "simple_model.orm", seeds=["Nope"])
+        self.assertEquals(ex.exception.message, "Nope is not in the model.")
+
+    def test_slice_cache(self):
+        """ Confirm that slices are cached separately from the whole model and
+            that the cache retains the boundary of the slice. """
+        cache_dir = tempfile.mkdtemp()
+        fname = self.data_dir + "join_rule_valid_linear_path_euc.orm"
+        try:
+            cache = ModelCache(cache_dir)
+            full = NormaLoader(fname, cache=cache)
+            first = NormaLoader(fname, cache=cache, seeds=["A"], radius=1)
+            second = NormaLoader(fname, cache=cache, seeds=["A"], radius=1)
+            self.assertEquals(len(os.listdir(cache_dir)), 2)
+        finally:
+            shutil.rmtree(cache_dir)
+
+        self.assertEquals(full.model.object_types.count(), 4)
+        self.assertEquals(second.model.object_types.count(), 2)
+        self.assertEquals(second.stats.phases[0][0], "cache")
+        self.assertItemsEqual(second.boundary, first.boundary)
+
+    def compressed_copies(self, temp_dir, fname):
+        """ Write .orm.gz, .orm.bz2 and .zip copies of fname to temp_dir and
+            return their names. """
+        with open(fname, "rb") as in_file:
+            text = in_file.read()
+
+        gz_name = os.path.join(temp_dir, "model.orm.gz")
+        with closing(gzip.GzipFile(gz_name, "wb")) as out_file:
+            out_file.write(text)
+
+        bz2_name = os.path.join(temp_dir, "model.orm.bz2")
+        with closing(bz2.BZ2File(bz2_name, "wb")) as out_file:
+            out_file.write(text)
+
+        zip_name = os.path.join(temp_dir, "models.zip")
+        with zipfile.ZipFile(zip_name, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("readme.txt", "Not a model")
+            archive.writestr("nested/model.orm", text)
+
+        return [gz_name, bz2_name, zip_name, zip_name + "/nested/model.orm"]
+
+    def test_compressed_files(self):
+        """ Confirm that compressed and archived .orm files load the same
+            model as the .orm file. """
+        temp_dir = tempfile.mkdtemp()
+        fname = self.data_dir + "join_rule_valid_linear_path_euc.orm"
+        expected = NormaLoader(fname).model
+        names = lambda model: sorted(x.fullname for x in 
+            list(model.object_types) + list(model.fact_types) + 
+            list(model.constraints))
+        try:
+            for name in self.compressed_copies(temp_dir, fname):
+                loader = NormaLoader(name)
+                self.assertItemsEqual(names(loader.model), names(expected))
+                self.assertEquals(loader.stats.nodes, 
+                                  NormaLoader(fname).stats.nodes)
+            self.assertItemsEqual(os.listdir(temp_dir), 
+                ["model.orm.gz", "model.orm.bz2", "models.zip"])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_bad_archive(self):
+        """ Confirm that exception is raised when a .zip archive does not hold
+            exactly one .orm file, or the named member is not an .orm file. """
+        temp_dir = tempfile.mkdtemp()
+        zip_name = os.path.join(temp_dir, "models.zip")
+        try:
+            with zipfile.ZipFile(zip_name, "w") as archive:
+                archive.writestr("one.orm", "")
+                archive.writestr("two.orm", "")
+                archive.writestr("readme.txt", "")
+
+            with self.assertRaises(Exception) as ex:
+                NormaLoader(zip_name)
+            self.assertEqual(ex.exception.message, 
+                "Input archive must contain exactly one .orm file.")
+
+            with self.assertRaises(Exception) as ex:
+                NormaLoader(zip_name + "/readme.txt")
+            self.assertEqual(ex.exception.message, 
+                "Input filename must have .orm extension.")
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_file_object(self):
+        """ Confirm that a model can be loaded from a file-like object, which
+            is left open and named in log messages. """
+        fname = self.data_dir + "data_types.orm"
+        with open(fname, "rb") as in_file:
+            text = in_file.read()
+        stream = StringIO(text)
+
+        model = NormaLoader(stream).model
+        self.assertFalse(stream.closed)
+        self.assertEquals(model.object_types.count(),
+                          NormaLoader(fname).model.object_types.count())
+
+        self.log.beforeTest(None)
+        with open(self.data_dir + "derivation_source.orm", "rb") as in_file:
+            NormaLoader(in_file)
+        self.assertIn("WARNING: 1 model element was ignored while loading "
+                      "derivation_source.orm.", self.log.formatLogRecords())
+        self.log.afterTest(None)
+
+    def test_compressed_cache(self):
+        """ Confirm that compressed files are cached, and that file-like 
+            objects bypass the cache. """
+        temp_dir = tempfile.mkdtemp()
+        cache_dir = tempfile.mkdtemp()
+        fname = self.data_dir + "join_rule_valid_linear_path_euc.orm"
+        try:
+            cache = ModelCache(cache_dir)
+            names = self.compressed_copies(temp_dir, fname)
+            for name in names:
+                NormaLoader(name, cache=cache)
+            # An archive and its only .orm member share an entry
+            self.assertEquals(len(os.listdir(cache_dir)), 3)
+
+            loader = NormaLoader(names[0], cache=cache)
+            self.assertEquals(loader.stats.phases[0][0], "cache")
+            self.assertEquals(loader.model.object_types.count(), 4)
+
+            with open(fname, "rb") as in_file:
+                loader = NormaLoader(in_file, cache=cache)
+            self.assertEquals(loader.stats.phases[0][0], "parse")
+            self.assertEquals(len(os.listdir(cache_dir)), 3)
+        finally:
+            shutil.rmtree(temp_dir)
+            shutil.rmtree(cache_dir)
@@ -373,6 +373,19 @@ class TestORMMinusModel(TestCase):
         model = NormaLoader(fname).model
         self.assertIsNone(ORMMinusModel(model=model, experimental=True).solution)
 
+    def test_overlapping_ifc_ignored_in_load_order(self):
+        """ Test that of two overlapping frequency constraints, the one loaded
+            later is ignored. """
+        fname = os.path.join(self.data_dir, "overlapping_iuc_no_transform.orm")
+        model = NormaLoader(fname).model
+        ormminus = ORMMinusModel(model=model)
+
+        # Constraints are loaded in the order FC1, FC2, IUC1, FC3, FC4, FC5.
+        # FC2 overlaps FC1, FC3 overlaps IUC1 and FC5 overlaps FC4.
+        self.assertEquals([cons.name for cons in ormminus.ignored], 
+                          ["FC2", "FC3", "FC5"])
+        self.assertIsNotNone(ormminus.solution)
+
     def test_unsat_euc_strengthening(self):
         """ Test case where EUC Strengthening makes model unsat. """
         fname = os.path.join(self.data_dir, "euc_strengthening_unsat.orm")
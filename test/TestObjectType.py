@@ -9,7 +9,11 @@
 from unittest import TestCase
 import os
 
-from lib.ObjectType import ObjectType
+from lib.ObjectType import ObjectType, EntityType
+from lib.FactType import FactType
+from lib.Constraint import MandatoryConstraint, UniquenessConstraint, \
+                           SubtypeConstraint
+from lib.Model import Model
 from lib.NormaLoader import NormaLoader
 import lib.TestDataLocator as TestDataLocator
 
@@ -39,5 +43,66 @@ class TestObjectType(TestCase):
 
     def test_rollback(self):
         """ Test rollback of an ObjectType. """
-        with self.assertRaises(NotImplementedError):
-            ObjectType().rollback()
+        obj = ObjectType()
+        obj.commit()
+        obj.rollback()
+        self.assertEquals(obj.roles, [])
+
+    def test_derived_roles_invalidated(self):
+        """ Test that non_ref_roles and subject_to_idmc follow changes to the
+            roles, reference roles and mandatory roles of the object type. """
+        model = Model()
+        obj = EntityType(name="A")
+        model.add(obj)
+        self.assertEquals(obj.non_ref_roles, set())
+        self.assertFalse(obj.subject_to_idmc)
+
+        fact1 = FactType(name="F1")
+        role1 = fact1.add_role(player=obj)
+        model.add(fact1)
+        self.assertEquals(obj.non_ref_roles, set([role1]))
+        self.assertTrue(obj.subject_to_idmc)
+
+        fact2 = FactType(name="F2")
+        role2 = fact2.add_role(player=obj)
+        model.add(fact2)
+        self.assertEquals(obj.non_ref_roles, set([role1, role2]))
+
+        mand = MandatoryConstraint(covers=[role2])
+        model.add(mand)
+        self.assertFalse(obj.subject_to_idmc)
+        model.remove(mand)
+        self.assertTrue(obj.subject_to_idmc)
+
+        uniq = UniquenessConstraint(covers=[role1], identifier_for=obj)
+        model.add(uniq)
+        self.assertEquals(obj.non_ref_roles, set([role2]))
+        model.remove(uniq)
+        self.assertEquals(obj.non_ref_roles, set([role1, role2]))
+
+        model.remove(fact1)
+        self.assertEquals(obj.non_ref_roles, set([role2]))
+
+        # Subtypes are never subject to the IDMC
+        sup = EntityType(name="B")
+        model.add(sup)
+        sub = SubtypeConstraint(obj, sup)
+        model.add(sub)
+        self.assertFalse(obj.subject_to_idmc)
+        model.remove(sub)
+        self.assertTrue(obj.subject_to_idmc)
+
+    def test_derived_roles_after_clone(self):
+        """ Test that the cached properties are not copied by a clone. """
+        model = Model()
+        obj = ObjectType(name="A")
+        model.add(obj)
+        self.assertEquals(obj.non_ref_roles, set()) # Fill the cache
+
+        fact = FactType(name="F1")
+        role = fact.add_role(player=obj)
+        model.add(fact)
+        copy = model.clone()
+
+        self.assertEquals(copy.get("ObjectTypes.A").non_ref_roles,
+                          set([copy.get(role.fullname)]))
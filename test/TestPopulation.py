@@ -15,6 +15,7 @@ import lib.TestDataLocator as TestDataLocator
 from lib.ORMMinusModel import ORMMinusModel
 from lib.Population import Population, Relation, lcm
 from lib.NormaLoader import NormaLoader
+from lib.Domain import DomainView
 
 class TestPopulation(TestCase):
     """ Unit tests for the Population module. """
@@ -150,8 +151,10 @@ class TestPopulation(TestCase):
         model = ORMMinusModel(NormaLoader(fname).model, ubound=6)
         pop = Population(model)
 
-        self.assertIsNone(pop._roles.get("Constraints.IUC2", None))
-        self.assertIsNotNone(pop._roles.get("Constraints.IUC3", None))        
+        # Constraints are considered in the order they were loaded, so the
+        # later of the two overlapping IUCs is ignored.
+        self.assertIsNotNone(pop._roles.get("Constraints.IUC2", None))
+        self.assertIsNone(pop._roles.get("Constraints.IUC3", None))
         
     def test_population_with_no_fact_types(self):
         """ Test population with no fact types. """
@@ -161,6 +164,20 @@ class TestPopulation(TestCase):
 
         self.assertItemsEqual(pop.object_types["ObjectTypes.A"], [0,1,2,3,4])
 
+    def test_population_is_lazy(self):
+        """ Confirm a large object type population is a view of its domain,
+            which does not hold the objects. """
+        fname = os.path.join(self.data_dir, "no_fact_types.orm")
+        model = ORMMinusModel(NormaLoader(fname).model, ubound=10**7)
+        pop = Population(model)
+
+        objects = pop.object_types["ObjectTypes.A"]
+        self.assertIsInstance(objects, DomainView)
+        self.assertEquals(len(objects), 10**7)
+        self.assertEquals(objects[-1], 10**7 - 1)
+        self.assertEquals(list(objects[10**6:10**6 + 3]), 
+                          [10**6, 10**6 + 1, 10**6 + 2])
+
     def test_absorption_population(self):
         """ Test population involving absorption fact type."""
         fname = os.path.join(self.data_dir, "absorption_valid_simple.orm")
@@ -422,8 +439,8 @@ class TestPopulationWrite(TestCase):
                    '3,B3,B4,C2,C2,True',
 
                    'Population of FactTypes.EHasFG:\n' + \
-                   'E,G,F\n' + \
-                   '1,3,2']
+                   'E,F,G\n' + \
+                   '1,2,3']
 
 
     def test_write_stdout(self):
@@ -0,0 +1,244 @@
+##############################################################################
+# Package: ormpy
+# File:    TestSnapshot.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" This file contains unit tests for the lib.Snapshot module. """
+
+import os
+import shutil
+import tempfile
+from datetime import date, time, datetime
+from unittest import TestCase
+
+import lib.TestDataLocator as TestDataLocator
+import lib.Snapshot as Snapshot
+from lib.Snapshot import SnapshotError
+from lib.Model import Model
+from lib.ModelElement import attributes
+from lib.NormaLoader import NormaLoader
+from lib.ORMMinusModel import ORMMinusModel
+from lib.ObjectType import ObjectType, ValueType
+from lib.Domain import DateDomain, TimeDomain, DateTimeDomain
+from lib.Constraint import Constraint, ValueConstraint
+
+class TestSnapshot(TestCase):
+    """ Unit tests for the Snapshot module. """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def assertSameModel(self, expected, actual):
+        """ Assert that actual is an identical copy of expected. """
+        for attr in ["object_types", "fact_types", "constraints"]:
+            exp = sorted(getattr(expected, attr), key=lambda x: x.name)
+            act = sorted(getattr(actual, attr), key=lambda x: x.name)
+            self.assertEquals([x.name for x in exp], [x.name for x in act])
+            for x, y in zip(exp, act):
+                self.assertSameValue(x, y, {})
+
+    def assertSameValue(self, expected, actual, seen):
+        """ Recursively compare two attribute values.  seen maps the id of
+            each object already compared to the object it was matched with,
+            which confirms that shared references remain shared. """
+        self.assertIs(type(actual), type(expected))
+
+        compound = hasattr(expected, "__dict__") or \
+                   hasattr(expected, "__slots__")
+        if not compound and \
+           not isinstance(expected, (list, tuple, set, frozenset, dict)):
+            self.assertEquals(actual, expected)
+            return
+
+        if id(expected) in seen:
+            self.assertIs(seen[id(expected)], actual)
+            return
+        seen[id(expected)] = actual
+
+        if isinstance(expected, (list, tuple)):
+            self.assertEquals(len(actual), len(expected))
+            for x, y in zip(expected, actual):
+                self.assertSameValue(x, y, seen)
+        if isinstance(expected, (set, frozenset)):
+            self.assertEquals(len(actual), len(expected))
+        if isinstance(expected, dict):
+            self.assertEquals(len(actual), len(expected))
+            for key in expected:
+                self.assertSameValue(expected[key], actual[key], seen)
+        if compound:
+            exp, act = dict(attributes(expected)), dict(attributes(actual))
+            self.assertItemsEqual(act.keys(), exp.keys())
+            for key in exp:
+                self.assertSameValue(exp[key], act[key], seen)
+
+    def test_round_trip_test_models(self):
+        """ Confirm every loadable test model survives a round trip. """
+        count = 0
+        for fname in sorted(os.listdir(TestDataLocator.get_data_dir())):
+            if not fname.endswith(".orm"):
+                continue
+            try:
+                model = NormaLoader(TestDataLocator.path(fname)).model
+            except Exception:
+                continue # Invalid test models are expected to fail to load
+
+            copy = Snapshot.loads(Snapshot.dumps(model))
+            self.assertSameModel(model, copy)
+            count += 1
+
+        self.assertTrue(count > 50)
+
+    def test_save_and_load(self):
+        """ Confirm Model.save and Model.load preserve cross references. """
+        fname = TestDataLocator.path("join_rule_valid_linear_path_euc.orm")
+        model = NormaLoader(fname).model
+        path = os.path.join(self.temp_dir, "model.snapshot")
+
+        model.save(path)
+        copy = Model.load(path)
+
+        self.assertSameModel(model, copy)
+
+        euc = copy.constraints.get("EUC")
+        role = euc.covers[0]
+        self.assertIn(role, role.fact_type.roles)
+        self.assertIn(euc, role.covered_by)
+        self.assertIn(role, role.player.roles)
+        self.assertIs(euc.covers.join_path.fact_types[0],
+                      copy.fact_types.get(role.fact_type.name))
+
+        # Roles are registered, including roles added after loading
+        self.assertEquals(len(copy.registry), len(model.registry))
+        self.assertIs(copy.get_by_uid(role.uid), role)
+        self.assertIs(copy.get(role.fullname), role)
+        new_role = role.fact_type.add_role(player=role.player)
+        self.assertIs(copy.get_by_uid(new_role.uid), new_role)
+
+    def test_value_domain_contents(self):
+        """ Confirm value constraint domains are stored and remain shared
+            with the object types they constrain. """
+        fname = TestDataLocator.path("value_constraints.orm")
+        model = Snapshot.loads(Snapshot.dumps(NormaLoader(fname).model))
+        original = NormaLoader(fname).model
+
+        for cons in original.constraints:
+            if isinstance(cons, ValueConstraint):
+                copy = model.constraints.get(cons.name)
+                self.assertEquals(copy.domain.draw(cons.size),
+                                  cons.domain.draw(cons.size))
+                if isinstance(cons.covers[0], ObjectType):
+                    self.assertIs(copy.covers[0].domain, copy.domain)
+
+    def test_large_value_domain(self):
+        """ Confirm a value domain with a large range survives a round trip
+            as intervals. """
+        model = Model()
+        obj = ValueType(name="V")
+        model.add(obj)
+        cons = ValueConstraint(name="VC1", covers=[obj])
+        cons.domain.add_range(1, 10**6)
+        cons.domain.add_range("x")
+        model.add(cons)
+
+        data = Snapshot.dumps(model)
+        self.assertTrue(len(data) < 2000)
+        copy = Snapshot.loads(data).constraints.get("VC1")
+        self.assertEquals(copy.size, 10**6 + 1)
+        self.assertIn(999999, copy.domain)
+        self.assertEquals(copy.domain.draw(3), [1, 2, 3])
+
+    def test_temporal_domains(self):
+        """ Confirm date and time domains and values survive a round trip. """
+        model = Model()
+        model.add(ValueType(name="D", data_type=DateDomain(date(2010, 2, 3))))
+        model.add(ValueType(name="T", data_type=TimeDomain(time(13, 5))))
+        model.add(ValueType(name="DT",
+                  data_type=DateTimeDomain(datetime(2010, 2, 3, 4, 5, 6, 7))))
+
+        vc = ValueConstraint(covers=[model.object_types.get("D")], name="VC")
+        vc.domain.add([date(2001, 1, 1), date(2002, 2, 2)])
+        model.add(vc)
+
+        copy = Snapshot.loads(Snapshot.dumps(model))
+        self.assertSameModel(model, copy)
+
+        for name in ["D", "T", "DT"]:
+            self.assertEquals(copy.object_types.get(name).data_type.draw(3),
+                              model.object_types.get(name).data_type.draw(3))
+        self.assertEquals(copy.object_types.get("D").domain.draw(2),
+                          [date(2001, 1, 1), date(2002, 2, 2)])
+
+    def test_transformed_model(self):
+        """ Confirm a model modified by transformations survives a round trip.
+        """
+        fname = TestDataLocator.path("absorption_valid_simple.orm")
+        model = NormaLoader(fname).model
+        ORMMinusModel(model, ubound=10)
+
+        copy = Snapshot.loads(Snapshot.dumps(model))
+        self.assertSameModel(model, copy)
+
+        solution = ORMMinusModel(copy, ubound=10).solution
+        self.assertEquals(solution["FactTypes.EUC1"], 10)
+
+    def test_constraint_order(self):
+        """ Confirm constraints keep the order in which they were added. """
+        model = Model()
+        obj = ObjectType(name="O1")
+        model.add(obj)
+        names = ["C9", "C1", "C5", "C3", "C7", "C2"]
+        for name in names:
+            model.add(Constraint(name=name, covers=[obj]))
+
+        copy = Snapshot.loads(Snapshot.dumps(model))
+        constraints = copy.constraints.of_type(Constraint)
+        self.assertEquals([c.name for c in constraints], names)
+
+    def test_not_a_snapshot(self):
+        """ Confirm input that is not a snapshot is rejected. """
+        with self.assertRaises(SnapshotError) as ex:
+            Snapshot.loads("<?xml version='1.0'?><ormRoot:ORM2/>")
+        self.assertEquals(ex.exception.message,
+                          "Input is not a model snapshot.")
+
+        with self.assertRaises(SnapshotError) as ex:
+            Snapshot.loads("ORM")
+        self.assertEquals(ex.exception.message,
+                          "Input is not a model snapshot.")
+
+    def test_version_mismatch(self):
+        """ Confirm a snapshot from another format version is rejected. """
+        data = Snapshot.dumps(Model())
+        data = data[:8] + "\x7f\x7f" + data[10:]
+
+        with self.assertRaises(SnapshotError) as ex:
+            Snapshot.loads(data)
+        self.assertEquals(ex.exception.message,
+            "Unsupported snapshot version 32639 (expected {0})."
+            .format(Snapshot.VERSION))
+
+    def test_corrupt_snapshot(self):
+        """ Confirm a truncated snapshot is rejected. """
+        fname = TestDataLocator.path("simple_model.orm")
+        data = Snapshot.dumps(NormaLoader(fname).model)
+
+        with self.assertRaises(SnapshotError) as ex:
+            Snapshot.loads(data[:len(data) // 2])
+        self.assertEquals(ex.exception.message, "Snapshot is corrupt.")
+
+    def test_unsupported_attribute(self):
+        """ Confirm an attribute that cannot be stored is reported. """
+        model = Model()
+        obj = ObjectType(name="A")
+        obj.domain = open(os.devnull)
+        model.add(obj)
+
+        with self.assertRaises(SnapshotError) as ex:
+            Snapshot.dumps(model)
+        self.assertEquals(ex.exception.message,
+            "Cannot save domain of ObjectType: unsupported type file")
+        obj.domain.close()
@@ -11,6 +11,8 @@ import os
 
 from lib.NormaLoader import NormaLoader
 from lib.SubtypeGraph import SubtypeGraph
+from lib.ObjectType import EntityType
+from lib.Constraint import SubtypeConstraint
 import lib.TestDataLocator as TestData
 
 class TestSubtypeGraph(TestCase):
@@ -150,5 +152,53 @@ class TestSubtypeGraph(TestCase):
         self.assertEquals(graph.root_of[z1], w)
         self.assertItemsEqual(z1.direct_supertypes, [z, y1])
         self.assertItemsEqual(graph.supertypes_of[z1], [x, y, w, z, y1])
-        self.assertItemsEqual(z1.direct_subtypes, []) 
+        self.assertItemsEqual(z1.direct_subtypes, [])
 
+    def assertSameGraph(self, expected, actual):
+        """ Assert that two subtype graphs are the same. """
+        self.assertItemsEqual(actual.roots, expected.roots)
+        self.assertEquals(actual.root_of, expected.root_of)
+        self.assertEquals(actual.supertypes_of, expected.supertypes_of)
+
+    def test_follow_model(self):
+        """ Test that a graph following the model stays up to date. """
+        model = self.basic_model
+        graph = SubtypeGraph(model, follow=True)
+        links = dict(((cons.subtype.name, cons.supertype.name), cons) for cons
+                     in model.constraints.of_type(SubtypeConstraint))
+
+        # Remove subtype constraints one at a time, and restore them
+        for link in [("B", "A"), ("Z1", "Y1"), ("Z", "X"), ("X1", "X")]:
+            model.remove(links[link])
+            self.assertSameGraph(SubtypeGraph(model), graph)
+            model.add(links[link])
+            self.assertSameGraph(SubtypeGraph(model), graph)
+
+        # Add a new type below Z1 and then a new root above W
+        v = EntityType(name="V")
+        model.add(v)
+        model.add(SubtypeConstraint(v, model.object_types.get("Z1")))
+        self.assertSameGraph(SubtypeGraph(model), graph)
+        self.assertEquals(graph.root_of[v], model.object_types.get("W"))
+
+        top = EntityType(name="Top")
+        model.add(top)
+        model.add(SubtypeConstraint(model.object_types.get("W"), top))
+        self.assertSameGraph(SubtypeGraph(model), graph)
+        self.assertEquals(graph.root_of[v], top)
+
+        graph.close()
+        model.remove(model.constraints.of_type(SubtypeConstraint)[-1])
+        self.assertEquals(graph.root_of[v], top) # No longer followed
+
+    def test_follow_model_mult_root(self):
+        """ Test that a change creating a second root raises a ValueError. """
+        model = self.basic_model
+        graph = SubtypeGraph(model, follow=True)
+        cons = SubtypeConstraint(model.object_types.get("C"),
+                                 model.object_types.get("E1"))
+
+        with self.assertRaises(ValueError) as ex:
+            model.add(cons)
+        self.assertEquals(ex.exception.message, \
+           "Subtype graph containing ObjectTypes.C has more than one root type")
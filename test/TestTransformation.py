@@ -1070,8 +1070,9 @@ class TestUnsupportedSubsetRemoval(TestCase):
         self.assertTrue(role1.mandatory)
         self.assertTrue(role2.mandatory)
 
-        self.assertEquals(mc1.covers, [role1])
-        self.assertEquals(mc2.covers, [role2])
+        # Constraints are considered in the order they were loaded
+        self.assertEquals(mc1.covers, [role2])
+        self.assertEquals(mc2.covers, [role1])
 
         # Unsupported constraints removed
         self.assertIsNone(model.constraints.get("SUB_JOIN"))
@@ -0,0 +1,116 @@
+##############################################################################
+# Package: ormpy
+# File:    TestXmlBackend.py
+# Author:  Matthew Nizol
+##############################################################################
+
+""" This file contains unit tests for the lib.XmlBackend module. """
+
+import os
+from StringIO import StringIO
+from unittest import TestCase, skipIf
+
+import lib.TestDataLocator as TestDataLocator
+import lib.XmlBackend as XmlBackend
+from lib.XmlBackend import get_backend, available, NS_CORE
+from lib.NormaLoader import NormaLoader
+
+SEQUENCES = """<orm:Sequences xmlns:orm="{0}">
+    <orm:RoleSequence>
+        <orm:Role ref="_1" /><orm:Role ref="_2" />
+    </orm:RoleSequence>
+    <orm:RoleSequence>
+        <orm:Role ref="_1" /><orm:JoinRule />
+    </orm:RoleSequence>
+    <orm:RoleSequence>
+        <orm:Role ref="_1"><orm:ProjectedFrom /></orm:Role>
+    </orm:RoleSequence>
+    <orm:RoleSequence>
+        <orm:Role ref="_1" /><orm:Role />
+    </orm:RoleSequence>
+    <orm:RoleSequence />
+    <orm:PathedRoles>
+        <orm:PathedRole ref="_1" /><orm:PathedRole ref="_2" />
+    </orm:PathedRoles>
+    <orm:PathedRoles>
+        <orm:PathedRole ref="_1"><orm:ValueRestriction /></orm:PathedRole>
+    </orm:PathedRoles>
+    <orm:PathedRoles>
+        <orm:PathedRole ref="_1" /><orm:SubPaths />
+    </orm:PathedRoles>
+</orm:Sequences>""".format(NS_CORE)
+
+class TestXmlBackend(TestCase):
+    """ Unit tests for the XmlBackend module. """
+
+    def parse(self, backend):
+        """ Returns the children of the root of SEQUENCES, parsed by
+            backend. """
+        for event, node in backend.iterparse(StringIO(SEQUENCES)):
+            pass
+        return list(node)
+
+    def test_get_backend(self):
+        """ Confirm that backends are looked up by name. """
+        self.assertIs(get_backend(), XmlBackend.EtreeBackend)
+        self.assertIs(get_backend("etree"), XmlBackend.EtreeBackend)
+        self.assertIn("etree", available())
+
+        with self.assertRaises(ValueError) as ex:
+            get_backend("sax")
+        self.assertEquals(ex.exception.message,
+                          "XML backend sax is not available.")
+
+    @skipIf(XmlBackend.lxml is not None, "lxml is installed")
+    def test_lxml_not_installed(self):
+        """ Confirm that the lxml backend is unavailable without lxml. """
+        self.assertEquals(available(), ["etree"])
+        with self.assertRaises(ValueError):
+            get_backend("lxml")
+
+    def test_role_refs(self):
+        """ Confirm that each backend finds the refs of a sequence that only
+            holds explicit roles. """
+        for name in available():
+            backend = get_backend(name)
+            nodes = self.parse(backend)
+            actual = [backend.role_refs(node) for node in nodes[:5]]
+            self.assertEquals(actual, [["_1", "_2"], None, None, None, []])
+
+    def test_pathed_roles(self):
+        """ Confirm that each backend finds the roles of a linear path that
+            only holds <PathedRole> nodes without children. """
+        for name in available():
+            backend = get_backend(name)
+            nodes = self.parse(backend)
+
+            roles = backend.pathed_roles(nodes[5])
+            self.assertEquals([role.get("ref") for role in roles],
+                              ["_1", "_2"])
+            self.assertIsNone(backend.pathed_roles(nodes[6]))
+            self.assertIsNone(backend.pathed_roles(nodes[7]))
+
+    @skipIf(XmlBackend.lxml is None, "lxml is not installed")
+    def test_same_models(self):
+        """ Confirm that both backends load the same models, omissions, and
+            errors from each test model. """
+        data_dir = TestDataLocator.get_data_dir()
+
+        def load(filename, backend):
+            """ Returns a summary of the load of filename. """
+            try:
+                loader = NormaLoader(filename, backend=backend)
+            except Exception as ex:
+                return ex.message
+            model = loader.model
+            names = [x.fullname for x in list(model.object_types) +
+                     list(model.fact_types) + list(model.constraints)]
+            self.assertEquals(loader.stats.backend, backend)
+            return (sorted(names), sorted(loader.omissions),
+                    sorted(loader.unexpected), loader.stats.nodes)
+
+        for name in sorted(os.listdir(data_dir)):
+            if name.endswith(".orm"):
+                filename = os.path.join(data_dir, name)
+                self.assertEquals(load(filename, "etree"),
+                                  load(filename, "lxml"), name)